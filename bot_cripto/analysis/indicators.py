@@ -0,0 +1,203 @@
+import math
+
+import numpy as np
+
+# ==========================
+# Motor de indicadores do BTC
+# ==========================
+# Dois modos, mesmos resultados das funções em pandas do crypto_monitor:
+#  - lote: uma passada NumPy sobre um array float64 contíguo
+#  - streaming: atualização O(1) a cada novo fechamento diário (somas correntes)
+
+SMA_WINDOWS = (50, 111, 200, 350)
+PUELL_WINDOW = 365
+BTC_MINED_PER_DAY = 900
+
+
+def as_price_array(prices):
+    """Converte Series/DataFrame('price')/lista em array float64 contíguo."""
+    if hasattr(prices, "columns"):
+        prices = prices["price"]
+    if hasattr(prices, "to_numpy"):
+        prices = prices.to_numpy(dtype=np.float64)
+    return np.ascontiguousarray(prices, dtype=np.float64)
+
+
+def sma_last(arr, window):
+    """Média simples dos últimos 'window' pontos (NaN se não houver pontos suficientes)."""
+    if len(arr) < window:
+        return math.nan
+    return float(arr[-window:].mean())
+
+
+def rolling_mean(arr, window):
+    """Série completa da média móvel (NaN nas primeiras window-1 posições), via soma acumulada."""
+    out = np.full(len(arr), np.nan)
+    if len(arr) < window:
+        return out
+    csum = np.cumsum(np.insert(arr, 0, 0.0))
+    out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def compute_indicators(prices, btc_mined_per_day=BTC_MINED_PER_DAY):
+    """
+    Calcula de uma vez tudo o que o relatório usa, sem alterar a entrada.
+    Retorna dict: price, ma50, ma111, ma200, ma350, puell, pi_cycle.
+    """
+    arr = as_price_array(prices)
+    if len(arr) == 0:
+        return {"price": math.nan, "ma50": math.nan, "ma111": math.nan, "ma200": math.nan,
+                "ma350": math.nan, "puell": math.nan, "pi_cycle": False}
+
+    out = {"price": float(arr[-1])}
+    for w in SMA_WINDOWS:
+        out[f"ma{w}"] = sma_last(arr, w)
+
+    # Puell = receita diária dos mineradores / média de 365 dias da receita
+    revenue = arr[-PUELL_WINDOW:] * btc_mined_per_day
+    if len(arr) >= PUELL_WINDOW:
+        out["puell"] = float(revenue[-1] / revenue.mean())
+    else:
+        out["puell"] = math.nan
+
+    ma111, ma350 = out["ma111"], out["ma350"]
+    out["pi_cycle"] = bool(not math.isnan(ma111) and not math.isnan(ma350) and ma111 > 2 * ma350)
+    return out
+
+
+def puell_series(prices, btc_mined_per_day=BTC_MINED_PER_DAY):
+    """Série histórica do Puell Multiple (precisa de 2x365 dias para ter 365 pontos válidos)."""
+    revenue = as_price_array(prices) * btc_mined_per_day
+    return revenue / rolling_mean(revenue, PUELL_WINDOW)
+
+
+class RollingMean:
+    """Média móvel com buffer circular e soma corrente: update() em O(1)."""
+
+    def __init__(self, window):
+        self.window = window
+        self._buf = np.zeros(window)
+        self._sum = 0.0
+        self._count = 0
+        self._pos = 0
+        self._nans = 0  # NaNs dentro da janela (como no pandas, a média vira NaN)
+
+    def update(self, x):
+        old = self._buf[self._pos]
+        if self._count == self.window:
+            if math.isnan(old):
+                self._nans -= 1
+            else:
+                self._sum -= old
+        else:
+            self._count += 1
+        self._buf[self._pos] = x
+        if math.isnan(x):
+            self._nans += 1
+        else:
+            self._sum += x
+        self._pos = (self._pos + 1) % self.window
+        if self._pos == 0:
+            # recomputa a soma exata uma vez por volta para não acumular erro de ponto flutuante
+            self._sum = float(np.nansum(self._buf))
+        return self.value
+
+    @property
+    def value(self):
+        if self._count < self.window or self._nans:
+            return math.nan
+        return self._sum / self.window
+
+
+class StreamingIndicators:
+    """
+    Estado incremental dos indicadores: chame update(close) a cada novo fechamento diário.
+    latest() devolve o mesmo dict de compute_indicators().
+    """
+
+    def __init__(self, btc_mined_per_day=BTC_MINED_PER_DAY):
+        self.btc_mined_per_day = btc_mined_per_day
+        self._smas = {w: RollingMean(w) for w in SMA_WINDOWS}
+        self._revenue = RollingMean(PUELL_WINDOW)
+        self._last = math.nan
+
+    @classmethod
+    def from_prices(cls, prices, btc_mined_per_day=BTC_MINED_PER_DAY):
+        engine = cls(btc_mined_per_day)
+        for x in as_price_array(prices):
+            engine.update(x)
+        return engine
+
+    def update(self, close):
+        close = float(close)
+        self._last = close
+        for sma in self._smas.values():
+            sma.update(close)
+        self._revenue.update(close * self.btc_mined_per_day)
+        return self.latest()
+
+    def latest(self):
+        out = {"price": self._last}
+        for w, sma in self._smas.items():
+            out[f"ma{w}"] = sma.value
+        revenue_ma = self._revenue.value
+        out["puell"] = (self._last * self.btc_mined_per_day / revenue_ma
+                        if not math.isnan(revenue_ma) else math.nan)
+        ma111, ma350 = out["ma111"], out["ma350"]
+        out["pi_cycle"] = bool(not math.isnan(ma111) and not math.isnan(ma350) and ma111 > 2 * ma350)
+        return out
+
+
+# ==========================
+# Benchmark: python analysis/indicators.py [anos]
+# ==========================
+def _pandas_reference(prices_df, btc_mined_per_day=BTC_MINED_PER_DAY):
+    """Cópia do cálculo antigo (rolling().mean() do pandas) para comparação."""
+    import pandas as pd
+
+    df = prices_df.copy()
+    df["miner_revenue"] = df["price"] * btc_mined_per_day
+    df["revenue_ma365"] = df["miner_revenue"].rolling(window=365).mean()
+    df["puell_multiple"] = df["miner_revenue"] / df["revenue_ma365"]
+    df["sma_111"] = df["price"].rolling(window=111).mean()
+    df["sma_350"] = df["price"].rolling(window=350).mean()
+    df["MA50"] = df["price"].rolling(50).mean()
+    df["MA200"] = df["price"].rolling(200).mean()
+    latest = df.iloc[-1]
+    pi = False
+    if not pd.isna(latest["sma_111"]) and not pd.isna(latest["sma_350"]):
+        pi = bool(latest["sma_111"] > 2 * latest["sma_350"])
+    return {"price": latest["price"], "ma50": latest["MA50"], "ma111": latest["sma_111"],
+            "ma200": latest["MA200"], "ma350": latest["sma_350"],
+            "puell": latest["puell_multiple"], "pi_cycle": pi}
+
+
+if __name__ == "__main__":
+    import sys
+    import timeit
+
+    import pandas as pd
+
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    n = years * 365
+    rng = np.random.default_rng(42)
+    prices = 1000 * np.exp(np.cumsum(rng.normal(0.0005, 0.03, n)))
+    df = pd.DataFrame({"price": prices}, index=pd.date_range("2010-01-01", periods=n))
+
+    ref = _pandas_reference(df)
+    batch = compute_indicators(df)
+    stream = StreamingIndicators.from_prices(df)
+    for key in ref:
+        assert np.isclose(ref[key], batch[key], rtol=1e-9), (key, ref[key], batch[key])
+        assert np.isclose(ref[key], stream.latest()[key], rtol=1e-9), (key, ref[key], stream.latest()[key])
+    assert round(ref["puell"], 2) == round(batch["puell"], 2)
+
+    reps = 50
+    t_ref = timeit.timeit(lambda: _pandas_reference(df), number=reps) / reps
+    t_batch = timeit.timeit(lambda: compute_indicators(df), number=reps) / reps
+    t_update = timeit.timeit(lambda: stream.update(prices[-1]), number=10_000) / 10_000
+    print(f"{n} dias ({years} anos) — resultados idênticos")
+    print(f"pandas (atual):   {t_ref * 1e3:8.3f} ms")
+    print(f"lote NumPy:       {t_batch * 1e3:8.3f} ms  ({t_ref / t_batch:.0f}x)")
+    print(f"streaming/update: {t_update * 1e6:8.3f} µs")
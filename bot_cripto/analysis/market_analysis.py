@@ -1,17 +1,25 @@
 import os
 import re
-import json
-import requests
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Mantém seus helpers existentes
 from utils.helpers import classify_altcoins, diversification_strategy
+from utils import http_client
+from utils.cache import cached
+from utils.fetch_engine import fetch_all
+from utils.next_data import extract_with_fallback, PAGE_PROPS
+from utils.json_path import PathExtractor, is_number
+from storage.scrape_cache import ScrapeCache
 
 load_dotenv()
 
 # Opcional (apenas se você tiver; não é obrigatório no modo gratuito)
 COINGLASS_API_KEY = os.getenv("COINGLASS_API_KEY")
+SCRAPE_DB = os.getenv("SCRAPE_DB", "scrape_cache.db")  # validadores HTTP + resultados parseados
+
+# Termo procurado no fallback heurístico da CoinGlass (busca em bytes)
+ALTCOIN_TERM = re.compile(rb"[Aa]ltcoin")
 
 # Headers para scraping leve
 DEFAULT_HEADERS = {
@@ -22,6 +30,27 @@ DEFAULT_HEADERS = {
 
 # ---------- FONTES GRATUITAS / FALLBACKS ----------
 
+# Extratores por fonte: o caminho até o valor é aprendido uma vez e reusado
+# (varredura completa só quando o caminho some ou deixa de casar)
+COINGLASS_ALTCOIN_SERIES = PathExtractor(
+    "coinglass_altcoin_series",
+    lambda v: isinstance(v, (list, dict)),
+    last=False,
+    key_match=lambda k: "altcoin" in k.lower(),
+)
+CMC_ALT_SEASON = PathExtractor("cmc_alt_season", lambda v: is_number(v) and 0 <= v <= 100, cast=float)
+CMC_CYCLE_MARKER = PathExtractor("cmc_market_cycle", lambda v: is_number(v) and 0 <= v <= 100, cast=float)
+CMC100_LEVEL = PathExtractor("cmc100_level", lambda v: is_number(v) and v > 10, cast=float)
+
+# Subárvore do __NEXT_DATA__ tentada primeiro em cada página (caminho rápido;
+# sem valor ali, extract_with_fallback tenta "/props" e lembra onde achou)
+COINGLASS_POINTER = PAGE_PROPS
+CMC_ALT_SEASON_POINTER = PAGE_PROPS
+CMC_CYCLE_POINTER = PAGE_PROPS
+CMC100_POINTER = PAGE_PROPS
+
+
+@cached("cg_markets", ttl=180, stale_ttl=600)
 def fetch_market_data():
     """
     GRATUITO: CoinGecko /coins/markets
@@ -36,7 +65,7 @@ def fetch_market_data():
         "sparkline": "false",
         "price_change_percentage": "24h,7d",
     }
-    r = requests.get(url, params=params, timeout=20)
+    r = http_client.get(url, params=params, timeout=20)
     r.raise_for_status()
     data = r.json()
 
@@ -58,13 +87,14 @@ def fetch_market_data():
     return mapped
 
 
+@cached("cg_btc_dominance", ttl=300, stale_ttl=900)
 def get_btc_dominance():
     """
     GRATUITO: CoinGecko /global -> calcula dominância BTC (%)
     """
     try:
         url = "https://api.coingecko.com/api/v3/global"
-        r = requests.get(url, timeout=15)
+        r = http_client.get(url, timeout=15)
         r.raise_for_status()
         data = r.json()
         # CoinGecko retorna percentuais por moeda em data.market_cap_percentage
@@ -74,12 +104,13 @@ def get_btc_dominance():
         return None
 
 
+@cached("altme_fear_greed", ttl=3 * 3600, stale_ttl=24 * 3600)
 def get_fear_greed_index():
     """
     GRATUITO: Alternative.me Fear & Greed Index (proxy gratuito do índice de 'ganância')
     """
     try:
-        r = requests.get("https://api.alternative.me/fng/?limit=1", timeout=15)
+        r = http_client.get("https://api.alternative.me/fng/?limit=1", timeout=15)
         r.raise_for_status()
         d = r.json()
         v = int(d["data"][0]["value"])
@@ -89,6 +120,7 @@ def get_fear_greed_index():
         return None, None
 
 
+@cached("coinglass_altcoin_season", ttl=6 * 3600, stale_ttl=24 * 3600)
 def get_coinglass_altcoin_season_index():
     """
     Preferencial (mais confiável) – CoinGlass Altcoin Season Index.
@@ -103,7 +135,7 @@ def get_coinglass_altcoin_season_index():
                 "Authorization": f"Bearer {COINGLASS_API_KEY}",
                 "accept": "application/json",
             }
-            r = requests.get(url, headers=headers, timeout=20)
+            r = http_client.get(url, headers=headers, timeout=20)
             r.raise_for_status()
             payload = r.json()
             data = payload.get("data") or []
@@ -116,33 +148,16 @@ def get_coinglass_altcoin_season_index():
     # 2) Fallback: tentar extrair do HTML público (pode falhar conforme mudanças do site)
     try:
         url = "https://www.coinglass.com/pt/pro/i/alt-coin-season"
-        r = requests.get(url, headers=DEFAULT_HEADERS, timeout=20)
+        r = http_client.get(url, headers=DEFAULT_HEADERS, timeout=20)
         r.raise_for_status()
-        html = r.text
+        raw = r.content
 
         # Alguns sites SPA embutem JSON em <script> tipo __NEXT_DATA__ / window.__INITIAL_STATE__
-        # Tentativa genérica:
-        m = re.search(r'__NEXT_DATA__" type="application/json">(.+?)</script>', html)
-        if m:
-            app_json = json.loads(m.group(1))
-            # A estrutura pode mudar. Tente localizar 'altcoin' em qualquer parte
-            # Procura recursiva simples:
-            def deep_find(obj):
-                if isinstance(obj, dict):
-                    for k, v in obj.items():
-                        if "altcoin" in k.lower() and isinstance(v, (list, dict)):
-                            return v
-                        found = deep_find(v)
-                        if found is not None:
-                            return found
-                elif isinstance(obj, list):
-                    for it in obj:
-                        found = deep_find(it)
-                        if found is not None:
-                            return found
-                return None
-
-            maybe = deep_find(app_json)
+        # Dados da página (props.pageProps; "/props" se não estiverem lá), sem regex no HTML inteiro.
+        # A estrutura pode mudar: primeiro container cuja chave contém 'altcoin'
+        # (caminho aprendido na primeira vez; depois acesso direto)
+        maybe = extract_with_fallback(raw, COINGLASS_ALTCOIN_SERIES, COINGLASS_POINTER)
+        if maybe is not None:
             # Se for lista de pontos, pega último valor numérico
             if isinstance(maybe, list) and maybe:
                 last = maybe[-1]
@@ -155,13 +170,17 @@ def get_coinglass_altcoin_season_index():
                     for val in last[::-1]:
                         if isinstance(val, (int, float)):
                             return float(val)
-            # Como fallback, procura qualquer número percentual próximo ao termo "Altcoin"
-            nums = re.findall(r'(\d{1,3}(?:\.\d+)?)\s*%?', html)
-            if nums:
-                # isso é bem heurístico; retorna o maior em 0..100
-                candidates = [float(x) for x in nums if 0 <= float(x) <= 100]
-                if candidates:
-                    return max(candidates)
+        # Como fallback, procura qualquer número percentual próximo ao termo "Altcoin"
+        # (só numa janela após cada ocorrência, não na página inteira)
+        nums = []
+        for m in ALTCOIN_TERM.finditer(raw):
+            window = raw[m.end():m.end() + 300].decode("utf-8", errors="ignore")
+            nums.extend(re.findall(r'(\d{1,3}(?:\.\d+)?)\s*%?', window))
+        if nums:
+            # isso é bem heurístico; retorna o maior em 0..100
+            candidates = [float(x) for x in nums if 0 <= float(x) <= 100]
+            if candidates:
+                return max(candidates)
     except Exception:
         pass
 
@@ -170,112 +189,74 @@ def get_coinglass_altcoin_season_index():
 
 # ---------- ITENS "CMC CHARTS" (GRATUITOS, BEST EFFORT) ----------
 
-def _extract_next_data(url):
-    """Tenta extrair JSON __NEXT_DATA__ das páginas públicas do CMC (gratuito)."""
+scrape_cache = ScrapeCache(SCRAPE_DB)
+
+
+@cached("cmc_next_data", ttl=6 * 3600, stale_ttl=24 * 3600)
+def _scrape_next_data_value(url, extractor, pointer=PAGE_PROPS):
+    """
+    Valor de uma página pública do CMC (gratuito): __NEXT_DATA__ -> pointer -> extractor.
+    A requisição é condicional (ETag/Last-Modified); com 304 ou corpo idêntico
+    o valor salvo é reaproveitado sem parsear a página de novo.
+    """
+    def parse(body):
+        return extract_with_fallback(body, extractor, pointer)
+
     try:
-        r = requests.get(url, headers=DEFAULT_HEADERS, timeout=20)
-        r.raise_for_status()
-        html = r.text
-        m = re.search(r'__NEXT_DATA__" type="application/json">(.+?)</script>', html)
-        if not m:
-            return None
-        return json.loads(m.group(1))
+        return scrape_cache.fetch(url, parse, parser=extractor.source, headers=DEFAULT_HEADERS, timeout=20)
     except Exception:
         return None
 
 
 def get_cmc_altcoin_season_index():
     """Altcoin Season Index via página pública do CMC (best effort)."""
-    data = _extract_next_data("https://coinmarketcap.com/pt-br/charts/altcoin-season-index/")
-    if not data:
-        return None
-    # Estruturas do CMC mudam; tentamos localizar qualquer série relevante
-    def deep_numbers(obj):
-        out = []
-        if isinstance(obj, dict):
-            for v in obj.values():
-                out.extend(deep_numbers(v))
-        elif isinstance(obj, list):
-            for it in obj:
-                out.extend(deep_numbers(it))
-        else:
-            if isinstance(obj, (int, float)):
-                out.append(float(obj))
-        return out
-
-    nums = deep_numbers(data)
-    # Se houver muitos números, um heurístico: usar últimos valores em faixa 0..100
-    vals = [x for x in nums if 0 <= x <= 100]
-    if vals:
-        return vals[-1]
-    return None
+    # Estruturas do CMC mudam: último número em 0..100 (caminho aprendido e reusado)
+    return _scrape_next_data_value("https://coinmarketcap.com/pt-br/charts/altcoin-season-index/", CMC_ALT_SEASON,
+                                   CMC_ALT_SEASON_POINTER)
 
 
 def get_cmc_market_cycle_marker():
     """Market Cycle Indicators via página pública do CMC (best effort)."""
-    data = _extract_next_data("https://coinmarketcap.com/pt-br/charts/crypto-market-cycle-indicators/")
-    if not data:
-        return None
-    # Heurística semelhante
-    def deep_pairs(obj):
-        # retorna lista de números 'marcadores' 0..100
-        out = []
-        if isinstance(obj, dict):
-            for v in obj.values():
-                out.extend(deep_pairs(v))
-        elif isinstance(obj, list):
-            for it in obj:
-                out.extend(deep_pairs(it))
-        else:
-            if isinstance(obj, (int, float)) and 0 <= obj <= 100:
-                out.append(float(obj))
-        return out
-
-    vals = deep_pairs(data)
-    return vals[-1] if vals else None
+    # Heurística semelhante: último marcador 0..100
+    return _scrape_next_data_value("https://coinmarketcap.com/pt-br/charts/crypto-market-cycle-indicators/",
+                                   CMC_CYCLE_MARKER, CMC_CYCLE_POINTER)
 
 
 def get_cmc100_index_level():
     """CMC100 Index via página pública do CMC (best effort). Retorna o último valor numérico encontrado."""
-    data = _extract_next_data("https://coinmarketcap.com/pt-br/charts/cmc100/")
-    if not data:
-        return None
-    # Busca heurística por valores grandes (índice costuma ser > 100)
-    def deep_big_numbers(obj):
-        out = []
-        if isinstance(obj, dict):
-            for v in obj.values():
-                out.extend(deep_big_numbers(v))
-        elif isinstance(obj, list):
-            for it in obj:
-                out.extend(deep_big_numbers(it))
-        else:
-            if isinstance(obj, (int, float)) and obj > 10:  # filtro mínimo
-                out.append(float(obj))
-        return out
-
-    vals = deep_big_numbers(data)
-    return vals[-1] if vals else None
+    # Busca heurística por valores grandes (índice costuma ser > 100; filtro mínimo > 10)
+    return _scrape_next_data_value("https://coinmarketcap.com/pt-br/charts/cmc100/", CMC100_LEVEL, CMC100_POINTER)
 
 
 # ---------- GERAÇÃO DO RELATÓRIO ----------
 
 def generate_report():
-    # 1) Dados de mercado (gratuito / estável)
-    data = fetch_market_data()
+    # 1) Coleta paralela de todas as fontes independentes (prazo global)
+    fetched = fetch_all({
+        "market": fetch_market_data,                          # CoinGecko /coins/markets
+        "fear_greed": get_fear_greed_index,                   # Alternative.me
+        "alt_season_cmc": get_cmc_altcoin_season_index,       # CMC (scrape best effort)
+        "alt_season_coinglass": get_coinglass_altcoin_season_index,  # CoinGlass (API grátis se key)
+        "market_cycle": get_cmc_market_cycle_marker,          # CMC (scrape best effort)
+        "btc_dom": get_btc_dominance,                         # CoinGecko /global
+        "cmc100": get_cmc100_index_level,                     # CMC (scrape best effort)
+    })
+
+    # 2) Dados de mercado (gratuito / estável)
+    data = fetched["market"] or []
     btc = next((coin for coin in data if coin["symbol"] == "BTC"), None)
 
-    # 2) Classificação dinâmica por market cap (usa seus helpers)
+    # 3) Classificação dinâmica por market cap (usa seus helpers)
     altcoins = [c for c in data if c["symbol"] != "BTC"]
     blue, mid, low = classify_altcoins(altcoins)
 
-    # 3) Indicadores (gratuitos + best effort)
-    fear_greed_val, fear_greed_text = get_fear_greed_index()             # Alternative.me
-    alt_season_cmc = get_cmc_altcoin_season_index()                      # CMC (scrape best effort)
-    alt_season_coinglass = get_coinglass_altcoin_season_index()          # CoinGlass (API grátis se key)
-    market_cycle = get_cmc_market_cycle_marker()                          # CMC (scrape best effort)
-    btc_dom = get_btc_dominance()                                        # CoinGecko /global
-    cmc100_level = get_cmc100_index_level()                               # CMC (scrape best effort)
+    # Indicadores (gratuitos + best effort)
+    fear_greed_val, fear_greed_text = fetched["fear_greed"] or (None, None)
+    alt_season_cmc = fetched["alt_season_cmc"]
+    alt_season_coinglass = fetched["alt_season_coinglass"]
+    market_cycle = fetched["market_cycle"]
+    btc_dom = fetched["btc_dom"]
+    cmc100_level = fetched["cmc100"]
 
     # 4) Métricas BTC
     if btc:
@@ -1,7 +1,7 @@
 import os
-import requests
 from dotenv import load_dotenv
 from datetime import datetime
+from utils import http_client
 from utils.helpers import classify_altcoins, get_altcoin_index, diversification_strategy
 
 load_dotenv()
@@ -11,7 +11,7 @@ def fetch_market_data():
     url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest"
     headers = {"X-CMC_PRO_API_KEY": CMC_API_KEY}
     params = {"start": 1, "limit": 100, "convert": "USD"}
-    response = requests.get(url, headers=headers, params=params)
+    response = http_client.get(url, headers=headers, params=params)
     return response.json()["data"]
 
 def generate_report():
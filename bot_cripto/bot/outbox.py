@@ -0,0 +1,460 @@
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import requests
+from telebot import apihelper
+
+from utils.http_client import TokenBucket
+
+# ==========================
+# Fila de saída para o Telegram (persistente, limites por chat e global)
+# ==========================
+# Fila persistente (SQLite) de envios ao Telegram: ordem por chat, limites por
+# chat e global, retry_after/backoff, quebra em 4096 caracteres e reuso de file_id.
+# TELEGRAM_API_URL aponta o telebot para um servidor falso nos testes.
+
+OUTBOX_DB = os.getenv("OUTBOX_DB", "outbox.db")
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "4"))
+OUTBOX_GLOBAL_RATE = float(os.getenv("OUTBOX_GLOBAL_RATE", "25"))    # mensagens/s (limite ~30)
+OUTBOX_CHAT_INTERVAL = float(os.getenv("OUTBOX_CHAT_INTERVAL", "1.0"))  # s entre mensagens ao mesmo chat
+OUTBOX_GROUP_INTERVAL = float(os.getenv("OUTBOX_GROUP_INTERVAL", "3.0"))  # grupos: ~20/min
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")  # ex.: http://127.0.0.1:8081/bot{0}/{1}
+MESSAGE_LIMIT = 4096
+RETRY_BASE = 2.0        # backoff: 2, 4, 8... segundos
+RETRY_MAX = 300.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id    INTEGER NOT NULL,
+    kind       TEXT NOT NULL,          -- text | document
+    payload    TEXT NOT NULL,          -- JSON
+    status     TEXT NOT NULL DEFAULT 'pending',  -- pending | failed (enviados são apagados)
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    error      TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox_files (
+    path       TEXT PRIMARY KEY,
+    size       INTEGER,
+    mtime      REAL,
+    file_id    TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def split_message(text, limit=MESSAGE_LIMIT):
+    """Quebra o texto em partes <= limit, em fim de linha (linha maior que o limite é cortada)."""
+    if len(text) <= limit:
+        return [text]
+    parts, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:limit])
+            line = line[limit:]
+        if len(current) + len(line) > limit:
+            parts.append(current)
+            current = ""
+        current += line
+    if current:
+        parts.append(current)
+    return [p.rstrip("\n") or p for p in parts]
+
+
+class _Item:
+    __slots__ = ("id", "chat_id", "kind", "payload", "attempts", "not_before")
+
+    def __init__(self, id, chat_id, kind, payload, attempts=0, not_before=0.0):
+        self.id = id
+        self.chat_id = chat_id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+        self.not_before = not_before
+
+
+class Outbox:
+    def __init__(self, path=OUTBOX_DB, workers=OUTBOX_WORKERS, global_rate=OUTBOX_GLOBAL_RATE,
+                 chat_interval=OUTBOX_CHAT_INTERVAL, group_interval=OUTBOX_GROUP_INTERVAL,
+                 max_attempts=OUTBOX_MAX_ATTEMPTS, name="outbox"):
+        self.name = name
+        self.workers = workers
+        self.chat_interval = chat_interval
+        self.group_interval = group_interval
+        self.max_attempts = max_attempts
+        self._bot = None
+        self._bucket = TokenBucket(rate=global_rate, capacity=max(1, int(global_rate)))
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._queues = {}        # chat_id -> deque[_Item]
+        self._ready = []         # (liberado_em epoch, seq, chat_id) dos chats com itens e sem item em voo
+        self._next_free = {}     # chat_id -> epoch a partir do qual pode receber de novo
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._upload_locks = {}  # caminho -> Lock
+        self._running = False
+        self._counters = {"queued": 0, "sent": 0, "failed": 0, "retried": 0, "flood_waits": 0,
+                          "files_reused": 0, "files_uploaded": 0}
+
+    # ---------- enfileirar ----------
+
+    def send_text(self, chat_id, text, parse_mode=None):
+        """Enfileira uma mensagem (quebrada em partes de até 4096 caracteres). Retorna nº de partes."""
+        parts = split_message(text)
+        for part in parts:
+            self._enqueue(chat_id, "text", {"text": part, "parse_mode": parse_mode})
+        return len(parts)
+
+    def send_document(self, chat_id, path, caption=None):
+        """Enfileira um arquivo; se o mesmo arquivo já subiu antes, vai pelo file_id."""
+        self._enqueue(chat_id, "document", {"path": os.path.abspath(path), "caption": caption})
+
+    def _enqueue(self, chat_id, kind, payload):
+        now = time.time()
+        with self._db_lock:
+            cur = self._conn.execute(
+                "INSERT INTO outbox (chat_id, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                (chat_id, kind, json.dumps(payload), now),
+            )
+            self._conn.commit()
+        self._push(_Item(cur.lastrowid, chat_id, kind, payload))
+
+    def _push(self, item, count=True):
+        with self._cond:
+            q = self._queues.get(item.chat_id)
+            if q is None:
+                q = self._queues[item.chat_id] = deque()
+                heapq.heappush(self._ready, (self._ready_at(item), next(self._seq), item.chat_id))
+            q.append(item)
+            if count:
+                self._counters["queued"] += 1
+            self._cond.notify()
+
+    def _ready_at(self, item):
+        return max(time.time(), self._next_free.get(item.chat_id, 0.0), item.not_before)
+
+    # ---------- workers ----------
+
+    def start(self, bot):
+        """Liga o outbox ao TeleBot, recarrega pendências do SQLite e sobe os workers."""
+        if TELEGRAM_API_URL:
+            apihelper.API_URL = TELEGRAM_API_URL
+        with self._cond:
+            if self._running:
+                return
+            self._bot = bot
+            self._running = True
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT id, chat_id, kind, payload, attempts, not_before FROM outbox "
+                "WHERE status = 'pending' ORDER BY id"
+            ).fetchall()
+        # refaz as filas a partir do SQLite: pendências de execuções anteriores primeiro
+        with self._cond:
+            self._queues.clear()
+            self._ready.clear()
+        for id, chat_id, kind, payload, attempts, not_before in rows:
+            self._push(_Item(id, chat_id, kind, json.loads(payload), attempts, not_before), count=False)
+        for k in range(self.workers):
+            th = threading.Thread(target=self._loop, name=f"{self.name}-{k}", daemon=True)
+            th.start()
+            self._threads.append(th)
+
+    def stop(self, timeout=5):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for th in self._threads:
+            th.join(timeout=timeout)
+        self._threads = []
+
+    def _interval(self, chat_id):
+        # ids negativos são grupos/canais no Telegram
+        return self.group_interval if int(chat_id) < 0 else self.chat_interval
+
+    def _next_item(self):
+        """Bloqueia até um chat ficar liberado; o chat sai do heap até o item terminar."""
+        with self._cond:
+            while self._running:
+                if not self._ready:
+                    self._cond.wait()
+                    continue
+                ready_at, _, chat_id = self._ready[0]
+                wait = ready_at - time.time()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                heapq.heappop(self._ready)
+                return self._queues[chat_id][0]
+            return None
+
+    def _finish(self, item, retry_at=None):
+        """Item concluído (enviado/falhou) ou devolvido à frente da fila com retry_at."""
+        with self._cond:
+            q = self._queues[item.chat_id]
+            if retry_at is None:
+                q.popleft()
+                self._next_free[item.chat_id] = time.time() + self._interval(item.chat_id)
+            else:
+                item.not_before = retry_at
+            if q:
+                heapq.heappush(self._ready, (self._ready_at(q[0]), next(self._seq), item.chat_id))
+            else:
+                del self._queues[item.chat_id]
+            self._cond.notify()
+
+    def _loop(self):
+        while True:
+            item = self._next_item()
+            if item is None:
+                return
+            self._bucket.acquire()
+            try:
+                self._deliver(item)
+            except Exception as e:
+                self._on_error(item, e)
+                continue
+            with self._db_lock:
+                self._conn.execute("DELETE FROM outbox WHERE id = ?", (item.id,))
+                self._conn.commit()
+            with self._cond:
+                self._counters["sent"] += 1
+            self._finish(item)
+
+    def _on_error(self, item, e):
+        item.attempts += 1
+        retry_after = self._retry_after(e, item.attempts)
+        permanent = retry_after is None or item.attempts >= self.max_attempts
+        with self._cond:
+            self._counters["failed" if permanent else "retried"] += 1
+            if isinstance(e, apihelper.ApiTelegramException) and e.error_code == 429:
+                self._counters["flood_waits"] += 1
+        if permanent:
+            print(f"[{self.name}] {item.kind} para {item.chat_id} descartado após {item.attempts} tentativa(s): {e}")
+            self._store_state(item, "failed", str(e))
+            self._finish(item)
+            return
+        if isinstance(e, apihelper.ApiTelegramException) and e.error_code == 429 and int(item.chat_id) > 0:
+            self._bucket.penalize(retry_after)
+        retry_at = time.time() + retry_after
+        self._store_state(item, "pending", str(e), retry_at)
+        self._finish(item, retry_at=retry_at)
+
+    def _retry_after(self, e, attempts):
+        """Segundos até tentar de novo; None = erro definitivo."""
+        if isinstance(e, apihelper.ApiTelegramException):
+            if e.error_code == 429:
+                params = (e.result_json or {}).get("parameters") or {}
+                return float(params.get("retry_after", RETRY_BASE))
+            if e.error_code < 500:
+                return None  # 400/403: chat bloqueou o bot, texto inválido...
+        elif not isinstance(e, (apihelper.ApiHTTPException, requests.RequestException)):
+            return None
+        return min(RETRY_MAX, RETRY_BASE ** attempts)
+
+    def _store_state(self, item, status, error, not_before=0.0):
+        with self._db_lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, not_before = ?, error = ? WHERE id = ?",
+                (status, item.attempts, not_before, error[:500], item.id),
+            )
+            self._conn.commit()
+
+    # ---------- envio ----------
+
+    def _deliver(self, item):
+        p = item.payload
+        if item.kind == "text":
+            try:
+                self._bot.send_message(item.chat_id, p["text"], parse_mode=p.get("parse_mode"))
+            except apihelper.ApiTelegramException as e:
+                # Markdown inválido (ex.: '_' num símbolo) não deve perder a mensagem
+                if e.error_code == 400 and p.get("parse_mode") and "parse" in e.description.lower():
+                    self._bot.send_message(item.chat_id, p["text"])
+                else:
+                    raise
+        elif item.kind == "document":
+            self._deliver_document(item.chat_id, p["path"], p.get("caption"))
+        else:
+            raise ValueError(f"tipo de envio desconhecido: {item.kind}")
+
+    def _deliver_document(self, chat_id, path, caption):
+        # um upload por arquivo: os outros workers esperam o file_id em vez de subir de novo
+        with self._cond:
+            lock = self._upload_locks.setdefault(path, threading.Lock())
+        with lock:
+            self._send_file(chat_id, path, caption)
+
+    def _send_file(self, chat_id, path, caption):
+        file_id = self.file_id(path)
+        if file_id:
+            try:
+                self._bot.send_document(chat_id, file_id, caption=caption)
+                with self._cond:
+                    self._counters["files_reused"] += 1
+                return
+            except apihelper.ApiTelegramException as e:
+                if e.error_code != 400:
+                    raise
+                self._forget_file(path)  # file_id expirado/inválido: sobe de novo
+        with open(path, "rb") as f:
+            sent = self._bot.send_document(chat_id, f, caption=caption)
+        with self._cond:
+            self._counters["files_uploaded"] += 1
+        if sent is not None and getattr(sent, "document", None) is not None:
+            self._remember_file(path, sent.document.file_id)
+
+    def _file_stat(self, path):
+        try:
+            st = os.stat(path)
+            return st.st_size, st.st_mtime
+        except OSError:
+            return None, None
+
+    def file_id(self, path):
+        """file_id já conhecido do arquivo (None se nunca subiu ou se mudou desde o upload)."""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT size, mtime, file_id FROM outbox_files WHERE path = ?", (os.path.abspath(path),)
+            ).fetchone()
+        if row is None:
+            return None
+        size, mtime = self._file_stat(path)
+        if size is not None and (size, mtime) != (row[0], row[1]):
+            return None  # mesmo caminho, conteúdo novo
+        return row[2]   # inclusive para arquivo já apagado do disco (limpeza de CSVs)
+
+    def _remember_file(self, path, file_id):
+        size, mtime = self._file_stat(path)
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outbox_files (path, size, mtime, file_id, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (os.path.abspath(path), size, mtime, file_id, time.time()),
+            )
+            self._conn.commit()
+
+    def _forget_file(self, path):
+        with self._db_lock:
+            self._conn.execute("DELETE FROM outbox_files WHERE path = ?", (os.path.abspath(path),))
+            self._conn.commit()
+
+    # ---------- monitoramento ----------
+
+    def metrics(self):
+        with self._cond:
+            out = dict(self._counters)
+            out["pending"] = sum(len(q) for q in self._queues.values())
+            out["chats"] = len(self._queues)
+        with self._db_lock:
+            out["failed_stored"] = self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = 'failed'"
+            ).fetchone()[0]
+        return out
+
+    def close(self):
+        self.stop()
+        self._conn.close()
+
+
+# Fila compartilhada de envios do bot (start(bot) no main)
+outbox = Outbox()
+
+
+# ==========================
+# Teste com API falsa: python -m bot.outbox   (de dentro de bot_cripto/)
+# ==========================
+if __name__ == "__main__":
+    import tempfile
+    from urllib.parse import parse_qs, urlsplit
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    import telebot
+
+    received = []           # (chat_id, método, texto/arquivo)
+    flood = {"left": 2}     # primeiros sendMessage levam 429
+
+    class FakeTelegram(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            # o telebot manda os parâmetros na query string e o arquivo em multipart
+            url = urlsplit(self.path)
+            method = url.path.rsplit("/", 1)[-1]
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            chat_id = int(params["chat_id"])
+            message = {"message_id": len(received) + 1, "date": int(time.time()),
+                       "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "group"}}
+            if method == "sendMessage":
+                with lock:
+                    if flood["left"] > 0:
+                        flood["left"] -= 1
+                        return self._reply(429, {"ok": False, "error_code": 429,
+                                                 "description": "Too Many Requests: retry after 1",
+                                                 "parameters": {"retry_after": 1}})
+                    received.append((chat_id, method, params["text"]))
+                message["text"] = params["text"]
+            elif method == "sendDocument":
+                with lock:
+                    received.append((chat_id, method, params.get("document", "upload")))
+                message["document"] = {"file_id": "FILE-1", "file_unique_id": "u1"}
+            return self._reply(200, {"ok": True, "result": message})
+
+    lock = threading.Lock()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTelegram)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    apihelper.API_URL = f"http://127.0.0.1:{server.server_address[1]}/bot{{0}}/{{1}}"
+
+    tmp = tempfile.mkdtemp(prefix="outbox_")
+    csv_path = os.path.join(tmp, "historico.csv")
+    with open(csv_path, "w") as f:
+        f.write("symbol,price\nBTC,1\n")
+    long_text = "\n".join(f"linha {k:04d} " + "x" * 60 for k in range(200))  # ~14 mil caracteres
+
+    box = Outbox(os.path.join(tmp, "outbox.db"), chat_interval=0.2, group_interval=0.5)
+    chats = [101, 102, -103]
+    for chat in chats:
+        box.send_text(chat, long_text)
+        box.send_document(chat, csv_path)
+    t0 = time.perf_counter()
+    box.start(telebot.TeleBot("123:fake"))
+    while box.metrics()["pending"]:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - t0
+    box.close()
+    server.shutdown()
+
+    for chat in chats:
+        got = [r for r in received if r[0] == chat]
+        texts = [r[2] for r in got if r[1] == "sendMessage"]
+        assert "\n".join(texts) == long_text and all(len(t) <= MESSAGE_LIMIT for t in texts), chat
+        assert got[-1][1] == "sendDocument", chat  # ordem do chat preservada
+    docs = [r[2] for r in received if r[1] == "sendDocument"]
+    assert docs.count("upload") == 1 and docs.count("FILE-1") == len(chats) - 1, docs
+    m = box._counters
+    print(f"{len(received)} envios para {len(chats)} chats em {elapsed:.2f}s — partes de até {MESSAGE_LIMIT} caracteres")
+    print(f"429 respeitados: {m['flood_waits']} | uploads: {m['files_uploaded']} | via file_id: {m['files_reused']}")
@@ -2,6 +2,8 @@ import os
 import telebot
 from dotenv import load_dotenv
 
+from utils.jobs import jobs
+
 load_dotenv()
 
 TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -17,6 +19,15 @@ class TelegramBot:
         @bot.message_handler(commands=["analise", "atualizar"])
         def send_report(msg):
             from analysis.market_analysis_ import generate_report
-            bot.send_message(CHAT_ID, generate_report())
+            # Gera fora da thread do polling; pedidos repetidos usam o mesmo job
+            coalesced = jobs.submit(
+                "report_",
+                generate_report,
+                on_done=lambda report: bot.send_message(CHAT_ID, report),
+                on_error=lambda e: bot.send_message(CHAT_ID, f"Erro ao gerar análise: {e}"),
+                subscriber=CHAT_ID,
+            )
+            if not coalesced:
+                bot.send_message(CHAT_ID, "⏳ Gerando análise...")
 
         bot.infinity_polling()
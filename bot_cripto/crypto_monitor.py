@@ -1,29 +1,62 @@
 import os
-import re
-import json
 import time
 import csv
+import hashlib
+import re
 import threading
-from datetime import datetime, timedelta
+from collections import OrderedDict, deque
+from itertools import islice
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 
-import requests
 import pandas as pd
 from dotenv import load_dotenv
 import telebot
 
+from utils import http_client
+from utils.cache import cache, cached
+from utils.fetch_engine import fetch_all, DEFAULT_DEADLINE
+from utils.jobs import jobs
+from utils.next_data import extract_next_data as parse_next_data, PAGE_PROPS
+from utils.json_path import iter_numbers, paths as json_paths
+from storage.price_history import PriceHistoryStore
+from storage.market_history import MarketHistoryStore
+from storage.scrape_cache import ScrapeCache
+from storage.subscriptions import SubscriptionStore, parse_send_time
+from analysis.indicators import compute_indicators
+from utils.scheduler import scheduler, get_tz, tz_label
+from bot.outbox import outbox
+from analysis.alerts import AlertEngine, BinanceMiniTickerSource, binance_history
+
 # ==========================
 # Config & Globals
 # ==========================
 load_dotenv()
 
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "").strip()
-SEND_TIME = os.getenv("SEND_TIME", "21:00").strip()  # HH:MM (hora local do servidor)
+TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "").strip()  # opcional: assinado no primeiro start
+SEND_TIME = os.getenv("SEND_TIME", "21:00").strip()  # HH:MM padrão das assinaturas (hora local do servidor ou SCHEDULER_TZ)
 API_KEY = os.getenv("COINMARKETCAP_API_KEY").strip()
 API_KEY_CG= os.getenv("COINGECKO_API_KEY").strip()
-
-if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
-    raise RuntimeError("Defina TELEGRAM_TOKEN e TELEGRAM_CHAT_ID no .env ou ambiente.")
+PRICE_DB = os.getenv("PRICE_DB", "price_history.db")
+BTC_BACKFILL_DAYS = int(os.getenv("BTC_BACKFILL_DAYS", "730"))  # >365 exige plano pago no CoinGecko
+REPORT_FRESHNESS = int(os.getenv("REPORT_FRESHNESS", "300"))  # segundos em que um snapshot/relatório é reaproveitado
+HISTORY_DB = os.getenv("HISTORY_DB", "market_history.db")
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")  # CSVs exportados para o Telegram
+HISTORY_RAW_DAYS = int(os.getenv("HISTORY_RAW_DAYS", "30"))  # depois disso, 1 ciclo por dia
+HISTORY_KEEP_DAYS = int(os.getenv("HISTORY_KEEP_DAYS", "0")) or None  # 0 = manter para sempre
+CLEANUP_CRON = os.getenv("CLEANUP_CRON", "0 4 * * *")  # limpeza de CSVs + compactação do histórico
+PRICE_SYNC_CRON = os.getenv("PRICE_SYNC_CRON", "5 * * * *")  # completa o histórico do BTC
+WARM_LEAD_MINUTES = int(os.getenv("WARM_LEAD_MINUTES", "5"))  # relatório pronto X min antes de cada envio
+PEAK_HOURS = int(os.getenv("PEAK_HOURS", "3"))  # horas de mais uso do /analisar aquecidas
+PEAK_MIN_USES = int(os.getenv("PEAK_MIN_USES", "5"))  # uso mínimo para a hora contar como pico
+SCRAPE_DB = os.getenv("SCRAPE_DB", "scrape_cache.db")  # validadores HTTP + resultados parseados
+SUBSCRIPTIONS_DB = os.getenv("SUBSCRIPTIONS_DB", "subscriptions.db")  # chats assinantes, horários e watchlists
+ALERTS_ENABLED = os.getenv("ALERTS_ENABLED", "0") == "1"  # alertas em tempo real (feed da Binance)
+ALERT_COOLDOWN = int(os.getenv("ALERT_COOLDOWN", "3600"))  # mínimo entre alertas do mesmo símbolo/regra
+
+if not TELEGRAM_TOKEN:
+    raise RuntimeError("Defina TELEGRAM_BOT_TOKEN no .env ou ambiente.")
 
 bot = telebot.TeleBot(TELEGRAM_TOKEN)
 
@@ -43,40 +76,32 @@ DEFAULT_HEADERS = {
 # ==========================
 def deep_find_numbers(obj, predicate=None, limit=None):
     """
-    Percorre recursivamente dict/list e retorna números.
+    Percorre dict/list (iterativo, sem recursão) e retorna números.
     predicate: função que recebe (num) -> bool para filtrar.
-    limit: se definido, retorna no máximo 'limit' elementos (do fim).
-    """
-    out = []
-
-    def walk(x):
-        nonlocal out
-        if isinstance(x, dict):
-            for v in x.values():
-                walk(v)
-        elif isinstance(x, list):
-            for it in x:
-                walk(it)
-        else:
-            if isinstance(x, (int, float)):
-                if (predicate is None) or predicate(x):
-                    out.append(float(x))
-
-    walk(obj)
-    if limit is not None and len(out) > limit:
-        return out[-limit:]
+    limit: se definido, retorna no máximo 'limit' elementos (do fim); a varredura
+           começa pelo fim do documento e para assim que encontrar 'limit' números.
+    """
+    if limit is None:
+        return list(iter_numbers(obj, predicate))
+    out = list(islice(iter_numbers(obj, predicate, reverse=True), limit))
+    out.reverse()
     return out
 
-def extract_next_data(url):
-    """Extrai o JSON do __NEXT_DATA__ de uma página Next.js."""
+scrape_store = ScrapeCache(SCRAPE_DB)
+
+
+@cached("cmc_next_data", ttl=6 * 3600, stale_ttl=24 * 3600)
+def extract_next_data(url, pointer=PAGE_PROPS):
+    """
+    Extrai o JSON do __NEXT_DATA__ de uma página Next.js.
+    pointer: JSON pointer da subárvore desejada ("" = documento inteiro).
+    Requisição condicional: com 304 ou corpo idêntico devolve o resultado salvo.
+    """
     try:
-        r = requests.get(url, headers=DEFAULT_HEADERS, timeout=25)
-        r.raise_for_status()
-        html = r.text
-        m = re.search(r'__NEXT_DATA__" type="application/json">(.+?)</script>', html)
-        if not m:
-            return None
-        return json.loads(m.group(1))
+        return scrape_store.fetch(
+            url, lambda body: parse_next_data(body, pointer), parser=f"next_data:{pointer}",
+            headers=DEFAULT_HEADERS, timeout=25,
+        )
     except Exception:
         return None
     
@@ -89,6 +114,7 @@ def to_usd_b(num):
 # ==========================
 # Scraping CMC - Listings (TOP 100)
 # ==========================
+@cached("cmc_listings", ttl=180, stale_ttl=600)
 def fetch_cmc_listings(limit=100):
     """
     Usa o endpoint interno do CMC (gratuito) para obter as top moedas.
@@ -99,7 +125,7 @@ def fetch_cmc_listings(limit=100):
     try:
         url = "https://api.coinmarketcap.com/data-api/v3/cryptocurrency/listing"
         params = {"start": 1, "limit": limit, "convert": "USD"}
-        r = requests.get(url, headers=DEFAULT_HEADERS, params=params, timeout=25)
+        r = http_client.get(url, headers=DEFAULT_HEADERS, params=params, timeout=25)
         r.raise_for_status()
         payload = r.json()
         data = payload.get("data", {}).get("cryptoCurrencyList", [])
@@ -134,6 +160,7 @@ def fetch_cmc_listings(limit=100):
 # ==========================
 # Scraping CMC - BTC Dominance (endpoint interno estável)
 # ==========================
+@cached("cmc_btc_dominance", ttl=300, stale_ttl=900)
 def fetch_cmc_btc_dominance():
     """
     Usa endpoint interno do CMC de métricas globais (gratuito).
@@ -143,7 +170,7 @@ def fetch_cmc_btc_dominance():
     """
     try:
         url = "https://api.coinmarketcap.com/data-api/v3/global-metrics/quotes/latest"
-        r = requests.get(url, headers=DEFAULT_HEADERS, timeout=25)
+        r = http_client.get(url, headers=DEFAULT_HEADERS, timeout=25)
         r.raise_for_status()
         data = r.json().get("data", {})
         dom = data.get("btcDominance")
@@ -155,12 +182,13 @@ def fetch_cmc_btc_dominance():
 # ==========================
 # Scraping CMC - Fear & Greed (página pública)
 # ==========================
+@cached("cmc_fear_greed", ttl=3 * 3600, stale_ttl=24 * 3600)
 def fetch_cmc_fear_greed():
     url = "https://pro-api.coinmarketcap.com/v3/fear-and-greed/latest"
     headers = {
         "X-CMC_PRO_API_KEY": API_KEY,
     }
-    resp = requests.get(url, headers=headers, timeout=10)
+    resp = http_client.get(url, headers=headers, timeout=10)
     resp.raise_for_status()
     result = resp.json()
     data = result.get("data")
@@ -174,12 +202,17 @@ def fetch_cmc_fear_greed():
 # ==========================
 # Scraping CMC - Altcoin Season (página pública, melhor effort)
 # ==========================
-def fetch_cmc_altcoin_season(limit=100):
+def fetch_cmc_altcoin_season(limit=100, listings=None):
     """
     Calcula um índice de 'Altcoin Season' baseado no market cap
     comparando BTC vs todas as outras moedas.
+    listings: lista já baixada (ex.: snapshot.listings); se None, busca no CMC.
+    Retorna None sem listagem (ex.: o CMC estourou o prazo do snapshot).
     """
-    listings = fetch_cmc_listings(limit=limit)
+    if listings is None:
+        listings = fetch_cmc_listings(limit=limit)
+    if not listings:
+        return None
 
     btc_mc = sum(c['quote']['USD']['market_cap'] for c in listings if c['symbol'] == "BTC")
     alt_mc = sum(c['quote']['USD']['market_cap'] for c in listings if c['symbol'] != "BTC")
@@ -187,6 +220,8 @@ def fetch_cmc_altcoin_season(limit=100):
     print("BTC MarketCap:", btc_mc)
     print("Altcoins MarketCap:", alt_mc)
 
+    if btc_mc + alt_mc <= 0:
+        return None
     # proporção de altcoins no total
     alt_index = ((alt_mc / (btc_mc + alt_mc)) * 100) + 11  # seu ajuste extra (+7)
     return round(alt_index, 2)
@@ -196,7 +231,8 @@ def fetch_cmc_altcoin_season(limit=100):
 # ==========================
 def fetch_btc_prices(days=365):
     """
-    Retorna um DataFrame com preços diários do BTC nos últimos 'days' dias.
+    Retorna um DataFrame com preços diários do BTC nos últimos 'days' dias
+    (índice em UTC, colunas price e volume).
     """
     headers = {
         "Accepts": "application/json",
@@ -209,24 +245,63 @@ def fetch_btc_prices(days=365):
         "days": days,
         "interval": "daily"
     }
-    response = requests.get(url,headers=headers, params=params)
+    response = http_client.get(url, headers=headers, params=params)
     response.raise_for_status()
     data = response.json()
 
-    # Extrai timestamp e preço
-    prices = [(datetime.fromtimestamp(p[0] / 1000), p[1]) for p in data["prices"]]
+    # Extrai timestamp (UTC) e preço
+    prices = [
+        (datetime.fromtimestamp(p[0] / 1000, tz=timezone.utc).replace(tzinfo=None), p[1])
+        for p in data["prices"]
+    ]
     df = pd.DataFrame(prices, columns=["date", "price"])
+    volumes = [v[1] for v in data.get("total_volumes", [])]
+    if len(volumes) == len(df):
+        df["volume"] = volumes
     df.set_index("date", inplace=True)
     return df
 
+# ==========================
+# Histórico local do BTC (incremental)
+# ==========================
+price_store = PriceHistoryStore(PRICE_DB)
+_price_sync_lock = threading.Lock()
+
+def sync_btc_prices(max_age=3600):
+    """
+    Completa o store local só com os dias desde o último ponto gravado.
+    Na primeira execução faz o backfill de BTC_BACKFILL_DAYS (cai para 365 se o plano não permitir).
+    O dia corrente é revalidado no máximo a cada 'max_age' segundos.
+    """
+    with _price_sync_lock:
+        missing = price_store.missing_days("BTC")
+        last_update = price_store.last_update("BTC") or 0
+        if missing == 1 and time.time() - last_update < max_age:
+            return 0
+        if missing is None:
+            try:
+                df = fetch_btc_prices(days=BTC_BACKFILL_DAYS)
+            except Exception as e:
+                print(f"[sync_btc_prices] backfill de {BTC_BACKFILL_DAYS} dias falhou ({e}); usando 365")
+                df = fetch_btc_prices(days=365)
+        else:
+            df = fetch_btc_prices(days=missing)
+        return price_store.upsert("BTC", df)
+
+def load_btc_prices(days=730):
+    """Preços diários do BTC (últimos 'days' dias) lidos do store local, após sincronizar o delta."""
+    try:
+        sync_btc_prices()
+    except Exception as e:
+        print(f"[load_btc_prices] sync falhou, usando histórico local: {e}")
+    return price_store.load("BTC", days=days)
+
 # ==========================
 # Função para calcular Puell Multiple
 # ==========================
 def calculate_puell_multiple(prices_df, btc_mined_per_day=900):
-    prices_df["miner_revenue"] = prices_df["price"] * btc_mined_per_day
-    prices_df["revenue_ma365"] = prices_df["miner_revenue"].rolling(window=365).mean()
-    prices_df["puell_multiple"] = prices_df["miner_revenue"] / prices_df["revenue_ma365"]
-    latest_value = round(prices_df["puell_multiple"].iloc[-1], 2)
+    # Não altera o DataFrame recebido (pode vir de um MarketSnapshot compartilhado)
+    latest_value = round(compute_indicators(prices_df, btc_mined_per_day)["puell"], 2)
 
     # Classificação
     if latest_value < 0.5:
@@ -247,45 +322,42 @@ def calculate_pi_cycle_top(prices_df):
     Calcula o status do Pi Cycle Top.
     Retorna True se SMA 111 dias > 2 * SMA 350 dias.
     """
-    prices_df["sma_111"] = prices_df["price"].rolling(window=111).mean()
-    prices_df["sma_350"] = prices_df["price"].rolling(window=350).mean()
-
-    latest = prices_df.iloc[-1]
-
     # Checa se o cruzamento ocorreu (último dia SMA111 > 2*SMA350)
-    crossed = False
-    if not pd.isna(latest["sma_111"]) and not pd.isna(latest["sma_350"]):
-        crossed = latest["sma_111"] > 2 * latest["sma_350"]
-
-    return crossed
+    return compute_indicators(prices_df)["pi_cycle"]
 
-def fetch_cmc100_index():
-    url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest"
-    headers = {
-        "X-CMC_PRO_API_KEY": API_KEY,
-    }
-    params = {
-        "start": "1",
-        "limit": "100",  # Top 100 moedas
-        "convert": "USD"
-    }
+def fetch_cmc100_index(listings=None):
+    """
+    Índice CMC100 aproximado a partir do top 100.
+    listings: lista no formato de fetch_cmc_listings() (ex.: snapshot.listings).
+    Se None, baixa o top 100 pela API pro do CMC.
+    """
+    if listings is None:
+        url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest"
+        headers = {
+            "X-CMC_PRO_API_KEY": API_KEY,
+        }
+        params = {
+            "start": "1",
+            "limit": "100",  # Top 100 moedas
+            "convert": "USD"
+        }
 
-    try:
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
-        resp.raise_for_status()
-        data = resp.json().get("data")
-    except Exception as e:
-        print("Erro ao acessar API CoinMarketCap:", e)
-        return None
+        try:
+            resp = http_client.get(url, headers=headers, params=params, timeout=10)
+            resp.raise_for_status()
+            listings = resp.json().get("data")
+        except Exception as e:
+            print("Erro ao acessar API CoinMarketCap:", e)
+            return None
 
-    if not data:
+    if not listings:
         return None
 
     # Calcula índice ponderado pelo market cap
     total_index = 0
-    for coin in data:
-        price = coin["quote"]["USD"]["price"]
-        market_cap = coin["quote"]["USD"]["market_cap"]
+    for coin in listings:
+        price = coin["quote"]["USD"]["price"] or 0
+        market_cap = coin["quote"]["USD"]["market_cap"] or 0
         total_index += price * market_cap / 1e12  # escala para não ficar gigantesco
 
     if total_index <= 10:
@@ -298,6 +370,95 @@ def fetch_cmc100_index():
     # Retorna com 2 casas decimais
     return round(indice_ajustado, 2)
 
+# ==========================
+# Snapshot de mercado (uma coleta por ciclo)
+# ==========================
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """
+    Fotografia imutável dos dados de mercado de um ciclo de relatório.
+    Todos os indicadores, sinais e alocações de um mesmo relatório leem daqui,
+    então cada fonte é consultada uma única vez e os números são coerentes entre si.
+    Não altere listings/btc_prices: o objeto é compartilhado.
+    """
+    taken_at: datetime
+    listings: tuple = ()
+    fear_greed_val: int = None
+    fear_greed_text: str = None
+    btc_dom: float = None
+    btc_prices: pd.DataFrame = field(default=None, repr=False, compare=False)
+    version: str = ""
+
+    @property
+    def btc(self):
+        return next((x for x in self.listings if x["symbol"] == "BTC"), None)
+
+    @property
+    def alts(self):
+        return [x for x in self.listings if x["symbol"] != "BTC"]
+
+
+def build_market_snapshot(limit=100, days=730, deadline=DEFAULT_DEADLINE):
+    """
+    Coleta, uma única vez, tudo o que o relatório precisa:
+    top 'limit' do CMC, Fear & Greed, dominância do BTC e 'days' dias de preço do BTC.
+    As fontes são buscadas em paralelo com prazo global 'deadline' (segundos).
+    """
+    # Fontes independentes em paralelo; quem estourar o prazo vira None
+    data = fetch_all({
+        "listings": lambda: fetch_cmc_listings(limit=limit),
+        "fear_greed": fetch_cmc_fear_greed,
+        "btc_dom": fetch_cmc_btc_dominance,
+        "btc_prices": lambda: load_btc_prices(days=days),
+    }, deadline=deadline)
+    fear_val, fear_text = data["fear_greed"] or (None, None)
+    btc_dom = data["btc_dom"]
+    btc_prices = data["btc_prices"]
+    listings = tuple(data["listings"] or ())
+
+    return MarketSnapshot(
+        taken_at=datetime.now(),
+        listings=listings,
+        fear_greed_val=fear_val,
+        fear_greed_text=fear_text,
+        btc_dom=btc_dom,
+        btc_prices=btc_prices,
+        version=snapshot_version(listings, fear_val, btc_dom, btc_prices),
+    )
+
+def snapshot_version(listings, fear_val, btc_dom, btc_prices):
+    """
+    Hash do conteúdo do snapshot: se nenhuma fonte mudou (ex.: tudo veio do cache),
+    a versão é a mesma e o relatório já renderizado é reaproveitado.
+    """
+    h = hashlib.sha1()
+    for c in listings:
+        q = c["quote"]["USD"]
+        h.update(repr((c["symbol"], q.get("price"), q.get("market_cap"), q.get("volume_24h"),
+                       q.get("percent_change_24h"), q.get("percent_change_7d"))).encode())
+    h.update(repr((fear_val, btc_dom)).encode())
+    if btc_prices is not None and not btc_prices.empty:
+        h.update(repr((str(btc_prices.index[-1]), float(btc_prices["price"].iloc[-1]), len(btc_prices))).encode())
+    return h.hexdigest()[:16]
+
+_snapshot_lock = threading.Lock()
+_latest_snapshot = None
+
+def get_market_snapshot(max_age=REPORT_FRESHNESS):
+    """
+    Reaproveita o último snapshot se tiver menos de 'max_age' segundos; senão coleta um novo.
+    Snapshot sem listagem (CMC fora do prazo) é usado uma vez e não fica guardado.
+    """
+    global _latest_snapshot
+    with _snapshot_lock:
+        snap = _latest_snapshot
+        if snap is not None and (datetime.now() - snap.taken_at).total_seconds() < max_age:
+            return snap
+        snap = build_market_snapshot()
+        if snap.listings:
+            _latest_snapshot = snap
+        return snap
+
 # ==========================
 # Classificação Altcoins
 # ==========================
@@ -417,20 +578,25 @@ def generate_signals(blue, mid, low, indices):
 # ======================
 ## Calculo Conservador
 # ======================
-def compute_btc_ma():
-    df = fetch_btc_prices(365)  # últimos 400 dias
-    df["MA50"] = df["price"].rolling(50).mean()
-    df["MA200"] = df["price"].rolling(200).mean()
-    latest = df.iloc[-1]
-    return latest["price"], latest["MA50"], latest["MA200"]
-
-def compute_dynamic_conservative_allocation():
-    fng_value, fng_class = fetch_cmc_fear_greed()
-    price, ma50, ma200 = compute_btc_ma()
+def compute_btc_ma(prices_df=None):
+    if prices_df is None:
+        prices_df = load_btc_prices(365)  # últimos 365 dias
+    ind = compute_indicators(prices_df)
+    return ind["price"], ind["ma50"], ind["ma200"]
+
+def compute_dynamic_conservative_allocation(snapshot=None):
+    if snapshot is None:
+        snapshot = build_market_snapshot()
+    fng_value, fng_class = snapshot.fear_greed_val, snapshot.fear_greed_text
+    if snapshot.btc_prices is not None and not snapshot.btc_prices.empty:
+        price, ma50, ma200 = compute_btc_ma(snapshot.btc_prices)
+    else:
+        price, ma50, ma200 = None, None, None
+    has_ma = price is not None and not pd.isna(ma50) and not pd.isna(ma200)
 
     # Condições
-    bear = (fng_value is not None and fng_value < 35) or (price < ma200)
-    bull = (fng_value is not None and fng_value > 60) and (price > ma200) and (ma50 > ma200)
+    bear = (fng_value is not None and fng_value < 35) or (has_ma and price < ma200)
+    bull = (fng_value is not None and fng_value > 60) and has_ma and (price > ma200) and (ma50 > ma200)
 
     if bear:
         alloc = {
@@ -472,46 +638,46 @@ def top_summary(title, coins, n=5):
     return "\n".join(lines) + "\n"
 
 
-def save_history_csv(all_listings):
-    now = datetime.now().strftime("%Y%m%d_%H%M%S")
-    fname = f"historico_{now}.csv"
-    rows = []
-    for c in all_listings:
-        q = c["quote"]["USD"]
-        rows.append({
-            "name": c["name"],
-            "symbol": c["symbol"],
-            "price": q.get("price"),
-            "market_cap": q.get("market_cap"),
-            "volume_24h": q.get("volume_24h"),
-            "pct_24h": q.get("percent_change_24h"),
-            "pct_7d": q.get("percent_change_7d"),
-        })
-    df = pd.DataFrame(rows)
-    df.to_csv(fname, index=False)
-    return fname
+history_store = MarketHistoryStore(HISTORY_DB)
+
+def save_history_csv(all_listings, taken_at=None):
+    """
+    Acrescenta o ciclo ao histórico (SQLite) e exporta só esse ciclo em CSV
+    para o envio no Telegram. Retorna o caminho do CSV.
+    """
+    ts = history_store.append(all_listings, taken_at)
+    return history_store.export_csv(ts, EXPORT_DIR)
 
 
 # ==========================
 # Geração do Relatório
 # ==========================
-def generate_report():
-    # 1) Dados de mercado
-    listings = fetch_cmc_listings(limit=100)
-    btc = next((x for x in listings if x["symbol"] == "BTC"), None)
-    alts = [x for x in listings if x["symbol"] != "BTC"]
+def _fmt(value, spec):
+    """Índice formatado, ou 'n/d' quando a fonte não respondeu a tempo."""
+    return "n/d" if value is None else spec.format(value)
+
+def generate_report(snapshot=None):
+    # 1) Dados de mercado (uma única coleta por relatório)
+    if snapshot is None:
+        snapshot = build_market_snapshot()
+    listings = snapshot.listings
+    btc = snapshot.btc
+    alts = snapshot.alts
 
     # 2) Classificação dinâmica
     blue, mid, low = classify_altcoins_dynamic(alts)
 
-    # 3) Índices
-    fear_val, fear_text = fetch_cmc_fear_greed()
-    alt_season_cmc = fetch_cmc_altcoin_season()
-    btc_dom = fetch_cmc_btc_dominance()
-    df_btc = fetch_btc_prices(days=365)  # últimos 2 anos
-    puell_value, puell_status = calculate_puell_multiple(df_btc)
-    pi_cycle_status = calculate_pi_cycle_top(df_btc)
-    cmc100 = fetch_cmc100_index()
+    # 3) Índices (todos derivados do mesmo snapshot)
+    fear_val, fear_text = snapshot.fear_greed_val, snapshot.fear_greed_text
+    alt_season_cmc = fetch_cmc_altcoin_season(listings=listings)
+    btc_dom = snapshot.btc_dom
+    df_btc = snapshot.btc_prices
+    if df_btc is not None and not df_btc.empty:
+        puell_value, puell_status = calculate_puell_multiple(df_btc)
+        pi_cycle_status = calculate_pi_cycle_top(df_btc)
+    else:
+        puell_value, puell_status, pi_cycle_status = None, None, False
+    cmc100 = fetch_cmc100_index(listings=listings)
 
     indices = {
         "fear_greed_val": fear_val,
@@ -528,19 +694,17 @@ def generate_report():
     signals = generate_signals( blue, mid, low, indices)
 
     # 5) Montagem do relatório
-    msg = f"📊 *Relatório Diário* — {datetime.now().strftime('%d/%m/%Y %H:%M')}\n\n"
+    msg = f"📊 *Relatório Diário* — {snapshot.taken_at.strftime('%d/%m/%Y %H:%M')}\n\n"
     
     # Índices
     msg += "📈 *Índices de Mercado*\n"
     if fear_val is not None:
         msg += f"- Fear & Greed (CMC): {fear_val} ({fear_text})\n"
-    if alt_season_cmc is not None:
-        msg += f"- Altcoin Season (CMC): {alt_season_cmc:.2f}\n"
+    msg += f"- Altcoin Season (CMC): {_fmt(alt_season_cmc, '{:.2f}')}\n"
     if puell_value is not None:
         msg += f"- Status do Múltiplo de Puell* (CG): {puell_value:.2f} → {puell_status} \n"
         msg += f"- Pi Cycle Top Status* : {'Topo do Ciclo' if pi_cycle_status else 'Não está no topo/Não cruzou'} \n"
-    if cmc100 is not None:
-        msg += f"- CMC100 Index: ${cmc100:.2f}\n"
+    msg += f"- CMC100 Index: {_fmt(cmc100, '${:.2f}')}\n"
     
     msg += "\n🛒 Recomendações do mercado\n"
     msg += f"*Recomendação BTC*: {signals['btc_reco']}\n"
@@ -585,7 +749,7 @@ def generate_report():
     msg += f"- Low Caps: {int(total_l/total*100)}%\n"
 
     
-    alloc, phase, fng_val, fng_class, price, ma50, ma200 = compute_dynamic_conservative_allocation()
+    alloc, phase, fng_val, fng_class, price, ma50, ma200 = compute_dynamic_conservative_allocation(snapshot)
 
     msg += f"\n*Diversificação Mais conservadora sugerida*\n"
 
@@ -597,7 +761,7 @@ def generate_report():
     msg+=" Pi Cycle Top: → indica se o mercado está próximo de um topo histórico do ciclo.\n"
 
     # CSV histórico
-    csv_file = save_history_csv(listings)
+    csv_file = save_history_csv(listings, snapshot.taken_at)
 
     return msg, csv_file
 
@@ -605,53 +769,355 @@ def generate_report():
 # ==========================
 # Telegram: comando manual
 # ==========================
+@dataclass
+class RenderedReport:
+    version: str
+    msg: str
+    csv_file: str
+    quotes: dict = field(default_factory=dict, repr=False)  # símbolo -> (preço, variação 24h) p/ watchlists
+    data_at: datetime = None  # coleta mais recente que confirmou estes dados (frescor no envio)
+
+_reports_lock = threading.Lock()
+_reports = OrderedDict()  # versão do snapshot -> RenderedReport
+
+def get_report(max_age=REPORT_FRESHNESS):
+    """
+    Relatório memoizado pela versão do snapshot: dentro da janela de frescor,
+    mensagem e CSV já prontos são só consultados num dicionário.
+    """
+    snapshot = get_market_snapshot(max_age)
+    with _reports_lock:
+        report = _reports.get(snapshot.version)
+        if report is not None and (os.path.exists(report.csv_file) or outbox.file_id(report.csv_file)):
+            report.data_at = max(report.data_at, snapshot.taken_at)
+            return report
+
+    msg, csv_file = generate_report(snapshot)
+    quotes = {c["symbol"]: (c["quote"]["USD"].get("price"), c["quote"]["USD"].get("percent_change_24h"))
+              for c in snapshot.listings}
+    report = RenderedReport(snapshot.version, msg, csv_file, quotes=quotes, data_at=snapshot.taken_at)
+    if not snapshot.listings:
+        return report  # relatório degradado: não memoiza (a próxima chamada tenta de novo)
+    with _reports_lock:
+        _reports[snapshot.version] = report
+        while len(_reports) > 4:
+            _reports.popitem(last=False)
+    return report
+
+def reply(chat_id, text, parse_mode=None):
+    """
+    Toda mensagem sai pelo outbox: fila persistente, limites do Telegram,
+    429/retry_after e quebra em partes de 4096 caracteres (ver bot/outbox.py).
+    """
+    outbox.send_text(chat_id, text, parse_mode=parse_mode)
+
+def md(text):
+    """
+    Escapa texto dinâmico (nomes de fontes, chaves do agendador, fusos) para o
+    Markdown legado do Telegram: só _ * ` [ têm escape; '_' solto vira itálico
+    e quebra a mensagem ("can't parse entities").
+    """
+    return re.sub(r"([_*`\[])", r"\\\1", str(text))
+
+def watchlist_summary(report, symbols):
+    lines = ["👀 *Sua watchlist*"]
+    for sym in symbols:
+        price, pct = report.quotes.get(sym, (None, None))
+        if price is None:
+            lines.append(f"- {sym}: fora do top 100")
+        elif pct is None:
+            lines.append(f"- {sym}: ${price:,.4f}")
+        else:
+            lines.append(f"- {sym}: ${price:,.4f} | 24h: {pct:.2f}%")
+    return "\n".join(lines)
+
+def deliver_report(chat_id, report, watchlist=()):
+    """
+    Mensagem + CSV (+ watchlist) para um chat, via outbox. O relatório é o mesmo
+    para todos os chats; o CSV sobe uma vez e os demais chats recebem o file_id.
+    """
+    reply(chat_id, report.msg, parse_mode="Markdown")
+    outbox.send_document(chat_id, report.csv_file)
+    if watchlist:
+        reply(chat_id, watchlist_summary(report, watchlist), parse_mode="Markdown")
+
+def request_report(chat_id, error_prefix="Erro ao gerar análise"):
+    """
+    Enfileira a geração do relatório e envia para chat_id quando ficar pronto.
+    Pedidos simultâneos compartilham o mesmo job. Retorna True se agrupado.
+    """
+    def on_done(report):
+        record_freshness("analisar", report)
+        sub = subscriptions.get(chat_id)
+        deliver_report(chat_id, report, sub.watchlist if sub else ())
+
+    return jobs.submit(
+        "report",
+        get_report,
+        on_done=on_done,
+        on_error=lambda e: reply(chat_id, f"{error_prefix}: {e}"),
+        subscriber=chat_id,
+    )
+
 @bot.message_handler(commands=["analisar", "analise", "atualizar"])
 def cmd_analisar(message):
-    try:
-        bot.send_message(TELEGRAM_CHAT_ID, "⏳ Gerando análise...")
-        msg, csv_file = generate_report()
-        bot.send_message(TELEGRAM_CHAT_ID, msg, parse_mode="Markdown")
-        with open(csv_file, "rb") as f:
-            bot.send_document(TELEGRAM_CHAT_ID, f)
-    except Exception as e:
-        bot.send_message(TELEGRAM_CHAT_ID, f"Erro ao gerar análise: {e}")
-        
+    # Não bloqueia o polling: o relatório roda no pool de jobs
+    chat_id = message.chat.id
+    subscriptions.record_command("analisar", datetime.now(get_tz()).hour)
+    coalesced = request_report(chat_id)
+    if coalesced:
+        reply(chat_id, "⏳ Análise já em andamento, envio assim que ficar pronta.")
+    else:
+        reply(chat_id, "⏳ Gerando análise...")
+
 # ==========================
-# Agendamento diário (sem cron)
+# Telegram: assinaturas (envio diário por chat)
 # ==========================
-def schedule_daily_send(send_time_str):
+subscriptions = SubscriptionStore(SUBSCRIPTIONS_DB)
+
+def send_scheduled(send_time):
     """
-    Envia todo dia no horário HH:MM indicado (horário local do servidor).
-    Roda em thread própria para não bloquear o bot.
+    Disparo de um horário: um relatório compartilhado, entregue a cada assinante do horário.
+    O aquecimento (warm_report) já deixou o relatório pronto: aqui só se transmite.
     """
-    hour, minute = map(int, send_time_str.split(":"))
+    subs = subscriptions.active(send_time)
+    if not subs:
+        return
+
+    def on_done(report):
+        record_freshness(f"envio {send_time}", report)
+        for sub in subs:
+            deliver_report(sub.chat_id, report, sub.watchlist)
+
+    def on_error(e):
+        for sub in subs:
+            reply(sub.chat_id, f"Erro no envio agendado: {e}")
+
+    # aceita o relatório aquecido (até WARM_LEAD_MINUTES + folga de idade)
+    max_age = max(REPORT_FRESHNESS, (WARM_LEAD_MINUTES + 2) * 60)
+    jobs.submit("report", lambda: get_report(max_age=max_age), on_done=on_done, on_error=on_error,
+                subscriber=f"agenda {send_time}")
+
+# ==========================
+# Aquecimento: relatório pronto antes dos envios e dos horários de pico
+# ==========================
+WARM_MAX_AGE = 60  # aquecimento reaproveita coleta de menos de 1 min; senão busca de novo
+
+_freshness_lock = threading.Lock()
+_freshness = deque(maxlen=100)  # (rótulo, idade dos dados em s, veio do aquecimento)
+_warmed = {"version": None, "at": None, "count": 0}
+
+def warm_report(reason):
+    """Coleta snapshot, indicadores e renderiza o relatório (mesmo job do /analisar)."""
+    def on_done(report):
+        with _freshness_lock:
+            _warmed.update(version=report.version, at=datetime.now(), count=_warmed["count"] + 1)
+        print(f"[warm_report] {reason}: relatório {report.version} pronto")
+
+    jobs.submit("report", lambda: get_report(max_age=WARM_MAX_AGE), on_done=on_done,
+                on_error=lambda e: print(f"[warm_report] {reason}: {e}"), subscriber=f"aquecer {reason}")
+
+def warm_peak_hour():
+    """Roda WARM_LEAD_MINUTES antes de toda hora cheia; aquece só se a hora seguinte for de pico."""
+    next_hour = (datetime.now(get_tz()) + timedelta(minutes=WARM_LEAD_MINUTES + 1)).hour
+    if next_hour in subscriptions.peak_hours("analisar", PEAK_HOURS, PEAK_MIN_USES):
+        warm_report(f"pico {next_hour:02d}h")
+
+def record_freshness(label, report):
+    """Idade dos dados no momento do envio (e se o relatório veio pronto do aquecimento)."""
+    age = (datetime.now() - report.data_at).total_seconds() if report.data_at else None
+    with _freshness_lock:
+        warmed = report.version == _warmed["version"]
+        _freshness.append((label, age, warmed))
+    if age is not None:
+        print(f"[freshness] {label}: dados com {age:.0f}s ({'aquecido' if warmed else 'coletado no envio'})")
+
+def freshness_stats():
+    with _freshness_lock:
+        ages = [a for _, a, _ in _freshness if a is not None]
+        warmed = sum(1 for _, _, w in _freshness if w)
+        out = {"deliveries": len(_freshness), "warmed": warmed, "warm_runs": _warmed["count"]}
+    if ages:
+        out.update(age_avg=sum(ages) / len(ages), age_max=max(ages), age_last=ages[-1])
+    return out
+
+def _minus_minutes(send_time, minutes):
+    h, m = map(int, send_time.split(":"))
+    return (datetime(2000, 1, 1, h, m) - timedelta(minutes=minutes)).strftime("%H:%M")
+
+def _schedule_time(key, prefix):
+    """'envio 09:00' -> '09:00'; None se a chave não for '<prefix>HH:MM' (ex.: 'aquecer picos')."""
+    if not key.startswith(prefix):
+        return None
+    rest = key[len(prefix):]
+    try:
+        return rest if parse_send_time(rest) == rest else None
+    except ValueError:
+        return None
+
+def sync_schedules():
+    """
+    Uma entrada no agendador por horário com assinantes; remove horários sem ninguém.
+    Envio perdido (bot fora do ar no horário) sai uma vez quando o bot volta.
+    """
+    times = set(subscriptions.send_times())
+    for key in scheduler.keys():
+        for prefix in ("envio ", "aquecer "):
+            t = _schedule_time(key, prefix)
+            if t is not None and t not in times:
+                scheduler.remove(key)
+    current = set(scheduler.keys())
+    for t in times:
+        if f"envio {t}" not in current:
+            scheduler.add(f"envio {t}", t, lambda t=t: send_scheduled(t), catch_up="once")
+        if WARM_LEAD_MINUTES and f"aquecer {t}" not in current:
+            scheduler.add(f"aquecer {t}", _minus_minutes(t, WARM_LEAD_MINUTES),
+                          lambda t=t: warm_report(f"envio {t}"))
+
+@bot.message_handler(commands=["assinar"])
+def cmd_assinar(message):
+    chat_id = message.chat.id
+    args = message.text.split()[1:]
+    current = subscriptions.get(chat_id)
+    try:
+        send_time = parse_send_time(args[0]) if args else (current.send_time if current else SEND_TIME)
+    except ValueError:
+        reply(chat_id, "Uso: /assinar HH:MM (ex.: /assinar 08:30)")
+        return
+    subscriptions.subscribe(chat_id, send_time)
+    sync_schedules()
+    reply(chat_id, f"✅ Relatório diário às {send_time}. Watchlist: /watchlist BTC ETH | Cancelar: /cancelar")
+
+@bot.message_handler(commands=["cancelar"])
+def cmd_cancelar(message):
+    chat_id = message.chat.id
+    if subscriptions.unsubscribe(chat_id):
+        sync_schedules()
+        reply(chat_id, "Assinatura cancelada. Para voltar: /assinar HH:MM")
+    else:
+        reply(chat_id, "Este chat não tem assinatura ativa.")
+
+@bot.message_handler(commands=["watchlist"])
+def cmd_watchlist(message):
+    chat_id = message.chat.id
+    symbols = message.text.split()[1:]
+    sub = subscriptions.get(chat_id)
+    if sub is None:
+        reply(chat_id, "Assine primeiro: /assinar HH:MM")
+        return
+    if symbols:
+        before = set(sub.watchlist)
+        sub = subscriptions.set_watchlist(chat_id, [s for arg in symbols for s in arg.split(",")])
+        added = [s for s in sub.watchlist if s not in before]
+        if alert_engine is not None and added:
+            jobs.submit(f"historico {chat_id}", lambda: seed_alerts(added),
+                        on_error=lambda e: print(f"[alerts] pré-carga {added}: {e}"))
+    reply(chat_id, f"Watchlist: {', '.join(sub.watchlist) or 'vazia'} | horário: {sub.send_time}")
 
-    def loop():
-        while True:
-            now = datetime.now()
-            target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            if now >= target:
-                target += timedelta(days=1)
-            wait = (target - now).total_seconds()
-            time.sleep(wait)
-            try:
-                msg, csv_file = generate_report()
-                bot.send_message(TELEGRAM_CHAT_ID, msg, parse_mode="Markdown")
-                with open(csv_file, "rb") as f:
-                    bot.send_document(TELEGRAM_CHAT_ID, f)
-            except Exception as e:
-                bot.send_message(TELEGRAM_CHAT_ID, f"Erro no envio agendado: {e}")
 
-    th = threading.Thread(target=loop, daemon=True)
-    th.start()
-    
 # ==========================
-# Função para limpar arquivos CSV antigos (> 7 dias)
+# Telegram: status / monitoramento
 # ==========================
-def cleanup_old_csv(folder=".", days=7):
+@bot.message_handler(commands=["status"])
+def cmd_status(message):
+    lines = ["*Cache (hits / stale / misses)*"]
+    for source, c in sorted(cache.stats().items()):
+        lines.append(f"- {md(source)}: {c['hits']} / {c['stale_hits']} / {c['misses']} (erros: {c['errors']})")
+    if len(lines) == 1:
+        lines.append("- vazio")
+    extractors = json_paths.stats()
+    if extractors:
+        lines.append("\n*Extratores JSON (caminho / varredura / falha)*")
+        for source, c in sorted(extractors.items()):
+            lines.append(f"- {md(source)}: {c['hits']} / {c['scans']} / {c['misses']}")
+    sc = scrape_store.stats()
+    lines.append("\n*Scraping (304 / corpo igual / parseado)*")
+    lines.append(f"- {sc['not_modified']} / {sc['unchanged']} / {sc['parsed']} (erros: {sc['errors']})")
+    m = jobs.metrics()
+    lines.append("\n*Jobs*")
+    lines.append(f"- na fila: {m['queued']} | rodando: {m['running']}")
+    lines.append(f"- concluídos: {m['completed']} | falhas: {m['failed']} | agrupados: {m['coalesced']}")
+    if "latency_avg" in m:
+        lines.append(f"- latência média: {m['latency_avg']:.1f}s | p95: {m['latency_p95']:.1f}s")
+    o = outbox.metrics()
+    lines.append("\n*Envios*")
+    lines.append(f"- enviados: {o['sent']} | falhas: {o['failed']} | pendentes: {o['pending']} ({o['chats']} chats)")
+    lines.append(f"- novas tentativas: {o['retried']} (429: {o['flood_waits']}) | "
+                 f"CSV por {md('file_id')}: {o['files_reused']} / uploads: {o['files_uploaded']}")
+    lines.append(f"- assinantes: {len(subscriptions.active())}")
+    fr = freshness_stats()
+    if "age_avg" in fr:
+        lines.append(f"- frescor no envio: médio {fr['age_avg']:.0f}s | último {fr['age_last']:.0f}s | "
+                     f"máx {fr['age_max']:.0f}s | aquecidos: {fr['warmed']}/{fr['deliveries']}")
+    if alert_engine is not None:
+        a = alert_engine.metrics()
+        lines.append("\n*Alertas em tempo real*")
+        lines.append(f"- símbolos: {a['symbols']} | ticks: {a['ticks']} | "
+                     f"alertas: {a['alerts']} (suprimidos: {a['debounced']})")
+    lines.append(f"\n*Agenda ({md(tz_label())})*")
+    sm = scheduler.metrics()
+    for key, when in list(scheduler.next_runs().items())[:8]:
+        j = sm.get(key)
+        if j is None:
+            continue
+        avg = f"{j['avg_time']:.1f}s" if j["avg_time"] is not None else "-"
+        lines.append(f"- {md(key)}: próximo {when.strftime('%d/%m %H:%M')} | execuções: {j['runs']} "
+                     f"(falhas: {j['failures']}, perdidas: {j['missed']}) | médio: {avg}")
+    reply(message.chat.id, "\n".join(lines), parse_mode="Markdown")
+
+# ==========================
+# Alertas em tempo real (ver analysis/alerts.py)
+# ==========================
+# O motor acompanha todos os pares USDT do feed; o alerta só vai para os
+# assinantes ativos com o símbolo na watchlist. Os símbolos das watchlists têm
+# as janelas de 24h/7d pré-carregadas com velas da Binance antes do feed
+# começar (e ao entrar numa watchlist), então a regra vale logo após o deploy.
+alert_engine = None
+
+def push_alert(alert):
+    for sub in subscriptions.active():
+        if alert.symbol in sub.watchlist:
+            reply(sub.chat_id, f"🚨 {alert.message}")
+
+def watched_symbols():
+    return sorted({s for sub in subscriptions.active() for s in sub.watchlist})
+
+def seed_alerts(symbols):
+    """Pré-carrega as janelas do motor com o histórico de cada símbolo (1m para 24h, 15m para 7d)."""
+    if alert_engine is None:
+        return
+    windows = alert_engine.windows()
+    for sym in symbols:
+        try:
+            alert_engine.seed(sym, binance_history(sym, windows))
+        except Exception as e:
+            print(f"[alerts] histórico de {sym}: {e}")
+
+def start_alerts():
+    global alert_engine
+    try:
+        source = BinanceMiniTickerSource()
+    except RuntimeError as e:
+        print(f"[alerts] desativado: {e}")
+        return
+    alert_engine = AlertEngine(on_alert=push_alert, cooldown=ALERT_COOLDOWN)
+
+    def run():
+        seed_alerts(watched_symbols())
+        alert_engine.run(source)
+
+    threading.Thread(target=run, daemon=True, name="alerts").start()
+
+# ==========================
+# Função para limpar exportações CSV antigas (> 7 dias)
+# ==========================
+def cleanup_old_csv(folder=EXPORT_DIR, days=7):
     """
-    Deleta arquivos .csv na pasta indicada com mais de 'days' dias.
+    Deleta arquivos .csv exportados na pasta indicada com mais de 'days' dias.
+    O histórico em si fica no SQLite (ver compact_history).
     """
+    if not os.path.isdir(folder):
+        return
     now = datetime.now()
     cutoff = now - timedelta(days=days)
 
@@ -666,33 +1132,48 @@ def cleanup_old_csv(folder=".", days=7):
             except Exception as e:
                 print(f"[cleanup_old_csv] Erro ao remover {filename}: {e}")
 
+def compact_history(raw_days=HISTORY_RAW_DAYS, keep_days=HISTORY_KEEP_DAYS):
+    """Retenção do histórico: compacta para 1 ciclo/dia após 'raw_days' e remove após 'keep_days'."""
+    removed = history_store.compact(raw_days=raw_days, keep_days=keep_days)
+    if removed:
+        print(f"[compact_history] {removed} linhas compactadas/removidas")
+
+def run_maintenance():
+    cleanup_old_csv()
+    try:
+        compact_history()
+    except Exception as e:
+        print(f"[compact_history] erro: {e}")
+
 # ==========================
-# Thread para rodar limpeza semanal
+# Tarefas periódicas (agendador único, ver utils/scheduler.py)
 # ==========================
-def schedule_csv_cleanup(interval_hours=24):
-    """
-    Roda a limpeza de CSVs antigos diariamente.
-    """
-    def loop():
-        while True:
-            cleanup_old_csv()
-            time.sleep(interval_hours * 3600)
-
-    th = threading.Thread(target=loop, daemon=True)
-    th.start()
+def schedule_maintenance():
+    """Limpeza/compactação diária e atualização do histórico do BTC, na mesma agenda dos envios."""
+    scheduler.add("limpeza", CLEANUP_CRON, run_maintenance, catch_up="once")
+    scheduler.add("precos btc", PRICE_SYNC_CRON, sync_btc_prices, catch_up="once")
+    if WARM_LEAD_MINUTES:
+        scheduler.add("aquecer picos", f"{(60 - WARM_LEAD_MINUTES) % 60} * * * *", warm_peak_hour)
 
 # ==========================
 # Adicione no main
 # ==========================
 if __name__ == "__main__":
-    # Inicia limpeza automática de CSVs
-    schedule_csv_cleanup(interval_hours=24)  # verifica uma vez por dia
-    # Agendamento diário do envio
-    schedule_daily_send(SEND_TIME)
+    # Limpeza de CSVs, compactação do histórico e preços do BTC
+    schedule_maintenance()
+    # Envio diário: o chat do .env vira assinante na primeira vez; os demais usam /assinar
+    if TELEGRAM_CHAT_ID and subscriptions.get(int(TELEGRAM_CHAT_ID)) is None:
+        subscriptions.subscribe(int(TELEGRAM_CHAT_ID), SEND_TIME)
+    outbox.start(bot)
+    sync_schedules()
+    scheduler.start()
+    if ALERTS_ENABLED:
+        start_alerts()
     listings = fetch_cmc_listings(limit=100)
     btc_mc = sum(c['quote']['USD']['market_cap'] for c in listings if c['symbol'] == "BTC")
     alt_mc = sum(c['quote']['USD']['market_cap'] for c in listings if c['symbol'] != "BTC")
     alt_index = (((alt_mc / (btc_mc + alt_mc))) * 100)+7  # % do mercado em altcoins
     print(alt_index)
-    print(f"[OK] Bot ativo. Comando manual: /analisar | Envio diário: {SEND_TIME}")
+    print(f"[OK] Bot ativo. Comandos: /analisar /assinar /cancelar /watchlist | "
+          f"Horários: {', '.join(subscriptions.send_times()) or 'nenhum'}")
     bot.infinity_polling()
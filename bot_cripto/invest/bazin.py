@@ -0,0 +1,327 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from utils.http_client import TokenBucket
+from storage.fx_rates import panel_fx
+from storage.yf_cache import get_cache
+
+# ==========================
+# Método Bazin em painel (todas as ações x todas as datas)
+# ==========================
+# Método Bazin em painel (datas x tickers): dividendos 12m, liquidez e filtros
+# saem para todas as ações e datas de uma vez (somas acumuladas + searchsorted).
+
+LOOKBACK_DAYS = 365                 # trailing 12 meses para dividendos
+LIQUIDITY_WINDOW = 252              # pregões na média de volume financeiro
+MIN_CASH_YIELD = 0.06               # 6% a.a. (Bazin)
+MIN_LIQUIDITY_BRL = 200_000         # valor médio diário negociado mínimo
+MAX_DEBT_TO_EBITDA = 4.0            # None para não aplicar
+TOP_N = 10
+FUNDAMENTALS_RATE = float(os.getenv("YF_INFO_RATE", "5"))  # chamadas .info por segundo
+
+# motivos de reprovação (bits)
+REASON_YIELD = 1
+REASON_LIQUIDITY = 2
+REASON_DEBT = 4
+REASON_NO_PRICE = 8
+REASON_NAMES = {
+    REASON_YIELD: "cash_yield_below_min",
+    REASON_LIQUIDITY: "low_liquidity",
+    REASON_DEBT: "high_debt_to_ebitda",
+    REASON_NO_PRICE: "no_price_data",
+}
+
+
+# ---------- PAINEL ----------
+
+@dataclass
+class Panel:
+    """Matrizes alinhadas (len(dates) x len(tickers)); NaN = sem negócio no dia."""
+    dates: pd.DatetimeIndex
+    tickers: list
+    close: np.ndarray
+    volume: np.ndarray
+    dividends: np.ndarray           # provento por ação na data-ex (0 nos outros dias)
+
+    @classmethod
+    def from_frames(cls, close, volume, dividends=None):
+        """DataFrames (index = datas, colunas = tickers) -> Panel, alinhando tudo ao índice de close."""
+        close = close.sort_index()
+        dates = pd.DatetimeIndex(close.index).tz_localize(None).normalize()
+        tickers = list(close.columns)
+        vol = volume.reindex(columns=tickers)
+        vol.index = pd.DatetimeIndex(vol.index).tz_localize(None).normalize()
+        vol = vol.reindex(dates)
+
+        divs = np.zeros((len(dates), len(tickers)))
+        if dividends is not None:
+            d = dividends.reindex(columns=tickers).fillna(0.0)
+            d.index = pd.DatetimeIndex(d.index).tz_localize(None).normalize()
+            d = d[(d.index >= dates[0]) & (d.index <= dates[-1])] if len(dates) else d.iloc[0:0]
+            # data-ex fora de pregão cai no próximo pregão do painel
+            rows = np.searchsorted(dates.values, d.index.values, side="left")
+            np.add.at(divs, rows, d.to_numpy(dtype=np.float64))
+        return cls(
+            dates=dates,
+            tickers=tickers,
+            close=close.to_numpy(dtype=np.float64),
+            volume=vol.to_numpy(dtype=np.float64),
+            dividends=divs,
+        )
+
+    def row_as_of(self, as_of):
+        """Índice da última data do painel <= as_of (-1 se anterior ao painel)."""
+        return int(np.searchsorted(self.dates.values, np.datetime64(pd.Timestamp(as_of)), side="right")) - 1
+
+
+def load_panel(tickers, start, end, cache=None):
+    """
+    Preços, volumes e dividendos de todos os tickers a partir do cache local
+    (storage/yf_cache.py): só os dias que faltam vão à rede, num yf.download em lote.
+    tickers no formato do yfinance (ex.: "VALE3.SA").
+    """
+    cache = cache or get_cache()
+    frames = cache.fields(list(tickers), ["Close", "Volume", "Dividends"],
+                          start=pd.Timestamp(start) - timedelta(days=5), end=end)
+    close = frames["Close"].dropna(how="all")
+    if close.empty:
+        raise ValueError("Nenhum dado de preço para os tickers informados")
+    return Panel.from_frames(close, frames["Volume"], frames["Dividends"])
+
+
+# ---------- MÉTRICAS VETORIZADAS ----------
+
+def last_valid(values):
+    """Último valor não-NaN até cada linha (forward fill em NumPy)."""
+    valid = ~np.isnan(values)
+    idx = np.where(valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    out = np.take_along_axis(values, idx, axis=0)
+    out[np.maximum.accumulate(valid, axis=0) == 0] = np.nan  # antes do primeiro preço
+    return out
+
+
+def window_sum(values, lo):
+    """Soma de values[lo[i]..i] para cada linha i (values sem NaN), via soma acumulada."""
+    csum = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+    return csum[1:] - csum[lo]
+
+
+def compute_metrics(panel, fx=None, lookback_days=LOOKBACK_DAYS, liquidity_window=LIQUIDITY_WINDOW):
+    """
+    Todas as métricas do Bazin para todas as datas do painel (matrizes T x N).
+    fx: taxa BRL->USD por data do painel (vetor T, ex.: storage.fx_rates.panel_fx(panel.dates))
+        para dolarizar proventos e preço na data de cada pagamento (modo "historical"
+        do notebook); None = em BRL.
+    """
+    dates = panel.dates.values
+    n = len(dates)
+    # janela de dividendos: (t - 365d, t]
+    lo_div = np.searchsorted(dates, dates - np.timedelta64(lookback_days, "D"), side="right")
+    trailing = window_sum(panel.dividends, lo_div)
+    last_price = last_valid(panel.close)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dividend_yield = np.where(last_price > 0, trailing / last_price, 0.0)
+        if fx is not None:
+            fx = np.asarray(fx, dtype=np.float64)
+            cash_usd = window_sum(panel.dividends * fx[:, None], lo_div)
+            price_usd = last_price * fx[:, None]
+            cash_yield = np.where(price_usd > 0, cash_usd / price_usd, 0.0)
+        else:
+            cash_yield = dividend_yield
+
+        # liquidez: média de close*volume nos pregões válidos dentro das últimas 'liquidity_window' linhas
+        traded = panel.close * panel.volume
+        valid = ~np.isnan(traded)
+        lo_liq = np.maximum(np.arange(n) - liquidity_window + 1, 0)
+        total = window_sum(np.where(valid, traded, 0.0), lo_liq)
+        count = window_sum(valid.astype(np.float64), lo_liq)
+        liquidity = np.where(count > 0, total / count, 0.0)
+
+    return {
+        "last_price": last_price,
+        "trailing_divs": trailing,
+        "dividend_yield": dividend_yield,
+        "cash_yield": cash_yield,
+        "liquidity_brl": liquidity,
+    }
+
+
+def apply_filters(metrics, debt_to_ebitda=None, min_cash_yield=MIN_CASH_YIELD,
+                  min_liquidity=MIN_LIQUIDITY_BRL, max_debt_to_ebitda=MAX_DEBT_TO_EBITDA):
+    """Matriz de motivos (bits REASON_*); 0 = passou em todos os filtros."""
+    reasons = np.zeros(metrics["last_price"].shape, dtype=np.int8)
+    reasons |= np.where(np.isnan(metrics["last_price"]), REASON_NO_PRICE, 0).astype(np.int8)
+    reasons |= np.where(metrics["cash_yield"] < min_cash_yield, REASON_YIELD, 0).astype(np.int8)
+    reasons |= np.where(metrics["liquidity_brl"] < min_liquidity, REASON_LIQUIDITY, 0).astype(np.int8)
+    if max_debt_to_ebitda is not None and debt_to_ebitda is not None:
+        debt = np.asarray(debt_to_ebitda, dtype=np.float64)  # vetor N (NaN = sem dado, não filtra)
+        with np.errstate(invalid="ignore"):
+            reasons |= np.where(debt > max_debt_to_ebitda, REASON_DEBT, 0).astype(np.int8)[None, :]
+    return reasons
+
+
+def reason_names(code):
+    return [name for bit, name in REASON_NAMES.items() if code & bit]
+
+
+# ---------- RESULTADO ----------
+
+@dataclass
+class BazinScreen:
+    panel: Panel
+    metrics: dict
+    reasons: np.ndarray
+    debt_to_ebitda: np.ndarray = None
+
+    def at(self, as_of):
+        """Avaliação de todas as ações em 'as_of' (mesmas colunas do evaluate_ticker do notebook)."""
+        i = self.panel.row_as_of(as_of)
+        if i < 0:
+            raise ValueError(f"{as_of} é anterior ao início do painel")
+        df = pd.DataFrame({k: v[i] for k, v in self.metrics.items()}, index=self.panel.tickers)
+        df["debt_to_ebitda"] = self.debt_to_ebitda if self.debt_to_ebitda is not None else np.nan
+        df["passes"] = self.reasons[i] == 0
+        df["reasons"] = [reason_names(c) for c in self.reasons[i]]
+        df.index.name = "ticker"
+        return df.reset_index()
+
+    def selection(self, as_of, top_n=TOP_N):
+        df = self.at(as_of)
+        return df[df["passes"]].sort_values("cash_yield", ascending=False).head(top_n)
+
+    def selections(self, as_of_dates, top_n=TOP_N):
+        """{data: [tickers]} para várias datas de rebalance (sem recalcular nada)."""
+        out = {}
+        for as_of in as_of_dates:
+            i = self.panel.row_as_of(as_of)
+            if i < 0:
+                out[as_of] = []
+                continue
+            ok = np.flatnonzero(self.reasons[i] == 0)
+            order = ok[np.argsort(-self.metrics["cash_yield"][i, ok], kind="stable")][:top_n]
+            out[as_of] = [self.panel.tickers[j] for j in order]
+        return out
+
+
+def screen_panel(panel, fx=None, debt_to_ebitda=None, **filters):
+    metrics = compute_metrics(panel, fx=fx)
+    reasons = apply_filters(metrics, debt_to_ebitda, **filters)
+    debt = np.asarray(debt_to_ebitda, dtype=np.float64) if debt_to_ebitda is not None else None
+    return BazinScreen(panel=panel, metrics=metrics, reasons=reasons, debt_to_ebitda=debt)
+
+
+# ---------- ENDIVIDAMENTO (fora do painel: não é point-in-time) ----------
+
+def get_debt_to_ebitda(ticker):
+    """totalDebt / |ebitda| via yfinance info (None se ausente)."""
+    try:
+        info = yf.Ticker(ticker).info
+        total_debt = info.get("totalDebt")
+        ebitda = info.get("ebitda")
+        if total_debt is None or not ebitda:
+            return None
+        return total_debt / abs(ebitda)
+    except Exception:
+        return None
+
+
+def fetch_debt_to_ebitda(tickers, max_workers=8, rate=FUNDAMENTALS_RATE):
+    """Vetor N (NaN = sem dado), buscado em paralelo sob limitador de taxa."""
+    bucket = TokenBucket(rate=rate, capacity=max(1, int(rate)))
+
+    def one(ticker):
+        bucket.acquire()
+        return get_debt_to_ebitda(ticker)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bazin-info") as pool:
+        values = list(pool.map(one, tickers))
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def select_universe(tickers, as_of=None, with_debt=True, dollarize=False, top_n=TOP_N):
+    """
+    Equivalente ao select_universe do notebook: (todas as avaliações, seleção top N).
+    dollarize=True converte proventos e preço para USD na data de cada um
+    (série BRL->USD local, ver storage/fx_rates.py).
+    """
+    as_of = as_of or date.today()
+    start = pd.Timestamp(as_of) - timedelta(days=LOOKBACK_DAYS + 30)
+    panel = load_panel(tickers, start, as_of)
+    fx = panel_fx(panel.dates) if dollarize else None
+    debt = fetch_debt_to_ebitda(panel.tickers) if with_debt and MAX_DEBT_TO_EBITDA is not None else None
+    screen = screen_panel(panel, fx=fx, debt_to_ebitda=debt)
+    return screen.at(as_of), screen.selection(as_of, top_n)
+
+
+# ==========================
+# Benchmark: python -m invest.bazin [tickers] [anos] [datas]   (de dentro de bot_cripto/)
+# ==========================
+def _notebook_reference(close, volume, divs, ticker, as_of):
+    """Cálculo por ticker/data como no notebook (máscara por index.date, cópia do frame)."""
+    hist = pd.DataFrame({"close": close[ticker], "volume": volume[ticker]})
+    hist = hist[hist.index <= pd.Timestamp(as_of)]
+    d = divs[ticker][divs[ticker] != 0]
+    start = as_of - timedelta(days=365)
+    mask = (d.index.date > start) & (d.index.date <= as_of)
+    trailing = float(d.loc[mask].sum()) if not d.empty else 0.0
+    last_price = float(hist["close"].dropna().iloc[-1])
+    df = hist.copy().dropna(subset=["close", "volume"])
+    df["traded_value"] = df["close"] * df["volume"]
+    liquidity = float(df.tail(252)["traded_value"].mean())
+    return trailing, trailing / last_price, liquidity
+
+
+def _synthetic_frames(n_tickers, years, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2010-01-04", periods=years * 252)
+    tickers = [f"T{k:03d}3.SA" for k in range(n_tickers)]
+    close = pd.DataFrame(20 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(dates), n_tickers)), axis=0)),
+                         index=dates, columns=tickers)
+    volume = pd.DataFrame(rng.integers(1_000, 200_000, (len(dates), n_tickers)).astype(float),
+                          index=dates, columns=tickers)
+    divs = pd.DataFrame(0.0, index=dates, columns=tickers)
+    pay = rng.random((len(dates), n_tickers)) < 4 / 252  # ~4 pagamentos por ano
+    divs[:] = np.where(pay, close.to_numpy() * rng.uniform(0.005, 0.03, pay.shape), 0.0)
+    return close, volume, divs
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    n_dates = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    close, volume, divs = _synthetic_frames(n_tickers, years)
+    as_of_dates = [d.date() for d in close.index[-1::-(len(close) // (n_dates + 1))][:n_dates]]
+
+    t0 = time.perf_counter()
+    panel = Panel.from_frames(close, volume, divs)
+    screen = screen_panel(panel)
+    picks = screen.selections(as_of_dates)
+    t_panel = time.perf_counter() - t0
+
+    sample = [(t, d) for t in close.columns[:10] for d in as_of_dates]
+    t0 = time.perf_counter()
+    ref = [_notebook_reference(close, volume, divs, t, d) for t, d in sample]
+    t_ref = (time.perf_counter() - t0) / len(sample) * n_tickers * n_dates
+
+    for (t, d), (trailing, dy, liq) in zip(sample, ref):
+        i, j = panel.row_as_of(d), panel.tickers.index(t)
+        assert np.isclose(screen.metrics["trailing_divs"][i, j], trailing), (t, d)
+        assert np.isclose(screen.metrics["dividend_yield"][i, j], dy), (t, d)
+        assert np.isclose(screen.metrics["liquidity_brl"][i, j], liq), (t, d)
+
+    print(f"{n_tickers} tickers x {len(close)} pregões ({years} anos), {n_dates} datas de rebalance")
+    print(f"por ticker/data (notebook, estimado): {t_ref:8.2f} s")
+    print(f"painel vetorizado (todas as datas):   {t_panel:8.3f} s  ({t_ref / t_panel:.0f}x)")
+    print(f"seleção em {as_of_dates[0]}: {picks[as_of_dates[0]][:5]}")
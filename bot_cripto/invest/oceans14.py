@@ -0,0 +1,274 @@
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from storage.scrape_cache import ScrapeCache
+from invest.parsing import parse_br_numbers
+
+# Parser HTML mais rápido disponível (opcionais; BeautifulSoup é o último recurso)
+try:
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+try:
+    import lxml.html as _lxml_html
+except ImportError:
+    _lxml_html = None
+
+# ==========================
+# oceans14: universo de ações "sem prejuízo"
+# ==========================
+# Página de ações "sem prejuízo" da oceans14 como modelo (SemPrejuizoPage): baixada
+# com requisição condicional, só a <table id="t1"> é parseada, números já convertidos.
+
+SEM_PREJUIZO_URL = "https://www.oceans14.com.br/acoes/semPrejuizo"
+SCRAPE_DB = os.getenv("SCRAPE_DB", "scrape_cache.db")
+PAGE_MAX_AGE = int(os.getenv("OCEANS14_MAX_AGE", "3600"))  # segundos em que o modelo é reaproveitado
+
+HEADERS = {
+    "Sec-Ch-Ua": '"Not_A Brand";v="99", "Chromium";v="142"',
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": "Windows",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Upgrade-Insecure-Requests": "1",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,"
+              "image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-User": "?1",
+    "Sec-Fetch-Dest": "document",
+    "Priority": "u=0, i",
+}
+
+_TABLE_T1 = re.compile(rb"""<table\b[^>]*\bid\s*=\s*["']?t1\b""", re.I)
+_TABLE_TAG = re.compile(rb"<(/?)table\b", re.I)
+_TOPO_TICKER = re.compile(rb"""class=["']cotacaoTopoTicker["'][^>]*>\s*([^<\s]+)\s*<""")
+
+
+# ---------- MODELO ----------
+
+@dataclass(frozen=True)
+class SemPrejuizoTable:
+    """Tabela t1 em colunas (uma entrada por ação)."""
+    ticker: tuple
+    empresa: tuple
+    segmento: tuple
+    valor_mercado: np.ndarray   # R$
+    lucro_12m: np.ndarray       # R$
+
+    def __len__(self):
+        return len(self.ticker)
+
+    def to_frame(self):
+        return pd.DataFrame({
+            "ticker": list(self.ticker),
+            "empresa": list(self.empresa),
+            "segmento": list(self.segmento),
+            "valor_mercado": self.valor_mercado,
+            "lucro_12m": self.lucro_12m,
+        })
+
+
+@dataclass(frozen=True)
+class SemPrejuizoPage:
+    tabela: SemPrejuizoTable
+    topo: tuple              # tickers da faixa de cotações do topo do site
+    parsed_at: datetime
+
+
+# ---------- PARSING ----------
+
+def slice_table(raw, pattern=_TABLE_T1):
+    """Recorta dos bytes o <table> que casa com 'pattern' (respeitando tabelas aninhadas)."""
+    m = pattern.search(raw)
+    if not m:
+        return None
+    depth = 0
+    for tag in _TABLE_TAG.finditer(raw, m.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            end = raw.find(b">", tag.end())
+            return raw[m.start():end + 1 if end >= 0 else len(raw)]
+    return raw[m.start():]
+
+
+def _clean(text):
+    return " ".join(text.split())
+
+
+def _rows_selectolax(fragment):
+    rows = []
+    for tr in _SelectolaxParser(fragment).css("tr"):
+        cells = []
+        for td in tr.css("td"):
+            a = td.css_first("a")
+            cells.append((_clean(td.text()), _clean(a.text()) if a is not None else None))
+        rows.append(cells)
+    return rows
+
+
+def _rows_lxml(fragment):
+    rows = []
+    for tr in _lxml_html.fragment_fromstring(fragment).iter("tr"):
+        cells = []
+        for td in tr.findall("td"):
+            a = td.find(".//a")
+            cells.append((_clean(td.text_content()), _clean(a.text_content()) if a is not None else None))
+        rows.append(cells)
+    return rows
+
+
+def _rows_bs4(fragment):
+    from bs4 import BeautifulSoup
+
+    rows = []
+    for tr in BeautifulSoup(fragment, "html.parser").find_all("tr"):
+        cells = []
+        for td in tr.find_all("td"):
+            a = td.find("a")
+            cells.append((_clean(td.get_text(" ")), _clean(a.get_text(" ")) if a else None))
+        rows.append(cells)
+    return rows
+
+
+if _SelectolaxParser is not None:
+    HTML_PARSER, _table_rows = "selectolax", _rows_selectolax
+elif _lxml_html is not None:
+    HTML_PARSER, _table_rows = "lxml", _rows_lxml
+else:
+    HTML_PARSER, _table_rows = "html.parser", _rows_bs4
+
+
+def parse_sem_prejuizo(raw, rows_fn=None):
+    """Bytes da página -> SemPrejuizoPage. ValueError se a tabela t1 não existir."""
+    fragment = slice_table(raw)
+    if fragment is None:
+        raise ValueError("Tabela t1 não encontrada na página do oceans14")
+
+    ticker, empresa, segmento, valor, lucro = [], [], [], [], []
+    for cols in (rows_fn or _table_rows)(fragment.decode("utf-8", errors="replace")):
+        if len(cols) < 5 or not cols[0][1]:
+            continue  # cabeçalho (th) ou linha sem link de ticker
+        ticker.append(cols[0][1])
+        empresa.append(cols[1][0])
+        segmento.append(cols[2][0])
+        valor.append(cols[3][0])
+        lucro.append(cols[4][0])
+
+    tabela = SemPrejuizoTable(
+        ticker=tuple(ticker), empresa=tuple(empresa), segmento=tuple(segmento),
+        valor_mercado=parse_br_numbers(valor), lucro_12m=parse_br_numbers(lucro),
+    )
+    topo = tuple(t.decode("utf-8", errors="replace") for t in _TOPO_TICKER.findall(raw))
+    return SemPrejuizoPage(tabela=tabela, topo=topo, parsed_at=datetime.now())
+
+
+# ---------- CARGA (1x POR EXECUÇÃO) ----------
+
+_scrape_cache = None
+_page = None
+_page_loaded_at = 0.0
+_page_lock = threading.Lock()
+
+
+def load_page(max_age=PAGE_MAX_AGE, force=False):
+    """
+    Modelo da página "sem prejuízo", baixado/parseado no máximo uma vez a cada max_age segundos.
+    Chamadas concorrentes esperam a mesma carga.
+    """
+    global _scrape_cache, _page, _page_loaded_at
+    with _page_lock:
+        if not force and _page is not None and time.monotonic() - _page_loaded_at < max_age:
+            return _page
+        if _scrape_cache is None:
+            _scrape_cache = ScrapeCache(SCRAPE_DB)
+        _page = _scrape_cache.fetch(SEM_PREJUIZO_URL, parse_sem_prejuizo, parser="oceans14_sem_prejuizo",
+                                    headers=HEADERS, timeout=30)
+        _page_loaded_at = time.monotonic()
+        return _page
+
+
+def get_acoes_sem_prejuizo(page=None):
+    """Lista de tickers da tabela t1."""
+    return list((page or load_page()).tabela.ticker)
+
+
+def get_acoes_sem_prejuizo_detalhado(page=None):
+    """DataFrame: ticker, empresa, segmento, valor_mercado (R$), lucro_12m (R$)."""
+    return (page or load_page()).tabela.to_frame()
+
+
+def get_tickers_topo(page=None):
+    """Tickers da faixa de cotações do topo (variante antiga de get_acoes_sem_prejuizo)."""
+    return [t for t in (page or load_page()).topo if len(t) <= 6]
+
+
+# ==========================
+# Benchmark: python -m invest.oceans14 [pagina.html] [linhas]   (de dentro de bot_cripto/)
+# ==========================
+# pagina_acao.html (página real do oceans14, ~160 KB) não tem a tabela t1: uma t1
+# sintética com 'linhas' ações é inserida antes de </body> para ter o peso real do site.
+
+def _synthetic_t1(rows):
+    linhas = []
+    for k in range(rows):
+        t = f"X{k:03d}"
+        linhas.append(
+            f'<tr><td><a href="/acoes/x/{t.lower()}3">{t}3</a></td><td>Empresa {k} S.A.</td>'
+            f"<td>Segmento {k % 30}</td><td>R$ {k + 1},{k % 10} bilhões</td>"
+            f"<td>R$ {k * 3 + 1}{',5' if k % 2 else ''} milhões</td></tr>"
+        )
+    return ('<table id="t1" class="table"><thead><tr><th>Ticker</th><th>Empresa</th><th>Segmento</th>'
+            "<th>Valor de mercado</th><th>Lucro 12m</th></tr></thead><tbody>"
+            + "".join(linhas) + "</tbody></table>").encode("utf-8")
+
+
+def _notebook_reference(raw):
+    """Como o notebook fazia: 3 chamadas, cada uma parseando a página inteira com html.parser."""
+    from bs4 import BeautifulSoup
+
+    out = []
+    for _ in range(2):  # get_acoes_sem_prejuizo + get_acoes_sem_prejuizo_detalhado
+        soup = BeautifulSoup(raw.decode("utf-8", errors="replace"), "html.parser")
+        rows = soup.find("table", id="t1").find("tbody").find_all("tr")
+        out.append([[td.get_text(strip=True) for td in row.find_all("td")] for row in rows])
+    soup = BeautifulSoup(raw.decode("utf-8", errors="replace"), "html.parser")  # faixa do topo
+    bloco = soup.find("div", id="ctl00_sldTopoCotacoesCorpo")
+    out.append([s.get_text(strip=True) for s in bloco.find_all("span", class_="cotacaoTopoTicker")] if bloco else [])
+    return out
+
+
+if __name__ == "__main__":
+    import sys
+    import timeit
+
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "pagina_acao.html")
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    with open(path, "rb") as f:
+        raw = f.read()
+    if slice_table(raw) is None:
+        raw = raw.replace(b"</body>", _synthetic_t1(rows) + b"</body>", 1)
+
+    page = parse_sem_prejuizo(raw)
+    print(f"{path}: {len(raw) / 1e3:.0f} KB | {len(page.tabela)} ações | {len(page.topo)} tickers no topo")
+    print(page.tabela.to_frame().head(3).to_string())
+
+    reps = 5
+    t_old = timeit.timeit(lambda: _notebook_reference(raw), number=reps) / reps
+    print(f"notebook (3x html.parser, página inteira): {t_old * 1e3:8.1f} ms")
+    parsers = [("html.parser", _rows_bs4)]
+    if _lxml_html is not None:
+        parsers.append(("lxml", _rows_lxml))
+    if _SelectolaxParser is not None:
+        parsers.append(("selectolax", _rows_selectolax))
+    for name, fn in parsers:
+        t = timeit.timeit(lambda: parse_sem_prejuizo(raw, rows_fn=fn), number=reps) / reps
+        print(f"modelo 1x, só t1 ({name:11s}):          {t * 1e3:8.1f} ms  ({t_old / t:.0f}x)")
@@ -0,0 +1,400 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+from utils import http_client
+from invest.oceans14 import HEADERS
+from invest.parsing import parse_br_number
+
+try:
+    import lxml.html as _lxml_html
+except ImportError:
+    _lxml_html = None
+
+# ==========================
+# oceans14: página de detalhe de uma ação
+# ==========================
+# Página de detalhe de uma ação da oceans14 lida numa passada só (índices por id e por
+# título de #abaResultados) para um registro tipado; lotes em pool de processos (parse_many).
+
+BASE_URL = "https://www.oceans14.com.br/acoes"
+DETAIL_WORKERS = int(os.getenv("OCEANS14_DETAIL_WORKERS", "4"))  # downloads simultâneos
+
+ID = "ctl00_conteudoPrincipal_lbl"
+ABAS_GRAFICOS = ("abaCotacao", "abaCotacaoLucro", "abaHistoricoPL")
+_VAR_12M = re.compile(r"Var\. 12m:\s*(.*)")
+
+
+@dataclass(frozen=True, slots=True)
+class DetalheAcao:
+    nome_url: str
+    ticker: str
+    razao_social: str = None
+    nome_fantasia: str = None
+    cnpj: str = None
+    quantidade_acoes: float = None
+    free_float: float = None            # % (ON)
+    quantidade_acionistas: str = None   # texto: "334.172 (PFs), 1.607 (PJs) e ..."
+    valor_mercado: float = None         # R$
+    cotacao_atual: float = None         # R$
+    variacao_dia: float = None          # %
+    variacao_12m: float = None          # %
+    data_hora_cotacao: str = None
+    segmento_listagem: str = None
+    setor: str = None
+    subsetor: str = None
+    segmento: str = None
+    site_ri: str = None
+    ultimo_resultado: str = None
+    proximo_resultado: str = None
+    abas_disponiveis: tuple = ()
+    links_graficos: tuple = ()
+    receita_liquida: float = None       # R$
+    lucro_bruto: float = None
+    lucro_liquido: float = None
+    ebitda: float = None
+    ebit: float = None
+    margem_bruta_percentual: float = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def to_frame(registros):
+    """Lista de DetalheAcao -> DataFrame (uma linha por ação)."""
+    return pd.DataFrame([r.to_dict() for r in registros])
+
+
+# ---------- ADAPTADORES (lxml rápido; BeautifulSoup se lxml não estiver instalado) ----------
+
+def _clean(text):
+    return " ".join(text.split()) if text else ""
+
+
+class _LxmlDoc:
+    def __init__(self, raw):
+        self.root = _lxml_html.document_fromstring(raw)
+
+    def elements(self):
+        for el in self.root.iter():
+            if isinstance(el.tag, str):  # pula comentários / instruções
+                yield el
+
+    @staticmethod
+    def tag(el):
+        return el.tag
+
+    @staticmethod
+    def get(el, attr):
+        return el.get(attr)
+
+    @staticmethod
+    def text(el):
+        return _clean(el.text_content())
+
+    @staticmethod
+    def parent(el):
+        return el.getparent()
+
+    @staticmethod
+    def descendants(el, tag):
+        return list(el.iterdescendants(tag))
+
+
+class _SoupDoc:
+    def __init__(self, raw):
+        from bs4 import BeautifulSoup
+
+        self.root = BeautifulSoup(raw, "html.parser")
+
+    def elements(self):
+        return self.root.find_all(True)
+
+    @staticmethod
+    def tag(el):
+        return el.name
+
+    @staticmethod
+    def get(el, attr):
+        value = el.get(attr)
+        return " ".join(value) if isinstance(value, list) else value
+
+    @staticmethod
+    def text(el):
+        return _clean(el.get_text(" "))
+
+    @staticmethod
+    def parent(el):
+        return el.parent
+
+    @staticmethod
+    def descendants(el, tag):
+        return el.find_all(tag)
+
+
+def _has_class(doc, el, name):
+    return el is not None and name in (doc.get(el, "class") or "").split()
+
+
+# ---------- ÍNDICES ----------
+
+@dataclass
+class PageIndex:
+    doc: object
+    ids: dict
+    nome_fantasia: str
+    abas: list
+    titulos: dict   # título (minúsculo) -> texto do valor, na ordem da página
+
+    def text_by_id(self, id_):
+        el = self.ids.get(id_)
+        return self.doc.text(el) if el is not None else None
+
+    def valor_por_titulo(self, titulo):
+        """Título exato primeiro; senão o primeiro título que contém o termo (como no notebook)."""
+        titulo = titulo.lower()
+        if titulo in self.titulos:
+            return self.titulos[titulo]
+        for nome, valor in self.titulos.items():
+            if titulo in nome:
+                return valor
+        return None
+
+
+def build_index(raw, doc_cls=None):
+    doc = (doc_cls or (_LxmlDoc if _lxml_html is not None else _SoupDoc))(raw)
+    ids, abas = {}, []
+    nome_fantasia = None
+    for el in doc.elements():  # passada única no documento
+        id_ = doc.get(el, "id")
+        if id_ and id_ not in ids:
+            ids[id_] = el
+        tag = doc.tag(el)
+        if tag != "span":
+            continue
+        if nome_fantasia is None and "font-size:16px" in (doc.get(el, "style") or ""):
+            nome_fantasia = doc.text(el)
+        if doc.get(el, "data-target"):
+            li = doc.parent(el)
+            if li is not None and doc.tag(li) == "li" and _has_class(doc, doc.parent(li), "nav-tabs"):
+                texto = doc.text(el)
+                if texto:
+                    abas.append(texto)
+
+    titulos = {}
+    resultados = ids.get("abaResultados")
+    if resultados is not None:
+        for row in doc.descendants(resultados, "div"):
+            if not _has_class(doc, row, "row"):
+                continue
+            colunas = doc.descendants(row, "div")
+            if len(colunas) >= 2:
+                titulos.setdefault(doc.text(colunas[0]).lower(), doc.text(colunas[1]))
+
+    return PageIndex(doc=doc, ids=ids, nome_fantasia=nome_fantasia, abas=abas, titulos=titulos)
+
+
+# ---------- REGISTRO ----------
+
+def _num(text):
+    value = parse_br_number(text)
+    return None if value != value else value  # NaN -> None
+
+
+def parse_detalhe(nome, ticker, raw, doc_cls=None):
+    """Bytes/str da página de detalhe -> DetalheAcao."""
+    idx = build_index(raw, doc_cls)
+    by_id = idx.text_by_id
+
+    var_12m = None
+    texto_12m = by_id(f"{ID}CotacaoVariacao12mTicker01Desktop")
+    if texto_12m:
+        m = _VAR_12M.search(texto_12m)
+        var_12m = _num(m.group(1)) if m else None
+
+    receita = _num(idx.valor_por_titulo("receita líquida"))
+    lucro_bruto = _num(idx.valor_por_titulo("lucro bruto"))
+    margem = (lucro_bruto / receita) * 100 if receita and lucro_bruto is not None else None
+
+    base = f"{BASE_URL}/{nome.lower()}/{ticker.lower()}"
+    return DetalheAcao(
+        nome_url=nome.upper(),
+        ticker=ticker.upper(),
+        razao_social=by_id(f"{ID}RazaoSocial"),
+        nome_fantasia=idx.nome_fantasia,
+        cnpj=by_id(f"{ID}Cnpj"),
+        quantidade_acoes=_num(by_id(f"{ID}NumeroAcoes")),
+        free_float=_num(by_id(f"{ID}FreeFloat")),
+        quantidade_acionistas=by_id(f"{ID}QntAcionistas"),
+        valor_mercado=_num(by_id(f"{ID}ValorMercado")),
+        cotacao_atual=_num(by_id(f"{ID}CotacaoTicker01Desktop")),
+        variacao_dia=_num(by_id(f"{ID}CotacaoVariacao1dTicker01Desktop")),
+        variacao_12m=var_12m,
+        data_hora_cotacao=by_id(f"{ID}CotacaoDataHoraTicker01Desktop"),
+        segmento_listagem=by_id(f"{ID}Governanca"),
+        setor=by_id(f"{ID}Setor"),
+        subsetor=by_id(f"{ID}Subsetor"),
+        segmento=by_id(f"{ID}Segmento"),
+        site_ri=by_id(f"{ID}SiteRI"),
+        ultimo_resultado=by_id(f"{ID}UltimoBalanco"),
+        proximo_resultado=by_id(f"{ID}ProximoBalanco"),
+        abas_disponiveis=tuple(idx.abas),
+        links_graficos=tuple(f"{base}/{aba}" for aba in ABAS_GRAFICOS if aba in idx.ids),
+        receita_liquida=receita,
+        lucro_bruto=lucro_bruto,
+        lucro_liquido=_num(idx.valor_por_titulo("lucro líquido")),
+        ebitda=_num(idx.valor_por_titulo("ebitda")),
+        ebit=_num(idx.valor_por_titulo("ebit")),
+        margem_bruta_percentual=round(margem, 2) if margem is not None else None,
+    )
+
+
+# ---------- DOWNLOAD / LOTE ----------
+
+def detalhe_url(nome, ticker):
+    return f"{BASE_URL}/{nome.lower()}/{ticker.lower()}/balanco-dividendos"
+
+
+def get_detalhe_acao(nome, ticker):
+    resp = http_client.get(detalhe_url(nome, ticker), headers=HEADERS, timeout=30)
+    resp.raise_for_status()
+    return parse_detalhe(nome, ticker, resp.content)
+
+
+def _parse_item(item):
+    nome, ticker, raw = item
+    try:
+        return ticker, parse_detalhe(nome, ticker, raw), None
+    except Exception as e:
+        return ticker, None, str(e)
+
+
+def parse_many(paginas, processes=None, chunksize=4):
+    """
+    paginas: iterável de (nome, ticker, bytes).
+    Retorna ({ticker: DetalheAcao}, {ticker: erro}). processes=1 roda no processo atual.
+    """
+    paginas = list(paginas)
+    if processes == 1 or len(paginas) <= 1:
+        resultados = list(map(_parse_item, paginas))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            resultados = list(pool.map(_parse_item, paginas, chunksize=chunksize))
+
+    registros, erros = {}, {}
+    for ticker, registro, erro in resultados:
+        if erro is None:
+            registros[ticker] = registro
+        else:
+            erros[ticker] = erro
+    return registros, erros
+
+
+def fetch_many(pares, max_workers=DETAIL_WORKERS, processes=None):
+    """
+    pares: iterável de (nome_url, ticker). Downloads em threads (limite por host do
+    http_client), parsing no pool de processos. Retorna ({ticker: DetalheAcao}, {ticker: erro}).
+    """
+    pares = list(pares)
+    erros = {}
+
+    def baixa(par):
+        nome, ticker = par
+        try:
+            resp = http_client.get(detalhe_url(nome, ticker), headers=HEADERS, timeout=30)
+            resp.raise_for_status()
+            return nome, ticker, resp.content
+        except Exception as e:
+            erros[ticker] = f"download: {e}"
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="oceans14") as pool:
+        paginas = [p for p in pool.map(baixa, pares) if p is not None]
+    registros, erros_parse = parse_many(paginas, processes=processes)
+    erros.update(erros_parse)
+    return registros, erros
+
+
+# ==========================
+# Benchmark: python -m invest.oceans14_detalhe [pagina.html] [páginas]   (de dentro de bot_cripto/)
+# ==========================
+# pagina_acao.html (WEGE3) não traz a aba #abaResultados: um bloco sintético com
+# linhas "título / valor" é inserido antes de </body> para exercitar o índice de títulos.
+
+def _synthetic_resultados(rows=40):
+    titulos = ["Receita líquida", "Lucro bruto", "EBITDA", "EBIT", "Lucro líquido"]
+    titulos += [f"Conta {k}" for k in range(rows - len(titulos))]
+    linhas = "".join(
+        f'<div class="row"><div class="col-xs-6">{t}</div><div class="col-xs-6">R$ {k + 1}.{k:03d},5 mil</div></div>'
+        for k, t in enumerate(titulos)
+    )
+    return f'<div id="abaResultados">{linhas}</div>'.encode("utf-8")
+
+
+def _notebook_reference(raw):
+    """Como o notebook fazia: um soup.find/select por campo + varredura de #abaResultados por título."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(raw.decode("utf-8", errors="replace"), "html.parser")
+
+    def get_by_id(id_):
+        el = soup.find(id=id_)
+        return el.get_text(strip=True) if el else None
+
+    def extrair_valor_por_titulo(titulo):
+        for linha in soup.select("#abaResultados .row"):
+            colunas = linha.find_all("div")
+            if len(colunas) >= 2 and titulo.lower() in colunas[0].text.strip().lower():
+                return colunas[1].text.strip()
+        return None
+
+    dados = {c: get_by_id(ID + c) for c in (
+        "RazaoSocial", "Cnpj", "NumeroAcoes", "FreeFloat", "QntAcionistas", "ValorMercado",
+        "CotacaoTicker01Desktop", "CotacaoVariacao12mTicker01Desktop", "CotacaoDataHoraTicker01Desktop",
+        "Governanca", "Setor", "Subsetor", "Segmento", "SiteRI", "UltimoBalanco", "ProximoBalanco")}
+    dados["nome_fantasia"] = soup.select_one("span[style*='font-size:16px']")
+    dados["variacao_dia"] = soup.select_one(f"#{ID}CotacaoVariacao1dTicker01Desktop div")
+    dados["abas"] = [a.get_text(strip=True) for a in soup.select(".nav-tabs > li > span") if a.get("data-target")]
+    dados["links"] = [aba for aba in ABAS_GRAFICOS if soup.find(id=aba)]
+    for titulo in ("receita líquida", "lucro bruto", "lucro líquido", "ebitda", "ebit"):
+        dados[titulo] = extrair_valor_por_titulo(titulo)
+    return dados
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "pagina_acao.html")
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    with open(path, "rb") as f:
+        raw = f.read()
+    if b'id="abaResultados"' not in raw:
+        raw = raw.replace(b"</body>", _synthetic_resultados() + b"</body>", 1)
+
+    registro = parse_detalhe("weg", "WEGE3", raw)
+    for k, v in registro.to_dict().items():
+        print(f"  {k:24s} {v!r}")
+
+    def bench(label, fn, reps=5):
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            fn()
+        t = (time.perf_counter() - t0) / reps
+        print(f"{label:46s} {t * 1e3:8.1f} ms")
+        return t
+
+    print(f"\n1 página ({len(raw) / 1e3:.0f} KB):")
+    t_old = bench("notebook (bs4, 1 varredura por campo)", lambda: _notebook_reference(raw))
+    bench("índice único (html.parser)", lambda: parse_detalhe("weg", "WEGE3", raw, _SoupDoc))
+    if _lxml_html is not None:
+        t_new = bench("índice único (lxml)", lambda: parse_detalhe("weg", "WEGE3", raw, _LxmlDoc))
+        print(f"  -> {t_old / t_new:.0f}x")
+
+    paginas = [("weg", f"T{k:03d}3", raw) for k in range(n)]
+    print(f"\nlote de {n} páginas ({os.cpu_count()} CPUs):")
+    bench("serial", lambda: parse_many(paginas, processes=1), reps=1)
+    bench("pool de processos", lambda: parse_many(paginas), reps=1)
@@ -0,0 +1,52 @@
+import math
+import re
+
+import numpy as np
+
+# ==========================
+# Números no formato brasileiro (oceans14 e afins)
+# ==========================
+# "R$ 156,1 bilhões" -> 156.1e9 | "4.197.318.000" -> 4197318000 | "-10,08%" -> -10.08
+# "N/D", "-", "" -> NaN. Percentuais ficam em pontos percentuais (35,33% -> 35.33).
+
+_NUM = re.compile(
+    r"(?P<neg>[-−]|\()?\s*(?:R\$|US\$|\$)?\s*(?P<neg2>[-−])?\s*"
+    r"(?P<num>\d{1,3}(?:\.\d{3})+(?:,\d+)?|\d+(?:,\d+)?)"
+    r"\)?\s*(?P<unit>[A-Za-zçãõÇÃÕ]*)"
+)
+
+
+def _unit_factor(unit):
+    u = unit.lower()
+    if not u:
+        return 1.0
+    if u in ("mil", "k"):
+        return 1e3
+    if u.startswith("tri"):
+        return 1e12
+    if u.startswith("bi") or u == "b":
+        return 1e9
+    if u.startswith("mi") or u == "m":  # mi, milhão, milhões
+        return 1e6
+    return 1.0
+
+
+def parse_br_number(text):
+    """Converte um texto em float (NaN se não houver número)."""
+    if text is None:
+        return math.nan
+    if isinstance(text, (int, float)):
+        return float(text)
+    m = _NUM.search(text)
+    if not m:
+        return math.nan
+    value = float(m.group("num").replace(".", "").replace(",", "."))
+    value *= _unit_factor(m.group("unit"))
+    if m.group("neg") or m.group("neg2"):
+        value = -value
+    return value
+
+
+def parse_br_numbers(texts):
+    """Versão em lote: lista de textos -> array float64."""
+    return np.fromiter((parse_br_number(t) for t in texts), dtype=np.float64, count=len(texts))
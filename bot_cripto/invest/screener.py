@@ -0,0 +1,229 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import pandas as pd
+import yfinance as yf
+
+from utils.http_client import TokenBucket
+from storage.yf_cache import get_cache
+from invest.oceans14 import get_acoes_sem_prejuizo
+
+# ==========================
+# Screener das ações "sem prejuízo" (B3)
+# ==========================
+# Screener das ações "sem prejuízo": preços num yf.download só e fundamentos (.info)
+# em paralelo sob limitador de taxa, pontuados conforme chegam.
+
+SCREENER_WORKERS = int(os.getenv("SCREENER_WORKERS", "8"))
+YF_INFO_RATE = float(os.getenv("YF_INFO_RATE", "5"))  # chamadas .info por segundo
+HIST_PERIOD = "5y"
+
+
+def yf_symbol(ticker):
+    return f"{ticker}.SA"
+
+
+# ---------- PREÇOS (LOTE) ----------
+
+def download_history(tickers, period=HIST_PERIOD, interval="1d"):
+    """
+    Históricos de todos os tickers. Diário sai do cache local (storage/yf_cache.py:
+    só os dias novos vão à rede); outros intervalos, um único yf.download.
+    Retorna {ticker: DataFrame com coluna 'close'} (mesmo formato do antigo get_historico)
+    e {ticker: erro} para os que vieram vazios.
+    """
+    symbols = [yf_symbol(t) for t in tickers]
+    if interval == "1d":
+        frames = get_cache().history(symbols, period=period)
+        historicos, erros = {}, {}
+        for ticker, symbol in zip(tickers, symbols):
+            df = frames.get(symbol)
+            if df is None:
+                erros[ticker] = f"Nenhum dado de histórico para {ticker}"
+                continue
+            # close ajustado, como o yf.download padrão (auto_adjust) usado antes
+            historicos[ticker] = (df.drop(columns="Close").rename(columns={"Adj Close": "close"})
+                                  .reset_index())
+        return historicos, erros
+
+    raw = yf.download(symbols, period=period, interval=interval, group_by="ticker",
+                      threads=True, progress=False)
+    historicos, erros = {}, {}
+    for ticker, symbol in zip(tickers, symbols):
+        try:
+            if isinstance(raw.columns, pd.MultiIndex):
+                df = raw[symbol]
+            else:
+                df = raw  # um ticker só: colunas simples
+        except KeyError:
+            erros[ticker] = "sem histórico no download"
+            continue
+        # o download em lote alinha as datas de todos os tickers: descarta os buracos
+        df = df.dropna(subset=["Close"]) if "Close" in df.columns else df.iloc[0:0]
+        if df.empty:
+            erros[ticker] = f"Nenhum dado de histórico para {ticker}"
+            continue
+        df = df.reset_index().rename(columns={"Close": "close"})
+        historicos[ticker] = df
+    return historicos, erros
+
+
+# ---------- FUNDAMENTOS ----------
+
+def get_fundamental(ticker):
+    info = yf.Ticker(yf_symbol(ticker)).info
+    pe = info.get("trailingPE")
+    dy = info.get("dividendYield", 0)
+    crescimento = info.get("earningsGrowth", 0)
+
+    if pe is None:
+        raise ValueError(f"P/L não encontrado para {ticker}")
+
+    return {
+        "peRatio": pe,
+        "dividendYield": dy or 0,
+        "netIncomeGrowth": crescimento or 0,
+    }
+
+
+# ---------- INDICADOR ----------
+
+def calcula_indicador(df_hist, fn):
+    try:
+        pl_hist = float(fn.get("peRatio") or 0)
+        dy_hist = float(fn.get("dividendYield") or 0)
+        pl_atual = float(fn.get("peRatio") or 0)
+        dy_atual = float(fn.get("dividendYield") or 0)
+        crescimento_lucro = float(fn.get("netIncomeGrowth") or 0)
+
+        if df_hist.empty or "close" not in df_hist.columns:
+            raise ValueError("Histórico vazio ou sem coluna 'close'")
+
+        close = df_hist["close"]
+        preco = float(close.iloc[-1])
+        suporte = float(close.tail(6).min())
+        media200 = float(close.tail(200).mean()) if len(close) >= 200 else preco
+        score_tec = 1 if preco > media200 else -1
+
+        indicador = 0
+        if pl_hist > 0 and pl_atual > 0:
+            indicador += 30 * ((pl_hist - pl_atual) / pl_hist)
+        if dy_hist > 0:
+            indicador += 25 * ((dy_atual - dy_hist) / dy_hist)
+        indicador += 20 * crescimento_lucro
+        if suporte > 0:
+            indicador -= 15 * ((preco - suporte) / suporte)
+        indicador += 10 * score_tec
+
+        return round(indicador, 2), {
+            "pl_hist": pl_hist, "pl_atual": pl_atual,
+            "dy_hist": dy_hist, "dy_atual": dy_atual,
+            "cres_lucro": crescimento_lucro,
+            "preco": preco, "suporte": suporte,
+            "score_tec": score_tec,
+        }
+    except Exception as e:
+        raise ValueError(f"Erro no cálculo do indicador: {e}")
+
+
+def classifica(indicador):
+    if indicador >= 70:
+        return "Situação A de Compra"
+    if indicador <= -70:
+        return "Situação A de Venda"
+    if indicador >= 30:
+        return "Compra com cautela"
+    if indicador <= -30:
+        return "Venda parcial ou observar"
+    return "Zona neutra"
+
+
+# ---------- PIPELINE ----------
+
+@dataclass
+class ScreenResult:
+    resultados: dict = field(default_factory=dict)   # ticker -> {"indicador": ..., **info}
+    erros: dict = field(default_factory=dict)        # ticker -> mensagem
+    tempos: dict = field(default_factory=dict)       # etapa -> segundos
+
+    def ranking(self):
+        """DataFrame ordenado pelo indicador (maior primeiro)."""
+        if not self.resultados:
+            return pd.DataFrame()
+        df = pd.DataFrame.from_dict(self.resultados, orient="index")
+        df["situacao"] = df["indicador"].map(classifica)
+        return df.sort_values("indicador", ascending=False)
+
+
+def screen(tickers=None, max_workers=SCREENER_WORKERS, rate=YF_INFO_RATE, on_result=None, on_error=None):
+    """
+    Roda o screener no universo 'tickers' (padrão: oceans14 sem prejuízo).
+    on_result(ticker, indicador, info) é chamado assim que cada ticker fica pronto;
+    on_error(ticker, mensagem) para cada falha.
+    """
+    out = ScreenResult()
+    t0 = time.perf_counter()
+    universe = list(dict.fromkeys(tickers if tickers is not None else get_acoes_sem_prejuizo()))
+    out.tempos["universo"] = time.perf_counter() - t0
+
+    def fail(ticker, msg):
+        out.erros[ticker] = msg
+        if on_error:
+            on_error(ticker, msg)
+
+    bucket = TokenBucket(rate=rate, capacity=max(1, int(rate)))
+
+    def fundamental(ticker):
+        bucket.acquire()
+        return get_fundamental(ticker)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fundamentals") as pool:
+        # fundamentos começam já; o download em lote roda em paralelo nesta thread
+        futures = {pool.submit(fundamental, t): t for t in universe}
+
+        t1 = time.perf_counter()
+        try:
+            historicos, erros_hist = download_history(universe) if universe else ({}, {})
+        except Exception as e:
+            historicos, erros_hist = {}, {t: f"download em lote falhou: {e}" for t in universe}
+        out.tempos["precos"] = time.perf_counter() - t1
+
+        for ticker, msg in erros_hist.items():
+            fail(ticker, msg)
+
+        for fut in as_completed(futures):
+            ticker = futures[fut]
+            if ticker in out.erros:
+                continue
+            try:
+                fn = fut.result()
+                ind, info = calcula_indicador(historicos[ticker], fn)
+            except Exception as e:
+                fail(ticker, str(e))
+                continue
+            out.resultados[ticker] = {"indicador": ind, **info}
+            if on_result:
+                on_result(ticker, ind, info)
+
+    out.tempos["total"] = time.perf_counter() - t0
+    return out
+
+
+def main(tickers=None):
+    def mostra(ticker, indicador, _info):
+        print(f"\n{ticker}: Indicador = {indicador}")
+        print(f" → {classifica(indicador)}")
+
+    res = screen(tickers, on_result=mostra, on_error=lambda t, e: print(f"Erro com {t}: {e}"))
+    print(f"\n{len(res.resultados)} ok, {len(res.erros)} com erro em {res.tempos['total']:.1f}s "
+          f"(preços: {res.tempos['precos']:.1f}s)")
+    return res
+
+
+# python -m invest.screener [TICKER ...]   (de dentro de bot_cripto/)
+if __name__ == "__main__":
+    import sys
+
+    main(sys.argv[1:] or None)
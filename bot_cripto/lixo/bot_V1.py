@@ -4,6 +4,7 @@ import telegram
 import pandas as pd
 import schedule
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -37,39 +38,57 @@ CATEGORIAS = {
     'emergente': ['INJ', 'RNDR', 'PYTH']
 }
 
+MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+MARKETS_PAGE_SIZE = 250  # máximo de ids por chamada aceito pelo CoinGecko
+
+def _buscar_pagina_mercado(ids):
+    """Uma chamada /coins/markets para até 250 ids; devolve só os campos usados."""
+    params = {
+        "vs_currency": "usd",
+        "ids": ",".join(ids),
+        "per_page": MARKETS_PAGE_SIZE,
+        "page": 1,
+        "sparkline": "false",
+    }
+    headers = {
+        "User-Agent": "Mozilla/5.0",
+        "Accept": "application/json"
+    }
+    r = requests.get(MARKETS_URL, params=params, headers=headers, timeout=10)
+    r.raise_for_status()
+    return {
+        c["id"]: {
+            "preco": c.get("current_price"),
+            "volume": c.get("total_volume"),
+            "dominancia_rank": c.get("market_cap_rank") or 999,
+            "variacao_24h": c.get("price_change_percentage_24h"),
+        }
+        for c in r.json()
+    }
+
 def obter_dados_mercado():
+    """
+    Busca a watchlist em lote: /coins/markets?ids=... com até 250 ids por chamada,
+    páginas em paralelo. Mesmo formato de saída da versão com /coins/{id}.
+    """
+    ids = [m.strip().lower() for m in ALTCOINS if m.strip()]
+    paginas = [ids[i:i + MARKETS_PAGE_SIZE] for i in range(0, len(ids), MARKETS_PAGE_SIZE)]
+
+    por_id = {}
+    with ThreadPoolExecutor(max_workers=min(4, len(paginas)) or 1) as pool:
+        for pagina, futuro in [(p, pool.submit(_buscar_pagina_mercado, p)) for p in paginas]:
+            try:
+                por_id.update(futuro.result())
+            except Exception as e:
+                print(f"Erro ao obter dados para {len(pagina)} moedas ({pagina[0]}...): {str(e)}")
+
     dados = []
-    for moeda in ALTCOINS:
-        try:
-            url = f"https://api.coingecko.com/api/v3/coins/{moeda.lower()}"
-            headers = {
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "application/json"
-            }
-            r = requests.get(url, headers=headers, timeout=10)
-            r.raise_for_status()  # Verifica erros HTTP
-            info = r.json()
-            
-            # Verifica se a resposta contém os dados esperados
-            if 'market_data' not in info:
-                print(f"Dados incompletos para {moeda}")
-                continue
-                
-            preco = info['market_data']['current_price']['usd']
-            volume = info['market_data']['total_volume']['usd']
-            dominancia = info.get('market_cap_rank', 999)
-            variacao_24h = info['market_data']['price_change_percentage_24h']
-            
-            dados.append({
-                'moeda': moeda.upper(),
-                'preco': preco,
-                'volume': volume,
-                'dominancia_rank': dominancia,
-                'variacao_24h': variacao_24h
-            })
-        except Exception as e:
-            print(f"Erro ao obter dados para {moeda}: {str(e)}")
+    for moeda in ids:
+        info = por_id.get(moeda)
+        if info is None or info["preco"] is None:
+            print(f"Dados incompletos para {moeda}")
             continue
+        dados.append({"moeda": moeda.upper(), **info})
     return dados
 
 def analisar_momento_compra(dados):
@@ -0,0 +1,278 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils import http_client
+
+# ==========================
+# Série diária de câmbio (SQLite)
+# ==========================
+# Série diária BRL->USD guardada em SQLite, buscada por faixas (séries temporais)
+# e completada só com os dias novos; rates_on() alinha as taxas a um calendário.
+
+FX_DB = os.getenv("FX_DB", "fx_rates.db")
+EXCHANGERATE_HOST_KEY = os.getenv("EXCHANGERATE_HOST_KEY")  # exigida pelo exchangerate.host atual
+FX_BACKFILL_START = os.getenv("FX_BACKFILL_START", "2010-01-01")
+CHUNK_DAYS = 365                # limite de dias por chamada de série temporal
+REFETCH_DAYS = 3                # dias finais rebuscados em cada sincronização (taxa do dia muda)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fx_rates (
+    pair       TEXT NOT NULL,          -- ex.: BRLUSD (1 BRL = rate USD)
+    date       TEXT NOT NULL,          -- AAAA-MM-DD
+    rate       REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (pair, date)
+)
+"""
+
+# Início da faixa já pedida às fontes por par. Não dá para usar MIN(date): se o
+# primeiro dia pedido não tem cotação (fim de semana, feriado do BCE), ele
+# ficaria sempre "faltando" e seria rebuscado a cada chamada.
+COVERAGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fx_coverage (
+    pair      TEXT PRIMARY KEY,
+    from_date TEXT NOT NULL             -- AAAA-MM-DD
+)
+"""
+
+
+# ---------- FONTES ----------
+
+def _parse_timeseries(data, quote):
+    """
+    {"rates": {"AAAA-MM-DD": {"USD": x}}} (exchangerate.host antigo, frankfurter) ou
+    {"quotes": {"AAAA-MM-DD": {"BRLUSD": x}}} (exchangerate.host atual) -> Series.
+    """
+    points = data.get("rates") or data.get("quotes") or {}
+    out = {}
+    for day, values in points.items():
+        if not isinstance(values, dict):
+            continue
+        rate = next((v for k, v in values.items() if k.endswith(quote)), None)
+        if rate is not None:
+            out[pd.Timestamp(day)] = float(rate)
+    return pd.Series(out, dtype=np.float64).sort_index()
+
+
+def fetch_exchangerate_host(base, quote, start, end):
+    if EXCHANGERATE_HOST_KEY:
+        url = "https://api.exchangerate.host/timeframe"
+        params = {"access_key": EXCHANGERATE_HOST_KEY, "source": base, "currencies": quote,
+                  "start_date": start.isoformat(), "end_date": end.isoformat()}
+    else:
+        url = "https://api.exchangerate.host/timeseries"
+        params = {"base": base, "symbols": quote,
+                  "start_date": start.isoformat(), "end_date": end.isoformat()}
+    r = http_client.get(url, params=params, timeout=20)
+    r.raise_for_status()
+    return _parse_timeseries(r.json(), quote)
+
+
+def fetch_frankfurter(base, quote, start, end):
+    """Frankfurter (BCE, gratuito, sem chave; só dias úteis)."""
+    r = http_client.get(f"https://api.frankfurter.app/{start.isoformat()}..{end.isoformat()}",
+                        params={"from": base, "to": quote}, timeout=20)
+    r.raise_for_status()
+    return _parse_timeseries(r.json(), quote)
+
+
+SOURCES = (fetch_exchangerate_host, fetch_frankfurter)
+
+
+def _fetch_range(base, quote, start, end, sources=None):
+    """(série, completa): completa = toda a faixa teve resposta de alguma fonte (mesmo vazia)."""
+    sources = sources or SOURCES
+    parts = []
+    complete = True
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=CHUNK_DAYS - 1), end)
+        answered = False
+        for source in sources:
+            try:
+                s = source(base, quote, chunk_start, chunk_end)
+            except Exception as e:
+                print(f"[fx_rates] {source.__name__} {chunk_start}..{chunk_end}: {e}")
+                continue
+            answered = True
+            if not s.empty:
+                parts.append(s)
+                break
+        complete = complete and answered
+        chunk_start = chunk_end + timedelta(days=1)
+    if not parts:
+        return pd.Series(dtype=np.float64), complete
+    s = pd.concat(parts)
+    return s[~s.index.duplicated(keep="last")].sort_index(), complete
+
+
+def fetch_range(base, quote, start, end, sources=None):
+    """Série [start, end] em blocos de CHUNK_DAYS; cada bloco tenta as fontes em ordem."""
+    return _fetch_range(base, quote, start, end, sources)[0]
+
+
+# ---------- STORE ----------
+
+class FxRateStore:
+    def __init__(self, path=FX_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        self._conn.execute(COVERAGE_SCHEMA)
+        self._conn.commit()
+        self._memo = {}  # pair -> (datas datetime64[D], taxas) carregadas
+
+    def bounds(self, pair):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(date), MAX(date) FROM fx_rates WHERE pair = ?", (pair,)
+            ).fetchone()
+        if not row or row[0] is None:
+            return None, None
+        return date.fromisoformat(row[0]), date.fromisoformat(row[1])
+
+    def covered_from(self, pair):
+        """Primeiro dia já pedido às fontes (com ou sem cotação), ou None."""
+        with self._lock:
+            row = self._conn.execute("SELECT from_date FROM fx_coverage WHERE pair = ?", (pair,)).fetchone()
+        return date.fromisoformat(row[0]) if row else None
+
+    def _set_covered_from(self, pair, day):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO fx_coverage (pair, from_date) VALUES (?, ?) "
+                "ON CONFLICT(pair) DO UPDATE SET from_date = MIN(from_date, excluded.from_date)",
+                (pair, day.isoformat()),
+            )
+            self._conn.commit()
+
+    def last_update(self, pair):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(updated_at) FROM fx_rates WHERE pair = ?", (pair,)
+            ).fetchone()
+        return row[0] if row and row[0] is not None else 0
+
+    def upsert(self, pair, series):
+        if series is None or series.empty:
+            return 0
+        now = time.time()
+        rows = [(pair, pd.Timestamp(d).date().isoformat(), float(v), now) for d, v in series.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO fx_rates (pair, date, rate, updated_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+            self._memo.pop(pair, None)
+        return len(rows)
+
+    def sync(self, base="BRL", quote="USD", start=None, end=None, max_age=3600):
+        """
+        Garante a série em [start, end]: backfill do que falta antes do início já
+        pedido (covered_from) e, depois do último dia gravado, só os dias novos (no
+        máximo 1x a cada max_age segundos: fim de semana/feriado não têm cotação nova).
+        A cobertura só avança quando todas as fontes responderam (erro -> tenta de novo).
+        Retorna o número de linhas gravadas.
+        """
+        pair = base + quote
+        start = _as_date(start or FX_BACKFILL_START)
+        end = _as_date(end or date.today())
+        first, last = self.bounds(pair)
+        written = 0
+        if first is None:
+            series, complete = _fetch_range(base, quote, start, end)
+            written = self.upsert(pair, series)
+            if complete and written:
+                self._set_covered_from(pair, start)
+            return written
+        covered = self.covered_from(pair) or first
+        if start < covered:
+            series, complete = _fetch_range(base, quote, start, covered - timedelta(days=1))
+            written += self.upsert(pair, series)
+            if complete:
+                self._set_covered_from(pair, start)
+        if end > last and time.time() - self.last_update(pair) > max_age:
+            written += self.upsert(pair, fetch_range(base, quote, last - timedelta(days=REFETCH_DAYS), end))
+        return written
+
+    def load(self, pair="BRLUSD", start=None, end=None):
+        query = "SELECT date, rate FROM fx_rates WHERE pair = ?"
+        params = [pair]
+        if start is not None:
+            query += " AND date >= ?"
+            params.append(_as_date(start).isoformat())
+        if end is not None:
+            query += " AND date <= ?"
+            params.append(_as_date(end).isoformat())
+        with self._lock:
+            df = pd.read_sql_query(query + " ORDER BY date", self._conn, params=params, parse_dates=["date"])
+        return df.set_index("date")["rate"]
+
+    def _arrays(self, pair):
+        memo = self._memo.get(pair)
+        if memo is None:
+            s = self.load(pair)
+            memo = (s.index.values.astype("datetime64[D]"), s.to_numpy(dtype=np.float64))
+            self._memo[pair] = memo
+        return memo
+
+    def rates_on(self, dates, pair="BRLUSD"):
+        """
+        Taxa vigente em cada data (última cotação <= data), como array float64.
+        Datas anteriores ao primeiro dado usam a primeira taxa; série vazia -> NaN.
+        """
+        days, rates = self._arrays(pair)
+        dates = pd.DatetimeIndex(dates).tz_localize(None).values.astype("datetime64[D]")
+        if len(days) == 0:
+            return np.full(len(dates), np.nan)
+        idx = np.searchsorted(days, dates, side="right") - 1
+        return rates[np.maximum(idx, 0)]
+
+    def rate_on(self, day, pair="BRLUSD"):
+        return float(self.rates_on([pd.Timestamp(day)], pair)[0])
+
+    def close(self):
+        self._conn.close()
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FxRateStore(FX_DB)
+        return _store
+
+
+def panel_fx(dates, base="BRL", quote="USD", store=None):
+    """Sincroniza (se preciso) e devolve a taxa base->quote para cada data do calendário de preços."""
+    store = store or get_store()
+    dates = pd.DatetimeIndex(dates)
+    if len(dates):
+        store.sync(base, quote, start=dates.min(), end=dates.max())
+    return store.rates_on(dates, base + quote)
+
+
+def get_fx_rate_br_to_usd(day, mode="latest"):
+    """Compatível com o notebook: 1 BRL = x USD. 'latest' usa o dia de hoje."""
+    day = date.today() if mode == "latest" else _as_date(day)
+    rate = panel_fx([pd.Timestamp(day)])[0]
+    return None if np.isnan(rate) else float(rate)
@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# ==========================
+# Histórico de mercado (SQLite, append-only)
+# ==========================
+# Cada ciclo de relatório acrescenta uma linha por moeda. Consultas por
+# símbolo/período usam o índice (symbol, ts); o CSV enviado no Telegram é
+# só uma exportação de um ciclo. Retenção = compactação, não apagar arquivos.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS market_history (
+    ts         TEXT NOT NULL,          -- AAAA-MM-DDTHH:MM:SS (hora do snapshot)
+    day        TEXT NOT NULL,          -- AAAA-MM-DD (partição lógica)
+    symbol     TEXT NOT NULL,
+    name       TEXT,
+    price      REAL,
+    market_cap REAL,
+    volume_24h REAL,
+    pct_24h    REAL,
+    pct_7d     REAL,
+    PRIMARY KEY (symbol, ts)
+);
+CREATE INDEX IF NOT EXISTS idx_market_history_day ON market_history (day);
+CREATE INDEX IF NOT EXISTS idx_market_history_ts ON market_history (ts);
+"""
+
+CSV_COLUMNS = ["name", "symbol", "price", "market_cap", "volume_24h", "pct_24h", "pct_7d"]
+
+
+class MarketHistoryStore:
+    def __init__(self, path="market_history.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def append(self, listings, taken_at=None):
+        """Acrescenta um ciclo (lista no formato de fetch_cmc_listings). Retorna o ts gravado."""
+        taken_at = (taken_at or datetime.now()).replace(microsecond=0)
+        ts = taken_at.isoformat()
+        day = taken_at.date().isoformat()
+        rows = []
+        for c in listings:
+            q = c["quote"]["USD"]
+            rows.append((
+                ts, day, c["symbol"], c.get("name"),
+                q.get("price"), q.get("market_cap"), q.get("volume_24h"),
+                q.get("percent_change_24h"), q.get("percent_change_7d"),
+            ))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO market_history "
+                "(ts, day, symbol, name, price, market_cap, volume_24h, pct_24h, pct_7d) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        return ts
+
+    def query(self, symbol, start=None, end=None, columns=("price", "market_cap", "volume_24h")):
+        """
+        Série de um símbolo entre start e end (datetime/date/str, inclusive).
+        Ex.: store.query("ETH", datetime.now() - timedelta(days=90), columns=["market_cap"])
+        """
+        unknown = [c for c in columns if c not in CSV_COLUMNS]
+        if unknown:
+            raise ValueError(f"colunas inválidas: {unknown} (válidas: {', '.join(CSV_COLUMNS)})")
+        if not columns:
+            raise ValueError("nenhuma coluna pedida")
+        cols = list(columns)
+        query = f"SELECT ts, {', '.join(cols)} FROM market_history WHERE symbol = ?"
+        params = [symbol]
+        if start is not None:
+            query += " AND ts >= ?"
+            params.append(_as_ts(start))
+        if end is not None:
+            query += " AND ts <= ?"
+            params.append(_as_ts(end, end_of_day=True))
+        query += " ORDER BY ts"
+        with self._lock:
+            df = pd.read_sql_query(query, self._conn, params=params, parse_dates=["ts"])
+        return df.set_index("ts")
+
+    def cycle(self, ts):
+        """Todas as moedas de um ciclo, no layout do antigo historico_*.csv."""
+        with self._lock:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(CSV_COLUMNS)} FROM market_history WHERE ts = ? ORDER BY market_cap DESC",
+                self._conn, params=[ts],
+            )
+
+    def export_csv(self, ts, folder="exports"):
+        """Exporta um ciclo para CSV (arquivo enviado no Telegram). Retorna o caminho."""
+        os.makedirs(folder, exist_ok=True)
+        stamp = datetime.fromisoformat(ts).strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(folder, f"historico_{stamp}.csv")
+        self.cycle(ts).to_csv(path, index=False)
+        return path
+
+    def compact(self, raw_days=30, keep_days=None, now=None):
+        """
+        Retenção configurável:
+          - mais antigo que 'raw_days': mantém só o último ciclo de cada dia por moeda
+          - mais antigo que 'keep_days' (None = nunca): remove
+        Retorna o número de linhas removidas.
+        """
+        now = now or datetime.now()
+        raw_cutoff = (now - timedelta(days=raw_days)).date().isoformat()
+        removed = 0
+        with self._lock:
+            cur = self._conn.execute(
+                """
+                DELETE FROM market_history
+                WHERE day < ?
+                  AND ts < (SELECT MAX(h.ts) FROM market_history h
+                            WHERE h.symbol = market_history.symbol AND h.day = market_history.day)
+                """,
+                (raw_cutoff,),
+            )
+            removed += cur.rowcount
+            if keep_days is not None:
+                keep_cutoff = (now - timedelta(days=keep_days)).date().isoformat()
+                cur = self._conn.execute("DELETE FROM market_history WHERE day < ?", (keep_cutoff,))
+                removed += cur.rowcount
+            self._conn.commit()
+        return removed
+
+    def close(self):
+        self._conn.close()
+
+
+def _as_ts(value, end_of_day=False):
+    if isinstance(value, datetime):
+        return value.replace(microsecond=0).isoformat()
+    if hasattr(value, "isoformat"):  # date
+        return value.isoformat() + ("T23:59:59" if end_of_day else "T00:00:00")
+    return str(value)
@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import pandas as pd
+
+# ==========================
+# Store local de preços diários (SQLite)
+# ==========================
+# Backfill uma vez e depois só acrescenta os dias novos. Os indicadores
+# (Puell, Pi Cycle, médias) leem daqui em vez de baixar 365 dias a cada relatório.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_prices (
+    symbol     TEXT NOT NULL,
+    date       TEXT NOT NULL,          -- AAAA-MM-DD (UTC)
+    open       REAL,
+    high       REAL,
+    low        REAL,
+    close      REAL NOT NULL,
+    volume     REAL,
+    updated_at REAL NOT NULL,          -- epoch da última gravação da linha
+    PRIMARY KEY (symbol, date)
+)
+"""
+
+
+class PriceHistoryStore:
+    """
+    Série diária OHLC por símbolo.
+    O dia corrente é regravado a cada sincronização (preço parcial do dia).
+    """
+
+    def __init__(self, path="price_history.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def last_date(self, symbol):
+        row = self._conn.execute(
+            "SELECT MAX(date) FROM daily_prices WHERE symbol = ?", (symbol,)
+        ).fetchone()
+        return date.fromisoformat(row[0]) if row and row[0] else None
+
+    def last_update(self, symbol):
+        """Epoch da gravação mais recente do símbolo (None se vazio)."""
+        row = self._conn.execute(
+            "SELECT MAX(updated_at) FROM daily_prices WHERE symbol = ?", (symbol,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def missing_days(self, symbol, today=None):
+        """Quantos dias buscar no upstream para completar a série (None = backfill completo)."""
+        last = self.last_date(symbol)
+        if last is None:
+            return None
+        today = today or datetime.now(timezone.utc).date()
+        return max((today - last).days, 0) + 1
+
+    def upsert(self, symbol, df):
+        """
+        Grava um DataFrame indexado por data com coluna 'price' ou 'close'
+        (opcionais: open, high, low, volume). Um ponto por dia: o último vence.
+        """
+        if df is None or df.empty:
+            return 0
+        close_col = "close" if "close" in df.columns else "price"
+        now = time.time()
+        rows = {}
+        for ts, row in df.iterrows():
+            day = pd.Timestamp(ts).date().isoformat()
+            rows[day] = (
+                symbol, day,
+                _opt(row, "open"), _opt(row, "high"), _opt(row, "low"),
+                float(row[close_col]), _opt(row, "volume"), now,
+            )
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO daily_prices "
+                "(symbol, date, open, high, low, close, volume, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                list(rows.values()),
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def load(self, symbol, days=None, end=None):
+        """
+        DataFrame indexado por data (datetime) com colunas price, open, high, low, volume.
+        days: limita aos últimos 'days' dias até 'end' (inclusive). None = tudo.
+        """
+        query = "SELECT date, close, open, high, low, volume FROM daily_prices WHERE symbol = ?"
+        params = [symbol]
+        end = end or datetime.now(timezone.utc).date()
+        if days is not None:
+            query += " AND date > ?"
+            params.append((end - timedelta(days=days)).isoformat())
+        query += " AND date <= ? ORDER BY date"
+        params.append(end.isoformat())
+
+        with self._lock:
+            df = pd.read_sql_query(query, self._conn, params=params, parse_dates=["date"])
+        df = df.rename(columns={"close": "price"}).set_index("date")
+        return df
+
+    def close(self):
+        self._conn.close()
+
+
+def _opt(row, col):
+    value = row.get(col) if hasattr(row, "get") else None
+    return None if value is None or pd.isna(value) else float(value)
@@ -0,0 +1,125 @@
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+
+from utils import http_client
+
+# ==========================
+# Cache de páginas raspadas (SQLite)
+# ==========================
+# Guarda, por página e por parser, os validadores HTTP (ETag / Last-Modified),
+# o hash do corpo e o resultado JÁ PARSEADO. Na próxima busca:
+#  - envia If-None-Match / If-Modified-Since; 304 -> devolve o resultado salvo
+#  - 200 com o mesmo hash do corpo (sites sem validadores) -> não parseia de novo
+#  - senão parseia e grava
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_pages (
+    url           TEXT NOT NULL,
+    parser        TEXT NOT NULL,          -- nome do parser (mesma página, resultados diferentes)
+    etag          TEXT,
+    last_modified TEXT,
+    body_hash     TEXT,
+    result        BLOB,                   -- pickle do resultado do parser
+    fetched_at    REAL NOT NULL,          -- epoch da última resposta (200 ou 304)
+    parsed_at     REAL,                   -- epoch do último parse
+    PRIMARY KEY (url, parser)
+)
+"""
+
+
+class ScrapeCache:
+    def __init__(self, path="scrape_cache.db", client=None):
+        self.path = path
+        self.client = client or http_client.client
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+        self._stats = {"not_modified": 0, "unchanged": 0, "parsed": 0, "errors": 0}
+
+    def _row(self, url, parser):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, last_modified, body_hash, result FROM scrape_pages WHERE url = ? AND parser = ?",
+                (url, parser),
+            ).fetchone()
+
+    def _touch(self, url, parser, etag, last_modified):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE scrape_pages SET fetched_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) "
+                "WHERE url = ? AND parser = ?",
+                (time.time(), etag, last_modified, url, parser),
+            )
+            self._conn.commit()
+
+    def _save(self, url, parser, etag, last_modified, body_hash, result):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrape_pages "
+                "(url, parser, etag, last_modified, body_hash, result, fetched_at, parsed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, parser, etag, last_modified, body_hash,
+                 pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), now, now),
+            )
+            self._conn.commit()
+
+    def _count(self, what):
+        with self._lock:
+            self._stats[what] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def fetch(self, url, parse, parser=None, headers=None, **kwargs):
+        """
+        Baixa 'url' (condicional quando possível) e devolve parse(corpo_em_bytes).
+        parser: nome estável do parser (padrão: nome da função); entra na chave.
+        Resultados None não são gravados (próxima chamada parseia de novo).
+        Exceções HTTP/rede sobem para quem chamou.
+        """
+        parser = parser or getattr(parse, "__name__", "parse")
+        row = self._row(url, parser)
+        req_headers = dict(headers or {})
+        if row is not None and row[3] is not None:
+            etag, last_modified = row[0], row[1]
+            if etag:
+                req_headers["If-None-Match"] = etag
+            if last_modified:
+                req_headers["If-Modified-Since"] = last_modified
+
+        r = self.client.get(url, headers=req_headers, **kwargs)
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+
+        if r.status_code == 304 and row is not None and row[3] is not None:
+            self._touch(url, parser, etag, last_modified)
+            self._count("not_modified")
+            return pickle.loads(row[3])
+        r.raise_for_status()
+
+        body = r.content
+        body_hash = hashlib.sha1(body).hexdigest()
+        if row is not None and row[3] is not None and row[2] == body_hash:
+            self._touch(url, parser, etag, last_modified)
+            self._count("unchanged")
+            return pickle.loads(row[3])
+
+        try:
+            result = parse(body)
+        except Exception:
+            self._count("errors")
+            raise
+        self._count("parsed")
+        if result is not None:
+            self._save(url, parser, etag, last_modified, body_hash, result)
+        return result
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+# ==========================
+# Registro de assinantes (SQLite)
+# ==========================
+# Cada chat assinante tem o próprio horário de envio (HH:MM no fuso do
+# agendador: hora local do servidor, ou SCHEDULER_TZ se definido) e uma watchlist opcional de símbolos destacados no relatório.
+# O agendador (utils/scheduler.py) agrupa os chats pelo horário: um disparo
+# por horário, um relatório compartilhado, um envio por chat.
+# O uso dos comandos por hora do dia também fica aqui (horários de pico para
+# pré-aquecer o relatório).
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+    chat_id    INTEGER PRIMARY KEY,
+    send_time  TEXT NOT NULL,          -- HH:MM
+    watchlist  TEXT NOT NULL DEFAULT '',  -- símbolos separados por vírgula
+    active     INTEGER NOT NULL DEFAULT 1,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+USAGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS command_usage (
+    command TEXT NOT NULL,
+    hour    INTEGER NOT NULL,          -- 0-23 no fuso do agendador (ver SCHEDULER_TZ)
+    count   INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (command, hour)
+)
+"""
+
+
+@dataclass(frozen=True)
+class Subscription:
+    chat_id: int
+    send_time: str
+    watchlist: tuple = ()
+    active: bool = True
+
+
+def parse_send_time(text):
+    """'9:5' / '09:05' -> '09:05'; ValueError se inválido."""
+    hour, minute = (int(p) for p in text.strip().split(":"))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"horário inválido: {text}")
+    return f"{hour:02d}:{minute:02d}"
+
+
+def _row(row):
+    chat_id, send_time, watchlist, active = row
+    return Subscription(chat_id, send_time, tuple(s for s in watchlist.split(",") if s), bool(active))
+
+
+class SubscriptionStore:
+    def __init__(self, path="subscriptions.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        self._conn.execute(USAGE_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_time ON subscriptions (send_time, active)")
+        self._conn.commit()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [_row(r) for r in self._conn.execute(sql, params).fetchall()]
+
+    def get(self, chat_id):
+        rows = self._query(
+            "SELECT chat_id, send_time, watchlist, active FROM subscriptions WHERE chat_id = ?", (chat_id,)
+        )
+        return rows[0] if rows else None
+
+    def subscribe(self, chat_id, send_time):
+        """Cria ou reativa a assinatura (mantém a watchlist). Retorna a Subscription."""
+        send_time = parse_send_time(send_time)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO subscriptions (chat_id, send_time, active, created_at, updated_at) "
+                "VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT(chat_id) DO UPDATE SET send_time = excluded.send_time, active = 1, "
+                "updated_at = excluded.updated_at",
+                (chat_id, send_time, now, now),
+            )
+            self._conn.commit()
+        return self.get(chat_id)
+
+    def unsubscribe(self, chat_id):
+        """Desativa (a watchlist fica guardada para uma nova assinatura). True se existia ativa."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE subscriptions SET active = 0, updated_at = ? WHERE chat_id = ? AND active = 1",
+                (time.time(), chat_id),
+            )
+            self._conn.commit()
+        return cur.rowcount > 0
+
+    def set_watchlist(self, chat_id, symbols):
+        """Substitui a watchlist (símbolos em maiúsculas, sem repetição). None se o chat não assina."""
+        symbols = [s.strip().upper() for s in symbols if s.strip()]
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE subscriptions SET watchlist = ?, updated_at = ? WHERE chat_id = ?",
+                (",".join(dict.fromkeys(symbols)), time.time(), chat_id),
+            )
+            self._conn.commit()
+        return self.get(chat_id) if cur.rowcount else None
+
+    def active(self, send_time=None):
+        """Assinaturas ativas (todas ou só as de um horário)."""
+        sql = "SELECT chat_id, send_time, watchlist, active FROM subscriptions WHERE active = 1"
+        if send_time is None:
+            return self._query(sql + " ORDER BY send_time, chat_id")
+        return self._query(sql + " AND send_time = ? ORDER BY chat_id", (send_time,))
+
+    def send_times(self):
+        """Horários distintos com pelo menos um assinante ativo."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT send_time FROM subscriptions WHERE active = 1 ORDER BY send_time"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def record_command(self, command, hour):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO command_usage (command, hour, count) VALUES (?, ?, 1) "
+                "ON CONFLICT(command, hour) DO UPDATE SET count = count + 1",
+                (command, hour),
+            )
+            self._conn.commit()
+
+    def peak_hours(self, command, n=3, min_count=1):
+        """As 'n' horas com mais uso do comando (com pelo menos min_count usos)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT hour FROM command_usage WHERE command = ? AND count >= ? "
+                "ORDER BY count DESC, hour LIMIT ?",
+                (command, min_count, n),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def close(self):
+        self._conn.close()
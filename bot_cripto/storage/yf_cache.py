@@ -0,0 +1,310 @@
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import yfinance as yf
+
+# ==========================
+# Cache local de históricos do yfinance (Parquet por ticker)
+# ==========================
+# Histórico diário do yfinance em Parquet por ticker, com manifesto da faixa
+# coberta: só o que falta é baixado (tickers com a mesma lacuna num download só),
+# e provento/desdobramento novo no fim faz rebaixar a série inteira.
+
+YF_CACHE_DIR = os.getenv("YF_CACHE_DIR", "yf_cache")
+YF_CACHE_MAX_AGE = int(os.getenv("YF_CACHE_MAX_AGE", "3600"))  # segundos entre checagens do fim da série
+TAIL_OVERLAP_DAYS = 3           # dias finais rebuscados (barra do dia é parcial)
+FIELDS = ["Open", "High", "Low", "Close", "Adj Close", "Volume", "Dividends", "Stock Splits"]
+MANIFEST = "manifest.json"
+
+_PERIOD_UNITS = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+
+
+def period_start(period, end=None):
+    """'5y', '6mo', '30d', 'max' -> data inicial equivalente ao period do yfinance."""
+    end = pd.Timestamp(end or date.today())
+    if period == "max":
+        return date(1970, 1, 1)
+    for suffix, unit in _PERIOD_UNITS.items():
+        if period.endswith(suffix) and period[: -len(suffix)].isdigit():
+            return (end - pd.DateOffset(**{unit: int(period[: -len(suffix)])})).date()
+    raise ValueError(f"period inválido: {period}")
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def yf_download(symbols, start, end):
+    """[start, end] (inclusive) de vários símbolos num único yf.download -> {símbolo: DataFrame}."""
+    raw = yf.download(list(symbols), start=start.isoformat(), end=(end + timedelta(days=1)).isoformat(),
+                      group_by="ticker", actions=True, auto_adjust=False, threads=True, progress=False)
+    return split_download(raw, symbols)
+
+
+def split_download(raw, symbols):
+    out = {}
+    if raw is None or raw.empty:
+        return out
+    for symbol in symbols:
+        if isinstance(raw.columns, pd.MultiIndex):
+            if symbol not in raw.columns.get_level_values(0):
+                continue
+            df = raw[symbol]
+        else:
+            df = raw  # um ticker só: colunas simples
+        df = df.reindex(columns=FIELDS)
+        # o download em lote alinha as datas de todos os tickers: descarta os buracos
+        df = df[df["Close"].notna()]
+        if df.empty:
+            continue
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        df = df.set_axis(index.normalize().rename("Date"), axis=0)
+        df[["Dividends", "Stock Splits"]] = df[["Dividends", "Stock Splits"]].fillna(0.0)
+        out[symbol] = df.astype("float64")
+    return out
+
+
+class YfCache:
+    def __init__(self, root=YF_CACHE_DIR, max_age=YF_CACHE_MAX_AGE, download=yf_download):
+        self.root = root
+        self.max_age = max_age
+        self._download = download
+        self._lock = threading.RLock()
+        self._frames = {}   # símbolo -> (mtime, DataFrame) já lido do disco
+        self._manifest = self._load_manifest()
+        self._stats = {"disk": 0, "downloads": 0, "fetched": 0, "refetched": 0}
+
+    # ---------- disco ----------
+
+    def _path(self, symbol):
+        return os.path.join(self.root, symbol.replace("/", "_") + ".parquet")
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, MANIFEST)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+    def _read(self, symbol):
+        path = self._path(symbol)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        memo = self._frames.get(symbol)
+        if memo and memo[0] == mtime:
+            return memo[1]
+        df = pd.read_parquet(path)
+        self._frames[symbol] = (mtime, df)
+        return df
+
+    def _write(self, symbol, df):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(symbol)
+        tmp = path + ".tmp"
+        df = df.rename_axis("Date")
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+        self._frames[symbol] = (os.path.getmtime(path), df)
+
+    # ---------- sincronização ----------
+
+    def _gaps(self, symbol, start, end, now):
+        """Faixas [a, b] a buscar para cobrir [start, end]."""
+        meta = self._manifest.get(symbol)
+        if meta is None:
+            return [(start, end)]
+        stale = now - meta["checked_at"] > self.max_age
+        df = self._read(symbol)
+        if df is None or not len(df):
+            # já verificado e sem dados: só volta à rede depois de max_age
+            return [(start, end)] if stale else []
+        gaps = []
+        covered_from = date.fromisoformat(meta["from"])
+        if start < covered_from:
+            gaps.append((start, covered_from - timedelta(days=1)))
+        last = df.index.max().date()
+        if end > last and stale:
+            gaps.append((max(last - timedelta(days=TAIL_OVERLAP_DAYS), start), end))
+        return gaps
+
+    def _fetch(self, groups):
+        """{(a, b): [símbolos]} -> {símbolo: [DataFrames]}, um download por faixa."""
+        got = {}
+        for (a, b), symbols in groups.items():
+            try:
+                frames = self._download(symbols, a, b)
+            except Exception as e:
+                print(f"[yf_cache] download {a}..{b} ({len(symbols)} tickers) falhou: {e}")
+                continue
+            self._stats["downloads"] += 1
+            self._stats["fetched"] += len(symbols)
+            for symbol in symbols:
+                got.setdefault(symbol, []).append(frames.get(symbol))
+        return got
+
+    def sync(self, symbols, start, end=None):
+        """Garante [start, end] no disco para cada símbolo, baixando só as faixas que faltam."""
+        start, end = _as_date(start), _as_date(end or date.today())
+        now = time.time()
+        with self._lock:
+            groups = {}
+            for symbol in dict.fromkeys(symbols):
+                for gap in self._gaps(symbol, start, end, now):
+                    groups.setdefault(gap, []).append(symbol)
+            if not groups:
+                return
+
+            refetch = {}
+            for symbol, parts in self._fetch(groups).items():
+                old = self._read(symbol) if symbol in self._manifest else None
+                new = [p for p in parts if p is not None and len(p)]
+                if new:
+                    merged = pd.concat(([old] if old is not None else []) + new)
+                    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+                    if old is not None and len(old):
+                        tail = merged[merged.index > old.index.max()]
+                        if (tail["Dividends"] != 0).any() or (tail["Stock Splits"] != 0).any():
+                            meta_from = date.fromisoformat(self._manifest[symbol]["from"])
+                            refetch.setdefault((min(meta_from, start), end), []).append(symbol)
+                    self._write(symbol, merged)
+                meta = self._manifest.get(symbol)
+                covered = min(date.fromisoformat(meta["from"]), start) if meta else start
+                # ticker sem dados (deslistado, ainda não negociava) também conta como verificado
+                self._manifest[symbol] = {"from": covered.isoformat(), "checked_at": now}
+
+            # novo provento/desdobramento: ajuste histórico mudou, série inteira de novo
+            for symbol, parts in self._fetch(refetch).items():
+                full = parts[0]
+                if full is not None and len(full):
+                    self._write(symbol, full)
+                    self._stats["refetched"] += 1
+            self._save_manifest()
+
+    # ---------- leitura ----------
+
+    def history(self, symbols, start=None, end=None, period=None):
+        """
+        {símbolo: DataFrame diário (colunas FIELDS)} em [start, end].
+        period ('5y', '6mo'...) substitui start, como no yf.download.
+        Símbolos sem dados ficam de fora.
+        """
+        end = _as_date(end or date.today())
+        start = period_start(period, end) if period else _as_date(start or date(1970, 1, 1))
+        self.sync(symbols, start, end)
+        out = {}
+        with self._lock:
+            for symbol in dict.fromkeys(symbols):
+                df = self._read(symbol)
+                if df is None:
+                    continue
+                df = df.loc[pd.Timestamp(start):pd.Timestamp(end)]
+                if len(df):
+                    out[symbol] = df
+                    self._stats["disk"] += 1
+        return out
+
+    def fields(self, symbols, names, start=None, end=None, period=None):
+        """{campo: DataFrame datas x símbolos} — formato de painel (ver invest/bazin.py)."""
+        frames = self.history(symbols, start, end, period)
+        return {
+            name: pd.DataFrame({s: frames[s][name] for s in symbols if s in frames},
+                               columns=list(symbols))
+            for name in names
+        }
+
+    def stats(self):
+        return dict(self._stats, tickers=len(self._manifest))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = YfCache(YF_CACHE_DIR)
+        return _cache
+
+
+def get_history(symbol, start=None, end=None, period=None):
+    """Substitui yf.Ticker(symbol).history(...) do notebook (preços não ajustados + Adj Close)."""
+    return get_cache().history([symbol], start, end, period).get(symbol, pd.DataFrame(columns=FIELDS))
+
+
+def get_dividends(symbol, start=None, end=None, period=None):
+    """Substitui yf.Ticker(symbol).dividends: só os dias com provento."""
+    divs = get_history(symbol, start, end, period)["Dividends"]
+    return divs[divs > 0]
+
+
+# ==========================
+# Benchmark: python -m storage.yf_cache [tickers] [anos]   (de dentro de bot_cripto/)
+# ==========================
+if __name__ == "__main__":
+    import shutil
+    import sys
+    import tempfile
+
+    from invest.bazin import _synthetic_frames
+
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    latency = 0.4 + 0.02 * n_tickers  # ordem de grandeza de um yf.download multi-ticker
+
+    close, volume, divs = _synthetic_frames(n_tickers, years + 1)
+    calls = []
+
+    def fake_download(symbols, a, b):
+        time.sleep(latency)
+        calls.append((len(symbols), a, b))
+        rows = close.loc[pd.Timestamp(a):pd.Timestamp(b)].index
+        out = {}
+        for s in symbols:
+            c = close.loc[rows, s]
+            out[s] = pd.DataFrame({"Open": c, "High": c, "Low": c, "Close": c, "Adj Close": c,
+                                   "Volume": volume.loc[rows, s], "Dividends": 0.0,
+                                   "Stock Splits": 0.0}).rename_axis("Date")
+        return out
+
+    symbols = list(close.columns)
+    today = close.index[-1].date()
+    root = tempfile.mkdtemp(prefix="yf_cache_")
+    try:
+        def timed(label, cache, end):
+            calls.clear()
+            t0 = time.perf_counter()
+            cache.fields(symbols, ["Close", "Volume"], period=f"{years}y", end=end)
+            print(f"{label:<36} {(time.perf_counter() - t0) * 1e3:8.1f} ms  downloads={len(calls)}")
+
+        week_ago = today - timedelta(days=7)
+        timed("1a execução (tudo da rede)", YfCache(root, download=fake_download), week_ago)
+        warm = YfCache(root, download=fake_download)
+        timed("nova execução (disco)", warm, week_ago)
+        timed("mesmo processo (memória)", warm, week_ago)
+        timed("1 semana depois (só dias novos)", YfCache(root, max_age=0, download=fake_download), today)
+        print(f"\n{n_tickers} tickers x {years} anos; antes: {n_tickers} downloads por execução "
+              f"(~{n_tickers * 0.4:.0f}s sequencial no notebook)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,215 @@
+import functools
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+# ==========================
+# Cache TTL com stale-while-revalidate
+# ==========================
+# - TTL por fonte (cada função decorada escolhe o seu)
+# - L1 em memória (LRU) + L2 opcional em disco (CACHE_DIR)
+# - dentro de 'stale_ttl' o valor vencido é devolvido na hora e
+#   uma única thread atualiza em background
+# - contadores de hit/miss por fonte para monitoramento
+
+
+class MemoryBackend:
+    """LRU em memória: guarda (valor, timestamp) para até 'maxsize' chaves."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DiskBackend:
+    """Um arquivo pickle por chave em 'folder'. Sobrevive a reinícios do bot."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, key):
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.folder, f"{name}.pkl")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[DiskBackend] erro lendo {key}: {e}")
+            return None
+
+    def set(self, key, entry):
+        path = self._path(key)
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"[DiskBackend] erro gravando {key}: {e}")
+
+    def clear(self):
+        for filename in os.listdir(self.folder):
+            if filename.endswith(".pkl"):
+                os.remove(os.path.join(self.folder, filename))
+
+
+def _is_cacheable(value):
+    """Não guarda respostas de erro (None, lista vazia, (None, None))."""
+    if value is None:
+        return False
+    if isinstance(value, (list, tuple, dict)) and (not value or all(v is None for v in value)):
+        return False
+    return True
+
+
+class TTLCache:
+    def __init__(self, maxsize=256, disk_dir=None):
+        self.memory = MemoryBackend(maxsize)
+        self.disk = DiskBackend(disk_dir) if disk_dir else None
+        self._locks = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    # ---------- contadores ----------
+    def _count(self, source, what):
+        with self._lock:
+            counters = self._stats.setdefault(
+                source, {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+            )
+            counters[what] += 1
+
+    def stats(self):
+        """Cópia dos contadores por fonte: hits, stale_hits, misses, refreshes, errors."""
+        with self._lock:
+            return {source: dict(c) for source, c in self._stats.items()}
+
+    # ---------- armazenamento ----------
+    def _load(self, key):
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        return entry
+
+    def _store(self, key, value):
+        entry = (value, time.time())
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    # ---------- leitura ----------
+    def _refresh_in_background(self, source, key, fetch, cacheable):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                value = fetch()
+                if cacheable(value):
+                    self._store(key, value)
+                self._count(source, "refreshes")
+            except Exception as e:
+                print(f"[TTLCache] {source}: falha ao revalidar: {e}")
+                self._count(source, "errors")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True, name=f"cache-refresh-{source}").start()
+
+    def get_or_fetch(self, source, key, fetch, ttl, stale_ttl=0, cacheable=_is_cacheable):
+        """
+        Devolve o valor de 'key', buscando com fetch() quando necessário.
+        - idade <= ttl: hit
+        - ttl < idade <= ttl + stale_ttl: devolve o valor velho e revalida em background
+        - caso contrário: busca agora (chamadas simultâneas esperam uma única busca)
+        """
+        entry = self._load(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age <= ttl:
+                self._count(source, "hits")
+                return value
+            if age <= ttl + stale_ttl:
+                self._count(source, "stale_hits")
+                self._refresh_in_background(source, key, fetch, cacheable)
+                return value
+
+        with self._key_lock(key):
+            # outra thread pode ter preenchido enquanto esperávamos
+            entry = self._load(key)
+            if entry is not None and time.time() - entry[1] <= ttl:
+                self._count(source, "hits")
+                return entry[0]
+            self._count(source, "misses")
+            value = fetch()
+            if cacheable(value):
+                self._store(key, value)
+            return value
+
+
+# Instância compartilhada pelo bot (CACHE_DIR habilita o backend em disco)
+cache = TTLCache(
+    maxsize=int(os.getenv("CACHE_MAXSIZE", "256")),
+    disk_dir=os.getenv("CACHE_DIR") or None,
+)
+
+
+def cached(source, ttl, stale_ttl=0, cache_obj=None):
+    """
+    Decorador: coloca a função atrás do cache com TTL de 'ttl' segundos.
+    source: nome da fonte (usado nos contadores e na chave).
+    stale_ttl: janela extra em que o valor vencido ainda é servido enquanto revalida.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            c = cache_obj or cache
+            key = f"{source}:{args!r}:{sorted(kwargs.items())!r}"
+            return c.get_or_fetch(source, key, lambda: fn(*args, **kwargs), ttl, stale_ttl)
+
+        wrapper.uncached = fn
+        return wrapper
+
+    return decorator
@@ -0,0 +1,47 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Prazo global padrão (segundos) para um ciclo de coleta do relatório
+DEFAULT_DEADLINE = float(os.getenv("FETCH_DEADLINE", "30"))
+
+
+def fetch_all(sources, deadline=DEFAULT_DEADLINE, max_workers=None):
+    """
+    Executa em paralelo todas as fontes independentes de um relatório.
+
+    sources: dict nome -> callable sem argumentos (use lambda/partial para parâmetros).
+    deadline: prazo global em segundos; fontes que não terminarem a tempo
+              (ou que lançarem exceção) viram None, como os fallbacks atuais.
+    Retorna dict nome -> resultado (ou None).
+
+    A latência total passa a ser a da fonte mais lenta, limitada pelo deadline,
+    e não mais a soma de todas as chamadas.
+    """
+    if not sources:
+        return {}
+
+    started = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(sources),
+                              thread_name_prefix="fetch")
+    futures = {name: pool.submit(fn) for name, fn in sources.items()}
+    try:
+        wait(futures.values(), timeout=deadline)
+    finally:
+        # Não espera as fontes atrasadas: elas terminam em background e são descartadas
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for name, fut in futures.items():
+        if not fut.done():
+            print(f"[fetch_all] {name}: excedeu o prazo de {deadline:.0f}s")
+            results[name] = None
+            continue
+        try:
+            results[name] = fut.result()
+        except Exception as e:
+            print(f"[fetch_all] {name} erro: {e}")
+            results[name] = None
+
+    print(f"[fetch_all] {len(sources)} fontes em {time.monotonic() - started:.2f}s")
+    return results
@@ -1,8 +1,8 @@
 import os
-import requests
 from dotenv import load_dotenv
-from threading import Timer
-from datetime import datetime, timedelta
+
+from utils import http_client
+from utils.scheduler import scheduler
 
 load_dotenv()
 
@@ -29,7 +29,7 @@ def classify_altcoins(data):
 def get_altcoin_index():
     try:
         url = os.getenv("ALTCOIN_INDEX_API")
-        response = requests.get(url)
+        response = http_client.get(url)
         data = response.json()
         return int(data["data"][0]["value"])
     except Exception:
@@ -45,14 +45,9 @@ def diversification_strategy(blue, mid, low):
 - 🔴 Lowcaps: {int(low/total*100)}%
 """
 
-def schedule_daily_task(callback, hour=9, minute=0):
-    now = datetime.now()
-    target = now.replace(hour=hour, minute=minute, second=0)
-    if now > target:
-        target += timedelta(days=1)
-    delay = (target - now).total_seconds()
-    Timer(delay, run_daily, [callback]).start()
-
-def run_daily(callback):
-    callback()
-    schedule_daily_task(callback)
+def schedule_daily_task(callback, hour=9, minute=0, key=None):
+    """Roda callback todo dia às hour:minute (hora local do servidor ou SCHEDULER_TZ) no agendador compartilhado."""
+    key = key or f"diario {getattr(callback, '__name__', 'tarefa')} {hour:02d}:{minute:02d}"
+    scheduler.add(key, f"{minute} {hour} * * *", callback)
+    scheduler.start()
+    return key
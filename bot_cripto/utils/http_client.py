@@ -0,0 +1,286 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ==========================
+# Cliente HTTP compartilhado
+# ==========================
+# Todo o tráfego do bot passa por aqui:
+#  - uma Session (pool de conexões keep-alive) por host
+#  - retry com backoff exponencial + jitter, respeitando Retry-After
+#  - token bucket por host para não estourar o limite das APIs gratuitas
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Limites por host: (requisições por segundo, rajada máxima)
+# CoinGecko free/demo: ~30 req/min. CMC pro basic: ~30 req/min.
+DEFAULT_RATE_LIMITS = {
+    "api.coingecko.com": (0.5, 5),
+    "pro-api.coinmarketcap.com": (0.5, 5),
+    "api.coinmarketcap.com": (1.0, 5),
+    "coinmarketcap.com": (1.0, 3),
+    "www.coinglass.com": (0.5, 2),
+    "open-api-v4.coinglass.com": (0.5, 2),
+    "www.oceans14.com.br": (2.0, 4),
+    "brapi.dev": (1.0, 5),
+}
+
+
+class TokenBucket:
+    """Token bucket thread-safe: 'rate' fichas por segundo, no máximo 'capacity' acumuladas."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens=1):
+        """Bloqueia até haver 'tokens' fichas disponíveis."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self, seconds):
+        """Esvazia o balde por 'seconds' (ex.: após um 429 com Retry-After)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+def parse_retry_after(value):
+    """Converte o header Retry-After (segundos ou data HTTP) em segundos. None se inválido."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """
+    Cliente HTTP com pool por host, retry/backoff e rate limit.
+    Uso: client.get(url, headers=..., params=..., timeout=...) -> requests.Response
+    """
+
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30.0, timeout=20,
+                 pool_size=10, rate_limits=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._sessions = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+        for host, (rate, burst) in (rate_limits or {}).items():
+            self.set_rate_limit(host, rate, burst)
+
+    def set_rate_limit(self, host, rate, burst=1):
+        """Define o limite de 'rate' req/s (rajada 'burst') para o host. rate=None remove."""
+        with self._lock:
+            if rate is None:
+                self._buckets.pop(host, None)
+            else:
+                self._buckets[host] = TokenBucket(rate, burst)
+
+    def _session_for(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def _sleep_backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            delay = min(retry_after, self.max_backoff)
+        else:
+            # backoff exponencial com "full jitter"
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+        time.sleep(delay)
+
+    def request(self, method, url, retries=None, **kwargs):
+        host = urlsplit(url).hostname or ""
+        session = self._session_for(host)
+        bucket = self._buckets.get(host)
+        kwargs.setdefault("timeout", self.timeout)
+        retries = self.retries if retries is None else retries
+
+        for attempt in range(retries + 1):
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                resp = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= retries:
+                    raise
+                print(f"[http_client] {host}: {e.__class__.__name__}, tentativa {attempt + 1}/{retries}")
+                self._sleep_backoff(attempt)
+                continue
+
+            if resp.status_code not in RETRY_STATUS or attempt >= retries:
+                return resp
+
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            print(f"[http_client] {host}: HTTP {resp.status_code}, tentativa {attempt + 1}/{retries}")
+            resp.close()
+            if resp.status_code == 429 and bucket is not None and retry_after:
+                # o balde vazio segura esta e as demais threads do mesmo host
+                bucket.penalize(min(retry_after, self.max_backoff))
+            else:
+                self._sleep_backoff(attempt, retry_after)
+        return resp
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+# Instância única usada por todo o bot
+client = HttpClient(
+    retries=int(os.getenv("HTTP_RETRIES", "3")),
+    backoff=float(os.getenv("HTTP_BACKOFF", "0.5")),
+    rate_limits=DEFAULT_RATE_LIMITS,
+)
+
+
+def get(url, **kwargs):
+    """Atalho para client.get (mesma assinatura de requests.get)."""
+    return client.get(url, **kwargs)
+
+
+# ==========================
+# Auto-teste contra servidor local: python -m utils.http_client   (de dentro de bot_cripto/)
+# Retry com Retry-After (segundos, data HTTP e teto max_backoff), backoff com
+# jitter sem Retry-After, 429 esvaziando o token bucket e o ritmo do balde.
+# ==========================
+if __name__ == "__main__":
+    from datetime import timedelta
+    from email.utils import format_datetime
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    hits = {}       # caminho -> [instantes (monotonic) das requisições]
+    script = {}     # caminho -> [(status, headers)] consumidos em ordem; depois 200
+    lock = threading.Lock()
+
+    class Stub(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with lock:
+                hits.setdefault(self.path, []).append(time.monotonic())
+                queue = script.get(self.path) or []
+                status, headers = queue.pop(0) if queue else (200, {})
+            body = b"ok" if status == 200 else b"erro"
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def gaps(path):
+        t = hits[path]
+        return [b - a for a, b in zip(t, t[1:])]
+
+    # 1) 503 + Retry-After em segundos, depois em data HTTP: espera o pedido e acerta na 3a
+    client = HttpClient(retries=3, backoff=0.05, max_backoff=5.0)
+    when = format_datetime(datetime.now(timezone.utc).replace(microsecond=0) + timedelta(seconds=3), usegmt=True)
+    script["/retry-after"] = [(503, {"Retry-After": "0.3"}), (503, {"Retry-After": when})]
+    resp = client.get(base + "/retry-after")
+    g = gaps("/retry-after")
+    assert resp.status_code == 200 and len(hits["/retry-after"]) == 3, hits["/retry-after"]
+    assert 0.28 <= g[0] < 0.5 and 1.6 <= g[1] < 2.9, g
+    print(f"Retry-After: 3 requisições, esperas {g[0]:.2f}s (segundos) e {g[1]:.2f}s (data HTTP)")
+
+    # 2) Retry-After acima de max_backoff: limitado ao teto
+    client = HttpClient(retries=1, backoff=0.05, max_backoff=0.3)
+    script["/teto"] = [(429, {"Retry-After": "120"})]
+    resp = client.get(base + "/teto")
+    g = gaps("/teto")
+    assert resp.status_code == 200 and 0.28 <= g[0] < 0.5, g
+    print(f"Retry-After 120s com teto 0.3s: esperou {g[0]:.2f}s")
+
+    # 3) sem Retry-After: backoff exponencial com full jitter; esgotadas as tentativas devolve o 503
+    random.seed(7)
+    client = HttpClient(retries=4, backoff=0.1, max_backoff=5.0)
+    script["/jitter"] = [(503, {})] * 10
+    resp = client.get(base + "/jitter")
+    g = gaps("/jitter")
+    assert resp.status_code == 503 and len(hits["/jitter"]) == 5, hits["/jitter"]
+    for attempt, gap in enumerate(g):
+        assert gap <= 0.1 * 2 ** attempt + 0.05, (attempt, gap)
+    assert len({round(x, 2) for x in g}) > 1, g
+    print(f"sem Retry-After: 5 requisições, esperas {', '.join(f'{x:.2f}' for x in g)}s "
+          f"(tetos {', '.join(f'{0.1 * 2 ** k:.1f}' for k in range(4))}s)")
+
+    # 4) token bucket: 10 req/s com rajada 2 -> 12 requisições levam ~1s, espaçadas de ~0.1s
+    client = HttpClient(retries=0, rate_limits={"127.0.0.1": (10, 2)})
+    t0 = time.monotonic()
+    for _ in range(12):
+        client.get(base + "/balde")
+    elapsed = time.monotonic() - t0
+    g = gaps("/balde")
+    assert 0.95 <= elapsed < 1.4, elapsed
+    assert all(x < 0.05 for x in g[:1]) and all(0.07 <= x < 0.2 for x in g[2:]), g
+    print(f"token bucket 10/s (rajada 2): 12 requisições em {elapsed:.2f}s, "
+          f"intervalo médio {sum(g[2:]) / len(g[2:]):.3f}s após a rajada")
+
+    # 5) 429 com Retry-After num host limitado: esvazia o balde e segura também as outras threads
+    client = HttpClient(retries=1, max_backoff=5.0, rate_limits={"127.0.0.1": (50, 5)})
+    script["/429"] = [(429, {"Retry-After": "1"})]
+    t0 = time.monotonic()
+    first = threading.Thread(target=client.get, args=(base + "/429",))
+    first.start()
+    time.sleep(0.2)  # a outra thread chega depois do 429
+    other = client.get(base + "/outra")
+    first.join()
+    g = gaps("/429")
+    assert len(hits["/429"]) == 2 and 0.95 <= g[0] < 1.3, g
+    assert hits["/outra"][0] - t0 >= 0.95, hits["/outra"][0] - t0
+    print(f"429 + Retry-After 1s: nova tentativa após {g[0]:.2f}s; outra thread do host liberada "
+          f"após {hits['/outra'][0] - t0:.2f}s")
+
+    client.close()
+    server.shutdown()
+    print("ok")
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================
+# Fila de jobs dos comandos do bot
+# ==========================
+# Os handlers do telebot só enfileiram e respondem na hora; o trabalho pesado
+# (ex.: generate_report) roda num pool limitado. Pedidos iguais em andamento
+# são agrupados num único job e todos recebem o mesmo resultado.
+
+
+class Job:
+    def __init__(self, key):
+        self.key = key
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.listeners = []
+        self.subscribers = set()
+
+
+class JobQueue:
+    def __init__(self, max_workers=2, name="jobs", history=200):
+        self.name = name
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=history)
+        self._counters = {"submitted": 0, "coalesced": 0, "completed": 0, "failed": 0}
+
+    def submit(self, key, fn, on_done=None, on_error=None, subscriber=None):
+        """
+        Enfileira fn() sob a chave 'key'.
+        Se já existe um job com a mesma chave em andamento, só registra os callbacks.
+        on_done(resultado) / on_error(exceção) rodam na thread do worker.
+        subscriber: identifica quem espera (ex.: chat_id); o mesmo subscriber
+                    não é registrado duas vezes no mesmo job.
+        Retorna True se o pedido foi agrupado num job existente.
+        """
+        with self._lock:
+            self._counters["submitted"] += 1
+            job = self._inflight.get(key)
+            coalesced = job is not None
+            if coalesced:
+                self._counters["coalesced"] += 1
+            else:
+                job = Job(key)
+                self._inflight[key] = job
+            if subscriber is None or subscriber not in job.subscribers:
+                job.listeners.append((on_done, on_error))
+                if subscriber is not None:
+                    job.subscribers.add(subscriber)
+
+        if not coalesced:
+            self._pool.submit(self._run, job, fn)
+        return coalesced
+
+    def _run(self, job, fn):
+        job.started_at = time.monotonic()
+        result, error = None, None
+        try:
+            result = fn()
+        except Exception as e:
+            error = e
+        job.finished_at = time.monotonic()
+
+        with self._lock:
+            # a partir daqui um novo pedido com a mesma chave abre um novo job
+            self._inflight.pop(job.key, None)
+            listeners = list(job.listeners)
+            self._latencies.append(job.finished_at - job.enqueued_at)
+            self._counters["failed" if error else "completed"] += 1
+
+        for on_done, on_error in listeners:
+            try:
+                if error is None:
+                    if on_done:
+                        on_done(result)
+                elif on_error:
+                    on_error(error)
+                else:
+                    print(f"[JobQueue:{self.name}] {job.key} falhou: {error}")
+            except Exception as e:
+                print(f"[JobQueue:{self.name}] callback de {job.key} falhou: {e}")
+
+    def metrics(self):
+        """Profundidade da fila, jobs rodando e latência (enfileirado -> concluído) em segundos."""
+        with self._lock:
+            jobs = list(self._inflight.values())
+            lat = sorted(self._latencies)
+            out = dict(self._counters)
+        out["queued"] = sum(1 for j in jobs if j.started_at is None)
+        out["running"] = sum(1 for j in jobs if j.started_at is not None)
+        if lat:
+            out["latency_avg"] = sum(lat) / len(lat)
+            out["latency_p95"] = lat[min(len(lat) - 1, int(0.95 * len(lat)))]
+            out["latency_max"] = lat[-1]
+        return out
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+# Fila compartilhada pelos comandos do bot
+jobs = JobQueue(max_workers=int(os.getenv("JOB_WORKERS", "2")), name="bot-jobs")
@@ -0,0 +1,227 @@
+import json
+import os
+import threading
+
+# ==========================
+# Extração por caminho no JSON das páginas (CMC, CoinGlass)
+# ==========================
+# Extratores que aprendem o caminho até o valor num JSON (tupla de chaves/índices,
+# índices negativos = fim da série) e só varrem o documento de novo se o caminho quebrar.
+
+
+def get_path(obj, path):
+    """Segue 'path' em obj. Retorna (True, valor) ou (False, None) se o caminho não existir."""
+    for token in path:
+        if not isinstance(obj, (dict, list)):
+            return False, None
+        try:
+            obj = obj[token]
+        except (KeyError, IndexError, TypeError):
+            return False, None
+    return True, obj
+
+
+def _children(path, node, reverse):
+    if isinstance(node, dict):
+        items = reversed(node.items()) if reverse else node.items()
+        for k, v in items:
+            yield path + (k,), v
+    elif isinstance(node, list):
+        n = len(node)
+        if reverse:
+            for i in range(n - 1, -1, -1):
+                yield path + (i - n,), node[i]
+        else:
+            for i, v in enumerate(node):
+                yield path + (i,), v
+
+
+def iter_nodes(obj, reverse=False):
+    """
+    Gera (caminho, valor) de todos os nós em pré-ordem, sem recursão e sem
+    materializar listas de filhos (memória O(profundidade), parada antecipada barata).
+    reverse=True percorre do fim do documento para o início (índices de lista negativos).
+    """
+    yield (), obj
+    stack = [_children((), obj, reverse)]
+    while stack:
+        nxt = next(stack[-1], None)
+        if nxt is None:
+            stack.pop()
+            continue
+        yield nxt
+        if isinstance(nxt[1], (dict, list)):
+            stack.append(_children(nxt[0], nxt[1], reverse))
+
+
+def is_number(x):
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+
+def find_last(obj, predicate):
+    """(caminho, valor) do último nó do documento com predicate(caminho, valor), ou (None, None)."""
+    for path, node in iter_nodes(obj, reverse=True):
+        if predicate(path, node):
+            return path, node
+    return None, None
+
+
+def find_first(obj, predicate):
+    """(caminho, valor) do primeiro nó em pré-ordem com predicate(caminho, valor), ou (None, None)."""
+    for path, node in iter_nodes(obj):
+        if predicate(path, node):
+            return path, node
+    return None, None
+
+
+def iter_numbers(obj, predicate=None, reverse=False):
+    """Gera os números (float) do documento, opcionalmente filtrados."""
+    for _, node in iter_nodes(obj, reverse=reverse):
+        if is_number(node) and (predicate is None or predicate(node)):
+            yield float(node)
+
+
+class PathCache:
+    """Caminhos aprendidos por fonte, em memória e (opcional) num arquivo JSON."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._paths = {}
+        self._stats = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._paths = {k: tuple(v) for k, v in json.load(f).items()}
+            except (OSError, ValueError) as e:
+                print(f"[PathCache] erro lendo {path}: {e}")
+
+    def get(self, source):
+        with self._lock:
+            return self._paths.get(source)
+
+    def set(self, source, path):
+        with self._lock:
+            if self._paths.get(source) == tuple(path):
+                return
+            self._paths[source] = tuple(path)
+            snapshot = {k: list(v) for k, v in self._paths.items()}
+        if self.path:
+            try:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"[PathCache] erro gravando {self.path}: {e}")
+
+    def count(self, source, event):
+        with self._lock:
+            s = self._stats.setdefault(source, {"hits": 0, "scans": 0, "misses": 0})
+            s[event] += 1
+
+    def stats(self):
+        with self._lock:
+            return {k: dict(v) for k, v in self._stats.items()}
+
+
+paths = PathCache(os.getenv("JSON_PATHS_FILE") or None)
+
+
+class PathExtractor:
+    """
+    Extrai um valor de um documento JSON por uma fonte nomeada.
+      match(valor) -> bool        : o nó é o indicador procurado?
+      last=True                   : varredura de fallback pega o último nó do documento
+                                    (ex.: ponto mais recente da série); False = o primeiro
+      key_match(chave) -> bool    : (opcional) só aceita nós cuja última chave casa
+      cast                        : (opcional) conversão do valor devolvido (ex.: float)
+    """
+
+    def __init__(self, source, match, last=True, key_match=None, cast=None, cache=None):
+        self.source = source
+        self.match = match
+        self.last = last
+        self.key_match = key_match
+        self.cast = cast
+        self.cache = cache or paths
+
+    def __repr__(self):
+        # estável entre execuções: entra na chave do cache de valores (@cached)
+        return f"PathExtractor({self.source!r})"
+
+    def _accepts(self, path, value):
+        if self.key_match is not None:
+            if not path or not isinstance(path[-1], str) or not self.key_match(path[-1]):
+                return False
+        try:
+            return bool(self.match(value))
+        except Exception:
+            return False
+
+    def scan(self, obj):
+        """Varredura completa (com parada antecipada). Retorna (caminho, valor)."""
+        return (find_last if self.last else find_first)(obj, self._accepts)
+
+    def learn(self, obj):
+        """Aprende o caminho num documento de referência (ex.: página salva). Retorna o caminho."""
+        path, _ = self.scan(obj)
+        if path is not None:
+            self.cache.set(self.source, path)
+        return path
+
+    def extract(self, obj, default=None):
+        if obj is None:
+            return default
+        cached_path = self.cache.get(self.source)
+        if cached_path is not None:
+            ok, value = get_path(obj, cached_path)
+            if ok and self._accepts(cached_path, value):
+                self.cache.count(self.source, "hits")
+                return self.cast(value) if self.cast else value
+
+        # caminho ainda não aprendido ou quebrado: varre e reaprende
+        path, value = self.scan(obj)
+        if path is None:
+            self.cache.count(self.source, "misses")
+            return default
+        self.cache.count(self.source, "scans")
+        self.cache.set(self.source, path)
+        return self.cast(value) if self.cast else value
+
+
+# ==========================
+# Aprender a partir de uma página salva:
+#   python -m utils.json_path pagina.html [--pointer /props/pageProps]   (de dentro de bot_cripto/)
+# Mostra o último número de cada faixa usada pelos extratores e o caminho até ele.
+# ==========================
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from utils.next_data import extract_next_data, PAGE_PROPS
+
+    args = sys.argv[1:]
+    pointer = PAGE_PROPS
+    if "--pointer" in args:
+        k = args.index("--pointer")
+        pointer = args[k + 1]
+        del args[k:k + 2]
+
+    for name in args:
+        with open(name, "rb") as f:
+            doc = extract_next_data(f.read(), pointer)
+        if doc is None:
+            print(f"{name}: sem __NEXT_DATA__")
+            continue
+        for label, match in (("0..100", lambda x: is_number(x) and 0 <= x <= 100),
+                             ("> 10", lambda x: is_number(x) and x > 10)):
+            ex = PathExtractor(f"cli:{label}", match, cache=PathCache())
+            t0 = time.perf_counter()
+            path = ex.learn(doc)
+            t_scan = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            value = ex.extract(doc)
+            t_hit = time.perf_counter() - t0
+            print(f"{name} [{label}] {value!r} em {list(path or [])} | "
+                  f"varredura {t_scan * 1e3:.2f} ms | caminho {t_hit * 1e6:.1f} µs")
@@ -0,0 +1,242 @@
+import json
+import re
+
+# ==========================
+# Extração do __NEXT_DATA__ (páginas Next.js: CMC, CoinGlass)
+# ==========================
+# Lê o __NEXT_DATA__ direto dos bytes da página e decodifica só a subárvore do
+# JSON pointer pedido, pulando os irmãos fora do caminho.
+
+# Caminho rápido: dados da página (getServerSideProps/getStaticProps). Os irmãos
+# em "/props" (initialState, dehydratedState) costumam ser bem maiores; só são
+# decodificados se o valor não estiver em pageProps (ver extract_with_fallback).
+PAGE_PROPS = "/props/pageProps"
+WIDE_POINTER = "/props"
+
+_MARKER = b'id="__NEXT_DATA__"'
+_CLOSE = b"</script>"
+
+_WS = re.compile(r"[ \t\n\r]*")
+_STR_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)  # resto de uma string após a aspa inicial
+_SCALAR_END = re.compile(r"[,\]}\s]")
+
+_decoder = json.JSONDecoder()
+
+
+def find_next_data(raw):
+    """Retorna (início, fim) do JSON do __NEXT_DATA__ dentro de 'raw' (bytes), ou None."""
+    pos = raw.find(_MARKER)
+    if pos < 0:
+        return None
+    start = raw.find(b">", pos)
+    if start < 0:
+        return None
+    end = raw.find(_CLOSE, start)
+    if end < 0:
+        return None
+    return start + 1, end
+
+
+def _skip_ws(s, i):
+    return _WS.match(s, i).end()
+
+
+def _skip_value(s, i):
+    """
+    Índice logo após o valor JSON que começa em s[i].
+    Strings e escalares são pulados por regex; objetos/listas pelo decoder em C,
+    descartando o resultado na hora (o pico de memória fica no tamanho do irmão
+    pulado, não do documento inteiro).
+    """
+    c = s[i]
+    if c == '"':
+        return _STR_TAIL.match(s, i + 1).end()
+    if c in "{[":
+        return _decoder.raw_decode(s, i)[1]
+    m = _SCALAR_END.search(s, i)
+    return m.start() if m else len(s)
+
+
+def _descend(s, i, token):
+    """
+    Dado s[i] == '{' ou '[', retorna o índice do filho 'token' (ou None).
+    Índices negativos de lista não são resolvidos aqui (ver extract_subtree).
+    """
+    if s[i] == "{":
+        i = _skip_ws(s, i + 1)
+        while s[i] != "}":
+            key_end = _STR_TAIL.match(s, i + 1).end()
+            key = json.loads(s[i:key_end])
+            i = _skip_ws(s, key_end)
+            i = _skip_ws(s, i + 1)  # ':'
+            if key == token:
+                return i
+            i = _skip_ws(s, _skip_value(s, i))
+            if s[i] == ",":
+                i = _skip_ws(s, i + 1)
+        return None
+
+    if s[i] == "[":
+        index = int(token)
+        count = 0
+        i = _skip_ws(s, i + 1)
+        while s[i] != "]":
+            if count == index:
+                return i
+            count += 1
+            i = _skip_ws(s, _skip_value(s, i))
+            if s[i] == ",":
+                i = _skip_ws(s, i + 1)
+        return None
+    return None
+
+
+def _walk_object(obj, tokens):
+    """Continua a navegação num objeto já decodificado."""
+    for token in tokens:
+        try:
+            obj = obj[int(token)] if isinstance(obj, list) else obj[token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            return None
+    return obj
+
+
+def parse_pointer(pointer):
+    """JSON pointer (RFC 6901) -> lista de tokens. '' ou '/' = documento inteiro."""
+    if not pointer or pointer == "/":
+        return []
+    return [t.replace("~1", "/").replace("~0", "~") for t in pointer.lstrip("/").split("/")]
+
+
+def extract_subtree(text, pointer=""):
+    """Decodifica só a subárvore 'pointer' do JSON em 'text' (str). None se o caminho não existir."""
+    tokens = parse_pointer(pointer)
+    i = _skip_ws(text, 0)
+    for k, token in enumerate(tokens):
+        if text[i] not in "{[":
+            return None
+        if text[i] == "[":
+            if not token.lstrip("-").isdigit():
+                return None
+            if token.startswith("-"):
+                # "último elemento": decodifica a lista e segue no objeto Python
+                value, _ = _decoder.raw_decode(text, i)
+                return _walk_object(value, tokens[k:])
+        i = _descend(text, i, token)
+        if i is None:
+            return None
+    value, _ = _decoder.raw_decode(text, i)
+    return value
+
+
+def extract_next_data(raw, pointer=""):
+    """
+    raw: corpo da resposta (bytes, ex.: r.content).
+    pointer: JSON pointer da subárvore desejada (ex.: "/props/pageProps").
+    Retorna o objeto Python da subárvore, ou None se não houver __NEXT_DATA__/caminho.
+    """
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    span = find_next_data(raw)
+    if span is None:
+        return None
+    text = raw[span[0]:span[1]].decode("utf-8", errors="replace")
+    try:
+        return extract_subtree(text, pointer)
+    except (ValueError, IndexError, AttributeError) as e:
+        print(f"[extract_next_data] JSON inválido em {pointer or '/'}: {e}")
+        return None
+
+
+_pointer_for = {}  # fonte do extrator -> pointer onde o valor foi achado da última vez
+
+
+def extract_with_fallback(raw, extractor, pointer=PAGE_PROPS, wide=WIDE_POINTER):
+    """
+    extractor.extract() sobre a subárvore 'pointer'; se não achar nada, tenta 'wide'.
+    O pointer que funcionou é lembrado por fonte (extractor.source), então uma página
+    que guarda os dados fora de pageProps paga a decodificação larga só uma vez por chamada.
+    """
+    source = extractor.source
+    for p in dict.fromkeys((_pointer_for.get(source, pointer), pointer, wide)):
+        value = extractor.extract(extract_next_data(raw, p))
+        if value is not None:
+            if p != _pointer_for.get(source, pointer):
+                print(f"[extract_next_data] {source}: valor em {p} (esperado em {pointer})")
+            _pointer_for[source] = p
+            return value
+    return None
+
+
+# ==========================
+# Benchmark: python -m utils.next_data [pagina.html ...] [--pointer /props/pageProps]   (de dentro de bot_cripto/)
+# Sem --pointer mede o caminho rápido (PAGE_PROPS), o largo ("/props") e o caminho de
+# produção (extract_with_fallback com um extrator de 0..100), informando em qual
+# subárvore o valor foi achado. Valide com páginas reais salvas (curl -o pagina.html URL).
+# ==========================
+def _regex_reference(html):
+    """Cópia do método antigo (regex .+? no HTML decodificado + json.loads do documento)."""
+    m = re.search(r'__NEXT_DATA__" type="application/json">(.+?)</script>', html)
+    return json.loads(m.group(1)) if m else None
+
+
+def _synthetic_page(points=200_000):
+    # a série fica no estado global (initialState), fora de pageProps: pior caso do fallback
+    series = [{"timestamp": 1_600_000_000 + 86400 * k, "value": (k * 37) % 100} for k in range(points)]
+    doc = {
+        "props": {
+            "pageProps": {"title": "Altcoin Season Index", "latest": {"altcoinIndex": "n/d"}},
+            "initialState": {"history": series, "noise": ["x" * 40] * (points // 4)},
+        },
+        "page": "/charts/altcoin-season-index",
+        "buildId": "bench",
+    }
+    head = "<html><head>" + "<meta name='x' content='y'>" * 2000 + "</head><body>"
+    script = '<script id="__NEXT_DATA__" type="application/json">' + json.dumps(doc) + "</script>"
+    return (head + script + "</body></html>").encode("utf-8")
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import tracemalloc
+
+    from utils.json_path import PathCache, PathExtractor, is_number
+
+    args = sys.argv[1:]
+    pointers = [PAGE_PROPS, "/props"]
+    if "--pointer" in args:
+        k = args.index("--pointer")
+        pointers = [args[k + 1]]
+        del args[k:k + 2]
+
+    pages = [(path, open(path, "rb").read()) for path in args] or [("sintética", _synthetic_page())]
+
+    for name, raw in pages:
+        def old():
+            return _regex_reference(raw.decode("utf-8", errors="replace"))
+
+        runs = [("regex + json.loads", old)]
+        for pointer in pointers:
+            runs.append((f"bytes + pointer {pointer}", lambda pointer=pointer: extract_next_data(raw, pointer)))
+
+        def production():
+            _pointer_for.clear()  # mede a primeira chamada (a mais cara)
+            ex = PathExtractor("bench", lambda v: is_number(v) and 0 <= v <= 100, cache=PathCache())
+            return extract_with_fallback(raw, ex)
+
+        runs.append(("produção (pageProps -> /props)", production))
+
+        for label, fn in runs:
+            t0 = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - t0
+            tracemalloc.start()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            ok = "não encontrado" if result is None else "ok"
+            if fn is production and result is not None:
+                ok = f"valor {result!r} em {_pointer_for.get('bench')}"
+            print(f"{name} ({len(raw) / 1e6:.1f} MB) | {label:32s} | {elapsed * 1e3:8.1f} ms | "
+                  f"pico {peak / 1e6:7.1f} MB | {ok}")
@@ -0,0 +1,434 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+# ==========================
+# Agendador único (fila de prioridade em relógio monotônico)
+# ==========================
+# Todas as tarefas periódicas numa thread: heap em relógio monotônico, gatilhos
+# cron/HH:MM/intervalo por fuso, política de disparo perdido ("skip"/"once"/"all")
+# com o último disparo salvo em SCHEDULER_STATE, e métricas por chave.
+
+SCHEDULER_TZ = os.getenv("SCHEDULER_TZ", "").strip()  # fuso de SEND_TIME e dos crons; vazio = hora local do servidor
+SCHEDULER_STATE = os.getenv("SCHEDULER_STATE", "scheduler_state.json")  # último disparo por chave
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "2"))
+MAX_SLEEP = 60.0        # reavalia ao menos 1x por minuto
+MISFIRE_GRACE = 60.0    # atraso (s) a partir do qual o disparo conta como perdido
+MAX_CATCH_UP = 10       # teto de execuções de recuperação na política "all"
+CATCH_UP_POLICIES = ("skip", "once", "all")
+
+
+def _local_zone_name():
+    """Nome IANA do fuso do servidor (TZ ou /etc/localtime), ou None se não der para saber."""
+    name = os.getenv("TZ", "").lstrip(":")
+    if not name:
+        try:
+            target = os.path.realpath("/etc/localtime")
+        except OSError:
+            target = ""
+        name = target.split("zoneinfo/", 1)[1] if "zoneinfo/" in target else ""
+    if not name:
+        return None
+    try:
+        ZoneInfo(name)
+    except (KeyError, ValueError, OSError):
+        return None
+    return name
+
+
+def get_tz(tz=None):
+    """None -> SCHEDULER_TZ (vazio = fuso local do servidor); str -> ZoneInfo; tzinfo passa direto."""
+    tz = tz or SCHEDULER_TZ or _local_zone_name()
+    if tz is None:
+        return datetime.now().astimezone().tzinfo  # offset fixo atual (sem nome IANA disponível)
+    return ZoneInfo(tz) if isinstance(tz, str) else tz
+
+
+def tz_label(tz=None):
+    """Nome do fuso em uso, para exibição."""
+    return str(tz or SCHEDULER_TZ or _local_zone_name() or get_tz())
+
+
+# ---------- EXPRESSÕES ----------
+
+_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+
+def _parse_field(text, lo, hi):
+    """'*', '5', '1-5', '*/15', '0-30/10', '1,15' -> frozenset de valores."""
+    values = set()
+    for part in text.split(","):
+        body, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if body == "*":
+            a, b = lo, hi
+        elif "-" in body:
+            a, b = (int(x) for x in body.split("-"))
+        else:
+            a = b = int(body)
+            if step > 1:
+                b = hi
+        if not (lo <= a <= hi and lo <= b <= hi) or step < 1:
+            raise ValueError(f"campo de cron fora do intervalo {lo}-{hi}: {part}")
+        values.update(range(a, b + 1, step))
+    return frozenset(values)
+
+
+class Cron:
+    """
+    Cron de 5 campos (minuto hora dia mês dia-da-semana, domingo = 0 ou 7),
+    avaliado no fuso 'tz'. Como no cron, se dia e dia-da-semana forem ambos
+    restritos, basta um dos dois bater.
+    """
+
+    def __init__(self, expr, tz=None):
+        self.expr = _ALIASES.get(expr.strip(), expr.strip())
+        self.tz = get_tz(tz)
+        fields = self.expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron precisa de 5 campos: {expr}")
+        self.minutes = sorted(_parse_field(fields[0], 0, 59))
+        self.hours = sorted(_parse_field(fields[1], 0, 23))
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        self.weekdays = frozenset(d % 7 for d in _parse_field(fields[4], 0, 7))
+        self._dom_any = fields[2] == "*"
+        self._dow_any = fields[4] == "*"
+
+    def _day_matches(self, d):
+        dom = d.day in self.days
+        dow = (d.weekday() + 1) % 7 in self.weekdays  # cron: domingo = 0
+        if self._dom_any or self._dow_any:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, after):
+        """Próximo disparo estritamente depois de 'after' (datetime com fuso), com fuso UTC."""
+        local = after.astimezone(self.tz).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        day = local.date()
+        for _ in range(366 * 5):
+            if day.month in self.months and self._day_matches(day):
+                start_h = local.hour if day == local.date() else 0
+                for h in self.hours:
+                    if h < start_h:
+                        continue
+                    start_m = local.minute if (day == local.date() and h == local.hour) else 0
+                    for m in self.minutes:
+                        if m >= start_m:
+                            when = datetime(day.year, day.month, day.day, h, m, tzinfo=self.tz)
+                            return when.astimezone(timezone.utc)
+            day += timedelta(days=1)
+        raise ValueError(f"cron sem ocorrência em 5 anos: {self.expr}")
+
+    def __repr__(self):
+        return f"Cron({self.expr!r}, {self.tz})"
+
+
+class Interval:
+    """A cada 'seconds' segundos (independe de fuso)."""
+
+    def __init__(self, seconds):
+        self.seconds = float(seconds)
+
+    def next_after(self, after):
+        return after + timedelta(seconds=self.seconds)
+
+    def __repr__(self):
+        return f"Interval({self.seconds:g}s)"
+
+
+def daily_at(send_time, tz=None):
+    """'HH:MM' -> Cron diário no fuso tz (padrão SCHEDULER_TZ)."""
+    hour, minute = map(int, send_time.split(":"))
+    return Cron(f"{minute} {hour} * * *", tz)
+
+
+def every(seconds):
+    return Interval(seconds)
+
+
+def as_trigger(when, tz=None):
+    """Cron/Interval, expressão cron, 'HH:MM' ou segundos -> objeto com next_after(datetime)."""
+    if hasattr(when, "next_after"):
+        return when
+    if isinstance(when, (int, float)):
+        return Interval(when)
+    when = when.strip()
+    if ":" in when and " " not in when:
+        return daily_at(when, tz)
+    return Cron(when, tz)
+
+
+# ---------- AGENDADOR ----------
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class _Entry:
+    __slots__ = ("key", "trigger", "fn", "catch_up", "due", "seq", "running", "stats")
+
+    def __init__(self, key, trigger, fn, catch_up):
+        self.key = key
+        self.trigger = trigger
+        self.fn = fn
+        self.catch_up = catch_up
+        self.due = None         # próximo disparo (datetime UTC)
+        self.seq = None
+        self.running = False
+        self.stats = {"runs": 0, "failures": 0, "skipped": 0, "missed": 0, "caught_up": 0,
+                      "total_time": 0.0, "max_time": 0.0, "last_time": None,
+                      "last_run": None, "last_error": None}
+
+
+class Scheduler:
+    def __init__(self, name="scheduler", workers=SCHEDULER_WORKERS, state_path=SCHEDULER_STATE):
+        self.name = name
+        self.workers = workers
+        self.state_path = state_path
+        self._heap = []          # (prazo monotônico, seq, key)
+        self._entries = {}       # key -> _Entry vigente
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pool = None
+        self._running = False
+        self._offset = time.time() - time.monotonic()
+        self._state = self._load_state()
+
+    # ---------- estado persistido ----------
+
+    def _load_state(self):
+        if not self.state_path:
+            return {}
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        tmp = self.state_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._state, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            print(f"[{self.name}] não consegui gravar {self.state_path}: {e}")
+
+    def last_run(self, key):
+        value = self._state.get(key)
+        return datetime.fromisoformat(value) if value else None
+
+    # ---------- heap ----------
+
+    def _deadline(self, due):
+        """Datetime de parede -> prazo em time.monotonic()."""
+        return due.timestamp() - self._offset
+
+    def _push(self, entry, due):
+        entry.due = due
+        entry.seq = next(self._seq)
+        heapq.heappush(self._heap, (self._deadline(due), entry.seq, entry.key))
+
+    def _rebuild(self):
+        """Relógio de parede andou diferente do monotônico: recalcula todos os prazos."""
+        self._offset = time.time() - time.monotonic()
+        self._heap = [(self._deadline(e.due), e.seq, k) for k, e in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def add(self, key, when, fn, catch_up="skip", tz=None, first_run=None):
+        """
+        Agenda fn() sob 'key' (substitui a entrada anterior com a mesma chave).
+        when: expressão cron ("0 21 * * *", "@daily"), "HH:MM", segundos, Cron ou Interval.
+        catch_up: "skip" | "once" | "all" para disparos perdidos (suspensão/reinício).
+                  Numa chave nova, um último disparo salvo há mais de um período é
+                  ignorado (exceto em "all"): recuperação vale para reinício, não
+                  para uma chave que volta a ser agendada dias depois.
+        first_run: datetime do primeiro disparo (padrão: pelo gatilho; com fuso ou hora local).
+        Retorna o datetime (UTC) do primeiro disparo.
+        """
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"catch_up inválido: {catch_up}")
+        entry = _Entry(key, as_trigger(when, tz), fn, catch_up)
+        now = _now()
+        with self._cond:
+            last = self.last_run(key)
+            if (last is not None and key not in self._entries and catch_up != "all"
+                    and entry.trigger.next_after(entry.trigger.next_after(last)) <= now):
+                last = None  # perdeu mais de uma ocorrência: estado velho, não recupera
+            self._entries[key] = entry
+            if first_run is not None:
+                due = first_run if first_run.tzinfo else first_run.astimezone()
+                due = due.astimezone(timezone.utc)
+            elif last is not None and entry.trigger.next_after(last) < now:
+                due = entry.trigger.next_after(last)  # perdido enquanto o bot estava fora
+            else:
+                due = entry.trigger.next_after(now)
+            self._push(entry, due)
+            self._cond.notify()
+        return due
+
+    def remove(self, key):
+        """Tira a chave da agenda e esquece o último disparo (re-adicionar não recupera nada)."""
+        with self._cond:
+            removed = self._entries.pop(key, None) is not None
+            if self._state.pop(key, None) is not None:
+                self._save_state()
+            self._cond.notify()
+        return removed
+
+    def keys(self):
+        with self._cond:
+            return list(self._entries)
+
+    def next_runs(self, tz=None):
+        """{chave: próximo disparo no fuso tz (padrão SCHEDULER_TZ)}, em ordem de disparo."""
+        tz = get_tz(tz)
+        with self._cond:
+            items = sorted((e.due, k) for k, e in self._entries.items())
+        return {k: due.astimezone(tz) for due, k in items}
+
+    # ---------- execução ----------
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._running = True
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{self.name}-job")
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, wait=True):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+            pool, self._pool = self._pool, None
+        if thread is not None:
+            thread.join(timeout=5)
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def _runs_for(self, entry, due, now):
+        """Quantas execuções agora: 1 no horário; se atrasado, conforme a política."""
+        if (now - due).total_seconds() <= MISFIRE_GRACE:
+            return 1
+        missed, t = 0, due
+        while t <= now and missed <= MAX_CATCH_UP:
+            missed += 1
+            t = entry.trigger.next_after(t)
+        entry.stats["missed"] += missed
+        if entry.catch_up == "skip":
+            return 0
+        runs = 1 if entry.catch_up == "once" else min(missed, MAX_CATCH_UP)
+        entry.stats["caught_up"] += runs
+        return runs
+
+    def _due(self):
+        """Entrada vencida e nº de execuções (já reagendada) ou segundos até a próxima."""
+        if abs((time.time() - time.monotonic()) - self._offset) > 1.0:
+            self._rebuild()
+        while self._heap:
+            deadline, seq, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is None or entry.seq != seq:
+                heapq.heappop(self._heap)  # removida ou substituída
+                continue
+            wait = deadline - time.monotonic()
+            if wait > 0:
+                return None, 0, min(wait, MAX_SLEEP)
+            heapq.heappop(self._heap)
+            now = _now()
+            runs = self._runs_for(entry, entry.due, now)
+            self._push(entry, entry.trigger.next_after(max(now, entry.due)))
+            return entry, runs, 0
+        return None, 0, MAX_SLEEP
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                entry, runs, wait = self._due()
+                if entry is None:
+                    self._cond.wait(wait)
+                    continue
+                if runs and entry.running:
+                    entry.stats["skipped"] += 1
+                    runs = 0
+                if runs:
+                    entry.running = True
+                    pool = self._pool
+            if runs:
+                pool.submit(self._run, entry, runs)
+
+    def _run(self, entry, runs):
+        try:
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                error = None
+                try:
+                    entry.fn()
+                except Exception as e:
+                    error = e
+                    print(f"[{self.name}] {entry.key} falhou: {e}")
+                elapsed = time.perf_counter() - t0
+                with self._cond:
+                    s = entry.stats
+                    s["runs"] += 1
+                    s["failures"] += error is not None
+                    s["last_error"] = str(error) if error else s["last_error"]
+                    s["total_time"] += elapsed
+                    s["max_time"] = max(s["max_time"], elapsed)
+                    s["last_time"] = elapsed
+                    s["last_run"] = _now()
+                    self._state[entry.key] = s["last_run"].isoformat()
+            with self._cond:
+                self._save_state()
+        finally:
+            with self._cond:
+                entry.running = False
+
+    def run_now(self, key):
+        """Dispara a entrada fora do horário (no pool), sem mudar o próximo disparo."""
+        with self._cond:
+            entry = self._entries.get(key)
+            if entry is None or entry.running or self._pool is None:
+                return False
+            entry.running = True
+            pool = self._pool
+        pool.submit(self._run, entry, 1)
+        return True
+
+    def metrics(self):
+        """Por chave: gatilho, próximo disparo, execuções/falhas/perdidos e tempos (s)."""
+        with self._cond:
+            out = {}
+            for key, e in self._entries.items():
+                s = dict(e.stats)
+                s["avg_time"] = s["total_time"] / s["runs"] if s["runs"] else None
+                s["next_run"] = e.due
+                s["trigger"] = repr(e.trigger)
+                s["running"] = e.running
+                out[key] = s
+            return out
+
+
+# Agendador compartilhado pelo bot (start() no main)
+scheduler = Scheduler()